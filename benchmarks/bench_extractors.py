@@ -0,0 +1,119 @@
+"""Micro-benchmark por extrator do EnhancedParser sobre um corpus sintético.
+
+    python benchmarks/bench_extractors.py
+    python benchmarks/bench_extractors.py --baseline HEAD~1   # antes x depois
+    python benchmarks/bench_extractors.py --experiences 80,100,120 --docs 6   # CVs de 10+ páginas
+
+Com ``--baseline`` a revisão indicada é extraída com ``git archive`` para um
+diretório temporário e medida em um subprocesso com o mesmo corpus.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# (nome no relatório, método do EnhancedParser)
+EXTRACTORS = [
+    ("document", "document"),
+    ("summary", "extract_summary"),
+    ("skills", "extract_enhanced_skills"),
+    ("languages", "_extract_enhanced_languages"),
+    ("location", "extract_location"),
+    ("education", "_extract_education_simple"),
+    ("experiences", "_extract_experiences_simple"),
+    ("enhance_experiences", "enhance_experiences"),
+    ("projects", "extract_projects"),
+    ("achievements", "extract_achievements"),
+    ("certifications", "_extract_enhanced_certifications"),
+    ("links", "_extract_enhanced_links"),
+    ("name", "_guess_enhanced_name"),
+    ("parse_enhanced", "parse_enhanced"),
+]
+
+def run(src_dir: str, docs: int, repeat: int, seed: int, sizes=None) -> dict:
+    """Mede cada extrator e retorna o tempo médio por documento (µs)"""
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, src_dir)
+    from corpus import synthetic_corpus
+    import enhanced_parser as ep
+    
+    parser = ep.EnhancedParser()
+    texts = [ep.normalize_text_for_parsing(t) for t in synthetic_corpus(docs, seed=seed, sizes=sizes)]
+    # Revisões com ParsedDocument segmentam uma vez e passam o documento aos extratores;
+    # o custo da segmentação aparece na linha "document"
+    build = getattr(parser, "document", None)
+    inputs = [build(t) for t in texts] if build else texts
+    results = {}
+    # Os extratores antigos imprimem DEBUG: descarta o stdout durante a medição
+    with contextlib.redirect_stdout(io.StringIO()):
+        experiences = [parser._extract_experiences_simple(t) for t in inputs]
+        for label, method in EXTRACTORS:
+            fn = getattr(parser, method, None)
+            if fn is None:
+                continue
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for i, source in enumerate(inputs):
+                    if method == "enhance_experiences":
+                        fn(experiences[i], source)
+                    elif method in ("document", "parse_enhanced"):
+                        fn(texts[i])
+                    else:
+                        fn(source)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            results[label] = best / len(texts) * 1e6
+    return results
+
+def run_baseline(rev: str, docs: int, repeat: int, seed: int, experiences: str = "") -> dict:
+    """Extrai ``rev`` para um diretório temporário e mede em um subprocesso"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = subprocess.run(["git", "archive", rev], cwd=REPO_DIR, check=True, capture_output=True).stdout
+        subprocess.run(["tar", "-x", "-C", tmp], input=archive, check=True)
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--src", tmp, "--json",
+             "--docs", str(docs), "--repeat", str(repeat), "--seed", str(seed),
+             "--experiences", experiences],
+            cwd=tmp, check=True, capture_output=True, text=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, default=60, help="CVs sintéticos no corpus")
+    ap.add_argument("--repeat", type=int, default=5, help="repetições (vale o melhor tempo)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--experiences", default="", help="nº de experiências por CV, separado por vírgula (padrão: 2,4,8)")
+    ap.add_argument("--baseline", help="revisão git para comparar (ex.: HEAD~1)")
+    ap.add_argument("--src", default=REPO_DIR, help=argparse.SUPPRESS)
+    ap.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = ap.parse_args()
+    
+    sizes = [int(n) for n in args.experiences.split(",") if n.strip()] or None
+    current = run(args.src, args.docs, args.repeat, args.seed, sizes)
+    if args.json:
+        print(json.dumps(current))
+        return
+    
+    baseline = run_baseline(args.baseline, args.docs, args.repeat, args.seed, args.experiences) if args.baseline else {}
+    print(f"{'extrator':<22}{'antes (µs)':>14}{'depois (µs)':>14}{'ganho':>9}" if baseline else f"{'extrator':<22}{'µs/doc':>14}")
+    for label, _ in EXTRACTORS:
+        if label not in current:
+            continue
+        if baseline and label in baseline:
+            before, after = baseline[label], current[label]
+            print(f"{label:<22}{before:>14.1f}{after:>14.1f}{before / after:>8.2f}x")
+        else:
+            print(f"{label:<22}{current[label]:>14.1f}")
+
+if __name__ == "__main__":
+    main()
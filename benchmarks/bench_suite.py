@@ -0,0 +1,416 @@
+"""Suíte de benchmarks reproduzível: extração do PDF, parser e API ponta a ponta.
+
+    python benchmarks/bench_suite.py                              # tudo, corpus padrão
+    python benchmarks/bench_suite.py --stages pdf,parser --docs 60
+    python benchmarks/bench_suite.py --save benchmarks/baselines/main.json
+    python benchmarks/bench_suite.py --compare benchmarks/baselines/main.json
+
+Etapas:
+  pdf      ``read_pdf_text`` sobre PDFs sintéticos (PT/EN, 3 layouts, tamanhos variados)
+  parser   ``EnhancedParser.parse_enhanced`` com o tempo de cada extrator
+  result   do resultado do parser ao corpo da resposta: dataclasses + orjson +
+           ``model_construct`` contra o caminho antigo, validando com o pydantic em cada passo
+  e2e      API completa (download + extração + parse) contra um servidor HTTP
+           local que imita o Google Drive (``/uc?export=download&id=...``)
+  adversarial  PDFs e textos patológicos (100 páginas, páginas vazias, sem quebras de linha...)
+
+Relata docs/s, p50/p95/p99 por etapa e por extrator e o pico de RSS (processo
++ workers). ``--save`` grava um baseline JSON; ``--compare`` compara com ele e
+sai com código 1 se docs/s ou algum p95 piorar além de ``--tolerance``.
+"""
+import argparse
+import contextlib
+import http.server
+import io
+import json
+import math
+import os
+import platform
+import resource
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 (nearest-rank) de amostras em ms"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    def rank(p):
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+    return {"p50": round(rank(50), 3), "p95": round(rank(95), 3), "p99": round(rank(99), 3), "max": round(ordered[-1], 3)}
+
+def peak_rss_mb() -> float:
+    """Pico de RSS do processo mais o dos workers vivos (VmHWM, só Linux)"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    own_kb = own / 1024 if platform.system() == "Darwin" else own
+    children_kb = 0
+    import multiprocessing
+    for child in multiprocessing.active_children():
+        try:
+            with open(f"/proc/{child.pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        children_kb += int(line.split()[1])
+        except OSError:
+            pass
+    return round((own_kb + children_kb) / 1024, 1)
+
+@contextlib.contextmanager
+def quiet():
+    # O parser ainda imprime DEBUG em alguns extratores
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+# ===== etapas =====
+def bench_pdf(pdfs) -> dict:
+    from pdf_text import read_pdf_text
+    samples, chars = [], 0
+    started = time.perf_counter()
+    for pdf in pdfs:
+        t = time.perf_counter()
+        text = read_pdf_text(memoryview(pdf.data), blocks=[])
+        samples.append((time.perf_counter() - t) * 1000)
+        chars += len(text)
+    elapsed = time.perf_counter() - started
+    return {
+        "docs": len(pdfs),
+        "docs_per_sec": round(len(pdfs) / elapsed, 2),
+        "latency_ms": percentiles(samples),
+        "pages": sum(p.pages for p in pdfs),
+        "chars": chars,
+    }
+
+def bench_parser(texts: List[str], repeat: int = 1) -> dict:
+    from parser_runtime import get_parser
+    parser = get_parser()
+    totals: List[float] = []
+    per_extractor: Dict[str, List[float]] = {}
+    started = time.perf_counter()
+    with quiet():
+        for _ in range(repeat):
+            for text in texts:
+                timings: Dict[str, float] = {}
+                t = time.perf_counter()
+                parser.parse_enhanced(text, timings=timings)
+                totals.append((time.perf_counter() - t) * 1000)
+                for name, ms in timings.items():
+                    per_extractor.setdefault(name, []).append(ms)
+    elapsed = time.perf_counter() - started
+    return {
+        "docs": len(totals),
+        "docs_per_sec": round(len(totals) / elapsed, 2),
+        "latency_ms": percentiles(totals),
+        "extractors_ms": {name: percentiles(values) for name, values in per_extractor.items()},
+    }
+
+def bench_result(texts: List[str], repeat: int = 1) -> dict:
+    """Custo por documento entre o fim do parse e os bytes da resposta.
+
+    ``compact`` é o caminho atual: o worker serializa o ``ParseResult`` com
+    orjson, a API valida uma vez ao montar o ``ParsedCV`` e a resposta sai
+    sem passar pelo ``response_model``. ``validated`` refaz os passos de
+    antes: o parser monta um modelo pydantic por skill/experiência (e cada
+    experiência duas vezes), o worker serializa com ``model_dump_json``, a
+    API valida o JSON de novo e o FastAPI revalida tudo contra o
+    ``response_model`` antes de serializar. O parse em si fica de fora.
+    """
+    import asyncio
+    from fastapi.routing import serialize_response
+    import cv_result
+    import main
+    from parser_runtime import get_parser
+    parser = get_parser()
+    with quiet():
+        results = [parser.parse_enhanced(text) for text in texts]
+    as_dicts = [cv_result.loads(cv_result.dumps(result)) for result in results]
+    response_field = next(route.response_field for route in main.app.routes if getattr(route, "path", "") == "/cv:parse-file")
+
+    def compact(result) -> bytes:
+        data = main.parsed_cv_from_json(cv_result.dumps(result))
+        item = main.ParseItem(file="cv.pdf", hash="0" * 64, data=data, confidence_overall=main.calculate_confidence(data), processing_ms=0)
+        return main.FastJSONResponse(item).body
+
+    def pydantic_result(d) -> "main.ParsedCV":
+        candidate = d["candidate"]
+        experiences = [main.Experience(**e) for e in d["experiences"]]
+        return main.ParsedCV(
+            candidate=main.Candidate(**{**candidate, "location": main.CandidateLocation(**candidate["location"]), "links": main.CandidateLinks(**candidate["links"])}),
+            summary=d["summary"],
+            skills=[main.Skill(**skill) for skill in d["skills"]],
+            languages=[main.Language(**language) for language in d["languages"]],
+            experiences=[main.Experience(**e.model_dump()) for e in experiences],
+            education=[main.Education(**e) for e in d["education"]],
+            certifications=d["certifications"],
+            meta=d["meta"],
+        )
+
+    async def validated(result_dict) -> bytes:
+        payload = pydantic_result(result_dict).model_dump_json(exclude_defaults=True)
+        data = main.ParsedCV.model_validate_json(payload)
+        item = main.ParseItem(file="cv.pdf", hash="0" * 64, data=data, confidence_overall=main.calculate_confidence(data), processing_ms=0)
+        content = await serialize_response(field=response_field, response_content=item)
+        return main.JSONResponse(content).body
+
+    async def run() -> Dict[str, List[float]]:
+        samples: Dict[str, List[float]] = {"compact": [], "validated": []}
+        for _ in range(repeat):
+            for result, result_dict in zip(results, as_dicts):
+                t = time.perf_counter()
+                compact(result)
+                samples["compact"].append((time.perf_counter() - t) * 1000)
+                t = time.perf_counter()
+                await validated(result_dict)
+                samples["validated"].append((time.perf_counter() - t) * 1000)
+        return samples
+
+    samples = asyncio.run(run())
+    compact_ms, validated_ms = percentiles(samples["compact"]), percentiles(samples["validated"])
+    return {
+        "docs": len(samples["compact"]),
+        "docs_per_sec": round(len(samples["compact"]) / (sum(samples["compact"]) / 1000), 2),
+        "latency_ms": compact_ms,
+        "validated_ms": validated_ms,
+        "speedup_p50": round(validated_ms["p50"] / max(compact_ms["p50"], 0.001), 1),
+    }
+
+class _DriveHandler(http.server.BaseHTTPRequestHandler):
+    """Serve PDFs em ``/uc?export=download&id=<nome>``, como o Google Drive"""
+    files: Dict[str, bytes] = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _file(self):
+        from urllib.parse import urlparse, parse_qs
+        parsed = urlparse(self.path)
+        return self.files.get(parse_qs(parsed.query).get("id", [""])[0]) if parsed.path == "/uc" else None
+
+    def _headers(self, data: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+
+    def do_HEAD(self):
+        data = self._file()
+        if data is None:
+            self.send_error(404)
+            return
+        self._headers(data)
+
+    def do_GET(self):
+        data = self._file()
+        if data is None:
+            self.send_error(404)
+            return
+        self._headers(data)
+        self.wfile.write(data)
+
+def bench_e2e(pdfs, concurrency: int) -> dict:
+    """Sobe a API em processo (TestClient) e um servidor local de PDFs"""
+    from fastapi.testclient import TestClient
+    import main
+
+    handler = type("Handler", (_DriveHandler,), {"files": {pdf.name: pdf.data for pdf in pdfs}})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/uc?export=download&id="
+
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    errors = 0
+    try:
+        with quiet(), TestClient(main.app) as client:
+            def one(pdf):
+                t = time.perf_counter()
+                response = client.post("/cv:parse-single-url-enhanced", json={"url": base + pdf.name, "include_timings": True})
+                return (time.perf_counter() - t) * 1000, response
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                for ms, response in pool.map(one, pdfs):
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                    latencies.append(ms)
+                    for stage, value in response.json()["data"]["meta"]["timings"]["stages"].items():
+                        stages.setdefault(stage, []).append(value)
+            elapsed = time.perf_counter() - started
+            engine = main.parse_engine.stats()
+    finally:
+        server.shutdown()
+    return {
+        "docs": len(pdfs),
+        "errors": errors,
+        "concurrency": concurrency,
+        "parse_engine": engine["mode"],
+        "docs_per_sec": round(len(pdfs) / elapsed, 2),
+        "latency_ms": percentiles(latencies),
+        "stages_ms": {stage: percentiles(values) for stage, values in stages.items()},
+    }
+
+class _Budget(Exception):
+    pass
+
+def _on_budget(signum, frame):
+    raise _Budget()
+
+def _capped_parse(parser, text: str, budget: float) -> dict:
+    """Roda o parse com limite de tempo real (só na thread principal, Unix);
+    um estouro aparece como ``timeout`` e o extrator em que parou"""
+    timings: Dict[str, float] = {}
+    use_timer = budget > 0 and hasattr(signal, "setitimer")
+    if use_timer:
+        previous = signal.signal(signal.SIGALRM, _on_budget)
+        signal.setitimer(signal.ITIMER_REAL, budget)
+    t = time.perf_counter()
+    try:
+        with quiet():
+            parser.parse_enhanced(text, timings=timings)
+        result = {"parse_ms": round((time.perf_counter() - t) * 1000, 1)}
+    except _Budget:
+        # O próximo extrator depois do último registrado é o que estourou
+        result = {"parse_ms": "timeout", "done": ",".join(timings) or "-"}
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    slowest = max(timings.items(), key=lambda kv: kv[1], default=None)
+    if slowest:
+        result["slowest"] = f"{slowest[0]}={slowest[1]:.1f}ms"
+    return result
+
+def bench_adversarial(seed: int, budget: float) -> dict:
+    from pdf_corpus import adversarial_pdfs, adversarial_texts
+    from pdf_text import read_pdf_text
+    from parser_runtime import get_parser
+    parser = get_parser()
+    out = {}
+    for pdf in adversarial_pdfs(seed):
+        t = time.perf_counter()
+        text = read_pdf_text(memoryview(pdf.data), blocks=[])
+        read_ms = (time.perf_counter() - t) * 1000
+        out[pdf.name] = {"pages": pdf.pages, "chars": len(text), "read_pdf_text_ms": round(read_ms, 1), **_capped_parse(parser, text, budget)}
+    for name, text in adversarial_texts(seed).items():
+        out[f"text-{name}"] = {"chars": len(text), **_capped_parse(parser, text, budget)}
+    return out
+
+# ===== baselines =====
+def _regressions(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Compara docs/s e p95 das etapas; retorna as linhas que pioraram além da tolerância"""
+    found = []
+    for stage in ("pdf", "parser", "result", "e2e"):
+        now, before = current.get(stage), baseline.get(stage)
+        if not now or not before:
+            continue
+        if now["docs_per_sec"] < before["docs_per_sec"] * (1 - tolerance):
+            found.append(f"{stage}: docs/s {before['docs_per_sec']} -> {now['docs_per_sec']}")
+        groups = [("latência", now.get("latency_ms", {}), before.get("latency_ms", {}))]
+        for key in ("extractors_ms", "stages_ms"):
+            for name, values in now.get(key, {}).items():
+                groups.append((name, values, before.get(key, {}).get(name, {})))
+        for name, values, old in groups:
+            # Abaixo de 0,05 ms a variação é ruído de medição
+            if old.get("p95") and values.get("p95", 0) > max(old["p95"] * (1 + tolerance), old["p95"] + 0.05):
+                found.append(f"{stage}/{name}: p95 {old['p95']} -> {values['p95']} ms")
+    for name, values in current.get("adversarial", {}).items():
+        old = baseline.get("adversarial", {}).get(name, {}).get("parse_ms")
+        now = values.get("parse_ms")
+        if old is None or old == "timeout":
+            continue
+        if now == "timeout" or now > max(old * (1 + tolerance), old + 5):
+            found.append(f"adversarial/{name}: {old} -> {now} ms")
+    return found
+
+def _print_report(results: dict):
+    for stage in ("pdf", "parser", "result", "e2e"):
+        data = results.get(stage)
+        if not data:
+            continue
+        lat = data["latency_ms"]
+        print(f"\n[{stage}] {data['docs']} docs, {data['docs_per_sec']} docs/s, p50 {lat.get('p50')} ms, p95 {lat.get('p95')} ms, p99 {lat.get('p99')} ms")
+        if "validated_ms" in data:
+            old = data["validated_ms"]
+            print(f"  com validação pydantic: p50 {old['p50']} ms, p95 {old['p95']} ms ({data['speedup_p50']}x no p50)")
+        for key in ("extractors_ms", "stages_ms"):
+            if key in data:
+                print(f"  {'':<16}{'p50':>10}{'p95':>10}{'p99':>10}")
+                for name, values in data[key].items():
+                    print(f"  {name:<16}{values['p50']:>10.3f}{values['p95']:>10.3f}{values['p99']:>10.3f}")
+    if results.get("adversarial"):
+        print("\n[adversarial]")
+        for name, values in results["adversarial"].items():
+            print(f"  {name:<24}" + ", ".join(f"{k}={v}" for k, v in values.items()))
+    print(f"\npico de RSS: {results['peak_rss_mb']} MB")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--stages", default="pdf,parser,result,e2e,adversarial", help="etapas separadas por vírgula")
+    ap.add_argument("--docs", type=int, default=40, help="PDFs sintéticos no corpus")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--experiences", default="", help="nº de experiências por CV, separado por vírgula (padrão: 2,4,8,16)")
+    ap.add_argument("--repeat", type=int, default=3, help="passadas do parser sobre o corpus")
+    ap.add_argument("--concurrency", type=int, default=8, help="pedidos simultâneos no e2e")
+    ap.add_argument("--adversarial-budget", type=float, default=10, help="segundos por entrada adversarial antes de marcar timeout")
+    ap.add_argument("--save", help="grava o resultado como baseline JSON")
+    ap.add_argument("--compare", help="baseline JSON para comparar")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="piora aceitável antes de acusar regressão (fração)")
+    args = ap.parse_args()
+
+    # Sem cache: cada pedido do e2e passa por download, extração e parse.
+    # Precisa vir antes de qualquer import do main (o parser importa o main)
+    for name in ("RESULT_CACHE_MAX_ITEMS", "URL_CACHE_MAX_ITEMS"):
+        os.environ[name] = "0"
+    for name in ("RESULT_CACHE_SQLITE_PATH", "URL_CACHE_SQLITE_PATH"):
+        os.environ[name] = ""
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(REPO_DIR)
+    from pdf_corpus import pdf_corpus
+    from pdf_text import read_pdf_text
+
+    stages = {s.strip() for s in args.stages.split(",") if s.strip()}
+    sizes = [int(n) for n in args.experiences.split(",") if n.strip()] or None
+    pdfs = list(pdf_corpus(args.docs, seed=args.seed, sizes=sizes))
+    results: dict = {
+        "config": {"docs": args.docs, "seed": args.seed, "experiences": args.experiences, "repeat": args.repeat,
+                   "concurrency": args.concurrency, "python": platform.python_version(), "cpus": os.cpu_count()},
+    }
+    if "pdf" in stages:
+        results["pdf"] = bench_pdf(pdfs)
+    texts = [read_pdf_text(memoryview(pdf.data)) for pdf in pdfs] if stages & {"parser", "result"} else []
+    if "parser" in stages:
+        results["parser"] = bench_parser(texts, args.repeat)
+    if "result" in stages:
+        results["result"] = bench_result(texts, args.repeat)
+    if "e2e" in stages:
+        results["e2e"] = bench_e2e(pdfs, args.concurrency)
+    if "adversarial" in stages:
+        results["adversarial"] = bench_adversarial(args.seed, args.adversarial_budget)
+    results["peak_rss_mb"] = peak_rss_mb()
+
+    _print_report(results)
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"baseline salvo em {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = _regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSÕES (tolerância {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nsem regressões em relação a {args.compare}")
+
+if __name__ == "__main__":
+    main()
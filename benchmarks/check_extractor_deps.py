@@ -0,0 +1,116 @@
+"""Confere ``EXTRACTOR_DEPENDS`` (enhanced_parser.py) contra o que cada extrator usa de fato.
+
+    python benchmarks/check_extractor_deps.py
+    python benchmarks/check_extractor_deps.py --docs 40 --pdfs 6
+
+Roda o ``parse_enhanced`` sobre o corpus sintético (texto e, com ``--pdfs``,
+PDFs com layout) registrando os atributos do ``ParsedDocument`` e do
+``EnhancedParser`` lidos entre dois ``clock.lap``: cada intervalo é um
+extrator. Os atributos em ``OWNED`` são mantidos por um extrator (índice de
+skills, e-mails, URLs...); se outro extrator lê um deles sem estar no fecho de
+``EXTRACTOR_DEPENDS`` do dono, o replay do text_store reaproveitaria um campo
+desatualizado quando só a versão do dono sobe.
+
+Sai com código 1 se faltar alguma dependência.
+"""
+import argparse
+import contextlib
+import os
+import sys
+from typing import Dict, Set, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# Atributos (do documento ou do parser) que pertencem a cada extrator. O
+# ``skill_matcher`` do documento não entra: todo recorte de seção o repassa,
+# mas só quem lê o índice de skills depende do vocabulário
+OWNED: Dict[str, Set[str]] = {
+    "skills": {
+        "_skill_positions", "skill_hits", "skills_in_span", "line_techs", "techs_near_lines",
+        "enhanced_skills", "_skill_order", "_skill_matcher", "_extract_technologies",
+        "skill_level_indicators", "_level_matcher", "_level_rank", "_level_names",
+    },
+    "contacts": {"emails", "phones"},
+    "links": {
+        "urls", "first_url_in_span",
+        "_extract_first_url_by_domain", "_extract_portfolio_url", "_ensure_http", "_strip_url_trailing",
+    },
+}
+
+@contextlib.contextmanager
+def traced(classes, stage_clock):
+    """Registra ``(extrator, atributo)`` para cada leitura de atributo das classes indicadas"""
+    reads: Set[Tuple[str, str]] = set()
+    pending: Set[str] = set()
+    originals = [(cls, cls.__getattribute__) for cls in classes]
+    original_lap = stage_clock.lap
+
+    def make_getattribute(original):
+        def __getattribute__(self, name):
+            pending.add(name)
+            return original(self, name)
+        return __getattribute__
+
+    def lap(self, stage):
+        reads.update((stage, name) for name in pending)
+        pending.clear()
+        return original_lap(self, stage)
+
+    for cls, original in originals:
+        cls.__getattribute__ = make_getattribute(original)
+    stage_clock.lap = lap
+    try:
+        yield reads
+    finally:
+        for cls, original in originals:
+            cls.__getattribute__ = original
+        stage_clock.lap = original_lap
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--docs", type=int, default=24, help="CVs de texto do corpus sintético")
+    ap.add_argument("--pdfs", type=int, default=0, help="PDFs sintéticos lidos com layout (precisa do PyMuPDF)")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, REPO_DIR)
+    from corpus import synthetic_corpus
+    import enhanced_parser as ep
+    from cv_document import ParsedDocument
+    from timings import StageClock
+
+    parser = ep.EnhancedParser()
+    inputs = [{"text": text} for text in synthetic_corpus(args.docs, seed=args.seed)]
+    if args.pdfs:
+        from pdf_corpus import pdf_corpus
+        from pdf_text import read_pdf_text
+        for pdf in pdf_corpus(args.pdfs, seed=args.seed):
+            blocks: list = []
+            text = read_pdf_text(memoryview(pdf.data), blocks=blocks)
+            inputs.append({"text": text, "blocks": blocks})
+
+    with traced((ParsedDocument, ep.EnhancedParser), StageClock) as reads:
+        for kwargs in inputs:
+            parser.parse_enhanced(timings={}, **kwargs)
+
+    failures = []
+    for owner, attrs in sorted(OWNED.items()):
+        # O que o replay refaz quando só a versão do dono sobe
+        versions = parser.extractor_versions()
+        allowed = ep.changed_extractors(versions, {**versions, owner: versions[owner] + 1})
+        for stage, attr in sorted(reads):
+            if stage in ep.EXTRACTORS and attr in attrs and stage not in allowed:
+                failures.append(f"{stage} lê {attr} ({owner}): falta \"{owner}\" -> \"{stage}\" em EXTRACTOR_DEPENDS")
+
+    print(f"{len(inputs)} documentos, {len(reads)} leituras por extrator")
+    for failure in failures:
+        print(f"FALHOU  {failure}")
+    if failures:
+        return 1
+    print("ok: EXTRACTOR_DEPENDS cobre as leituras observadas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# Gerador determinístico de CVs sintéticos (PT/EN) para benchmarks
+import random
+from typing import Iterator, List, Optional
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Felipe", "Gabriela", "Henrique", "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael"]
+LAST_NAMES = ["Silva", "Souza", "Oliveira", "Pereira", "Costa", "Rodrigues", "Almeida", "Nascimento", "Lima", "Araújo", "Fernandes", "Carvalho", "Gomes", "Martins"]
+COMPANIES = ["Acme Tecnologia", "Nuvem Sistemas", "Banco Horizonte", "Varejo Digital", "Logística Express", "Saúde Mais", "Fintech Aurora", "Agro Dados", "Telecom Sul", "Editora Atlas"]
+ROLES_PT = ["Desenvolvedor Backend", "Desenvolvedora Full Stack", "Analista de Sistemas", "Gerente de Projetos", "Coordenador de TI", "Engenheiro de Dados"]
+ROLES_EN = ["Backend Developer", "Full Stack Developer", "Systems Analyst", "Project Manager", "Data Engineer", "Engineering Coordinator"]
+TECHS = ["Java", "Python", "JavaScript", "TypeScript", "Go", "C#", "Spring", "React", "Angular", "Node.js", "Django", "FastAPI", "PostgreSQL", "MySQL", "MongoDB", "Redis", "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Jenkins", "Git", "Jira", "Scrum", "Kanban", "CI/CD", "TDD"]
+CITIES = [("Blumenau", "SC"), ("Curitiba", "PR"), ("Campinas", "SP"), ("Recife", "PE"), ("Porto Alegre", "RS"), ("Belo Horizonte", "MG")]
+UNIVERSITIES = ["Universidade Federal de Santa Catarina", "Universidade de São Paulo", "Universidade Regional de Blumenau", "Instituto Federal do Paraná"]
+DEGREES_PT = ["Bacharelado em Ciência da Computação", "Bacharelado em Sistemas de Informação", "Mestrado em Engenharia de Software"]
+DEGREES_EN = ["Bachelor of Computer Science", "Bachelor of Information Systems", "Master of Software Engineering"]
+VERBS_PT = ["Implementei", "Desenvolvi", "Liderei", "Migrei", "Otimizei", "Automatizei", "Criei"]
+VERBS_EN = ["Implemented", "Developed", "Led", "Migrated", "Optimized", "Automated", "Built"]
+OBJECTS_PT = ["o sistema de pagamentos", "a plataforma de dados", "o aplicativo de vendas", "a esteira de deploy", "o projeto de observabilidade", "a API de cadastro"]
+OBJECTS_EN = ["the payments system", "the data platform", "the sales app", "the deployment pipeline", "the observability project", "the onboarding API"]
+
+SECTION_TITLES = {
+    "pt": {"summary": "Resumo", "experience": "Experiência Profissional", "education": "Formação", "skills": "Competências", "languages": "Idiomas", "projects": "Projetos", "certs": "Certificações"},
+    "en": {"summary": "Summary", "experience": "Experience", "education": "Education", "skills": "Skills", "languages": "Languages", "projects": "Projects", "certs": "Certifications"},
+}
+
+def _bullet(rng: random.Random, lang: str, techs: List[str]) -> str:
+    verbs, objects = (VERBS_PT, OBJECTS_PT) if lang == "pt" else (VERBS_EN, OBJECTS_EN)
+    joiner = " com " if lang == "pt" else " with "
+    gain = rng.choice(["30%", "40%", "2x", "10x"])
+    tail = f", reduzindo custos em {gain}." if lang == "pt" else f", cutting costs by {gain}."
+    return f"- {rng.choice(verbs)} {rng.choice(objects)}{joiner}{', '.join(techs)}{tail}"
+
+def generate_cv_text(
+    rng: random.Random,
+    lang: str = "pt",
+    experiences: int = 3,
+    bullets_per_experience: int = 3,
+    skill_density: int = 3,
+) -> str:
+    """Gera o texto de um CV com seções típicas.
+
+    ``experiences`` e ``bullets_per_experience`` controlam o tamanho do
+    documento; ``skill_density`` é o nº de tecnologias citadas por bullet.
+    """
+    titles = SECTION_TITLES[lang]
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    city, state = rng.choice(CITIES)
+    slug = f"{first}.{last}".lower().replace("ã", "a").replace("é", "e").replace("á", "a").replace("í", "i").replace("ú", "u")
+    lines = [
+        f"{first} {last}",
+        f"{slug}@email.com | ({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+        f"linkedin.com/in/{slug.replace('.', '-')} | github.com/{slug.replace('.', '')}",
+        f"{city}, {state}",
+        "",
+        titles["summary"],
+    ]
+    if lang == "pt":
+        lines.append(f"Profissional com {rng.randint(3, 15)} anos de experiência em desenvolvimento de software, atuando com {', '.join(rng.sample(TECHS, 3))} em projetos de grande escala.")
+    else:
+        lines.append(f"Engineer with {rng.randint(3, 15)} years of experience building software with {', '.join(rng.sample(TECHS, 3))} on large scale projects.")
+    lines += ["", titles["experience"]]
+    roles = ROLES_PT if lang == "pt" else ROLES_EN
+    year = 2024
+    for _ in range(experiences):
+        start = year - rng.randint(1, 4)
+        company, role = rng.choice(COMPANIES), rng.choice(roles)
+        lines.append(f"{company}: {role}")
+        lines.append(f"{start} - {year}")
+        for _ in range(bullets_per_experience):
+            lines.append(_bullet(rng, lang, rng.sample(TECHS, min(skill_density, len(TECHS)))))
+        lines.append("")
+        year = start
+    lines.append(titles["education"])
+    degrees = DEGREES_PT if lang == "pt" else DEGREES_EN
+    lines.append(f"{rng.choice(UNIVERSITIES)}, {rng.choice(degrees)}")
+    lines += ["", titles["skills"], ", ".join(rng.sample(TECHS, min(8 + skill_density, len(TECHS)))), ""]
+    lines.append(titles["languages"])
+    if lang == "pt":
+        lines.append(f"Inglês {rng.choice(['avançado', 'intermediário', 'fluente'])}, Português nativo")
+    else:
+        lines.append(f"English {rng.choice(['advanced', 'intermediate', 'fluent'])}, Portuguese native")
+    lines += ["", titles["projects"]]
+    for _ in range(max(1, experiences // 2)):
+        name = rng.choice(["CVRADAR", "DATAHUB", "PAYFLOW", "SHOPLY"])
+        lines.append(f"- Projeto {name}: aplicação web com {', '.join(rng.sample(TECHS, 2))}" if lang == "pt" else f"- Project {name}: web app built with {', '.join(rng.sample(TECHS, 2))}")
+    lines += ["", titles["certs"], f"AWS Certified Solutions Architect {rng.randint(2018, 2024)}"]
+    return "\n".join(lines) + "\n"
+
+def synthetic_corpus(n: int, seed: int = 42, sizes: Optional[List[int]] = None) -> Iterator[str]:
+    """Gera ``n`` CVs variando idioma, tamanho e densidade de skills"""
+    rng = random.Random(seed)
+    sizes = sizes or [2, 4, 8]
+    for i in range(n):
+        yield generate_cv_text(
+            rng,
+            lang="pt" if i % 2 == 0 else "en",
+            experiences=sizes[i % len(sizes)],
+            bullets_per_experience=rng.randint(2, 5),
+            skill_density=rng.randint(1, 5),
+        )
@@ -0,0 +1,207 @@
+"""Fuzz de desempenho dos regex do parser: entradas patológicas devem crescer linearmente.
+
+    python benchmarks/fuzz_regex.py                  # famílias fixas + 30 casos aleatórios
+    python benchmarks/fuzz_regex.py --size 50000 --random 100 --seed 7
+
+Para cada padrão compilado em ``enhanced_parser`` e ``cv_document`` (e os
+matchers de skills/níveis), roda ``finditer`` sobre cada família de entrada
+com tamanho ``n`` e ``4n``. Um padrão linear leva ~4x mais tempo; backtracking
+quadrático, ~16x. Cada tamanho vale a menor de ``--repeat`` medições; um par
+que passa de ``--max-ratio`` (com tempo acima de ``--noise-ms``) é remedido com
+``--confirm-repeat`` amostras e só falha se a razão se confirmar. Também falha
+se uma medição estourar ``--timeout``. Depois roda o
+``parse_enhanced`` inteiro em cada família e falha se passar de ``--parse-limit``
+(também remedido antes de falhar).
+
+Sai com código 1 se algo falhar, então serve de verificação antes de mudar um padrão.
+"""
+import argparse
+import os
+import random
+import re
+import signal
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# Famílias de entrada: cada uma recebe o tamanho aproximado em caracteres
+FAMILIES: Dict[str, Callable[[int], str]] = {
+    "repeated_char": lambda n: "a" * n,
+    "capitalized_words": lambda n: ("Aaaa " * (n // 5 + 1))[:n],
+    "word_lines": lambda n: ("Aaaa Bbbb\n" * (n // 10 + 1))[:n],
+    "dash_runs": lambda n: ("-" * 200 + "\n") * (n // 201 + 1),
+    "bullet_runs": lambda n: "• " * (n // 2),
+    "bullets_no_stop": lambda n: ("- projeto sistema app " * (n // 22 + 1))[:n],
+    "newlines": lambda n: "\n" * n,
+    "blank_lines": lambda n: " \n" * (n // 2),
+    "dots": lambda n: "." * n,
+    "ellipsis_lines": lambda n: ("Aaaa.. bbb\n" * (n // 11 + 1))[:n],
+    "digits": lambda n: "9" * n,
+    "phone_like": lambda n: ("55 " * (n // 3 + 1))[:n],
+    "at_signs": lambda n: "a@" * (n // 2),
+    "email_no_tld": lambda n: ("aaaa@bbbb " * (n // 10 + 1))[:n],
+    "url_token": lambda n: ("https://a" * (n // 9 + 1))[:n],
+    "url_no_newline": lambda n: ("https://exemplo.com/x " * (n // 22 + 1))[:n],
+    "colons": lambda n: ("Aaaa: " * (n // 6 + 1))[:n],
+    "role_keywords": lambda n: ("Analista Gerente " * (n // 17 + 1))[:n],
+    "comma_words": lambda n: ("Aaaa, " * (n // 6 + 1))[:n],
+    "label_spaces": lambda n: "resumo" + " " * n,
+    "quotes": lambda n: '"a' * (n // 2),
+}
+
+# Alfabeto dos casos aleatórios: caracteres que os padrões tratam de forma especial
+_ALPHABET = list("aAbZ9 \n\t.,:;-•·–—@/()\"'!?") + ["http://", "www.", "55", "..", "projeto", "Analista", "SC"]
+
+def random_case(rng: random.Random, n: int) -> str:
+    """Repetição de um fragmento aleatório curto: o formato que mais expõe backtracking"""
+    fragment = "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(1, 6)))
+    return (fragment * (n // len(fragment) + 1))[:n]
+
+def collect_patterns(parser) -> Dict[str, "re.Pattern[str]"]:
+    import cv_document
+    import enhanced_parser
+    patterns: Dict[str, "re.Pattern[str]"] = {}
+    for module in (cv_document, enhanced_parser):
+        for name, value in vars(module).items():
+            if isinstance(value, re.Pattern):
+                patterns[name] = value
+            elif isinstance(value, tuple):
+                for i, item in enumerate(value):
+                    if isinstance(item, tuple) and item and isinstance(item[0], re.Pattern):
+                        item = item[0]
+                    if isinstance(item, re.Pattern):
+                        patterns[f"{name}[{i}]"] = item
+    patterns["skill_matcher"] = parser._skill_matcher.regex
+    patterns["level_matcher"] = parser._level_matcher.regex
+    blocklist = parser.rules.current().project_name_blocklist
+    if blocklist is not None:
+        patterns["project_name_blocklist"] = blocklist
+    return patterns
+
+class _Timeout(Exception):
+    pass
+
+def _on_timeout(signum, frame):
+    raise _Timeout()
+
+def timed(fn: Callable[[], object], timeout: float) -> Optional[float]:
+    """Duração em ms, ou None se passou de ``timeout`` segundos"""
+    previous = signal.signal(signal.SIGALRM, _on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    started = time.perf_counter()
+    try:
+        fn()
+        return (time.perf_counter() - started) * 1000
+    except _Timeout:
+        return None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def _exhaust(pattern: "re.Pattern[str]", text: str):
+    for _ in pattern.finditer(text):
+        pass
+
+def best_of(fn: Callable[[], object], timeout: float, repeat: int) -> Optional[float]:
+    """Menor de ``repeat`` medições, para o ruído não virar falso positivo"""
+    times = []
+    for _ in range(repeat):
+        elapsed = timed(fn, timeout)
+        if elapsed is None:
+            return None
+        times.append(elapsed)
+    return min(times)
+
+def measure(pattern: "re.Pattern[str]", small: str, large: str, timeout: float, repeat: int) -> Tuple[Optional[float], Optional[float]]:
+    """Tempos (ms) do ``finditer`` em ``n`` e ``4n``; None se estourou ``timeout``"""
+    t_small = best_of(lambda: _exhaust(pattern, small), timeout, repeat)
+    t_large = best_of(lambda: _exhaust(pattern, large), timeout, repeat) if t_small is not None else None
+    return t_small, t_large
+
+def check_patterns(patterns, cases: Dict[str, Callable[[int], str]], size: int, max_ratio: float, noise_ms: float, timeout: float,
+                   repeat: int, confirm_repeat: int) -> List[str]:
+    failures = []
+    for case_name, make in cases.items():
+        small, large = make(size), make(size * 4)
+        for pattern_name, pattern in patterns.items():
+            t_small, t_large = measure(pattern, small, large, timeout, repeat)
+            if t_small is None or t_large is None:
+                failures.append(f"{pattern_name} x {case_name}: passou de {timeout:g}s")
+                continue
+            ratio = t_large / max(t_small, 0.001)
+            if t_large > noise_ms and ratio > max_ratio:
+                # Um pico de ruído (GC, escalonador) na medição de 4n basta para
+                # passar da razão: só falha se a remedição com mais amostras confirmar
+                t_small, t_large = measure(pattern, small, large, timeout, confirm_repeat)
+                if t_small is None or t_large is None:
+                    failures.append(f"{pattern_name} x {case_name}: passou de {timeout:g}s")
+                    continue
+                ratio = t_large / max(t_small, 0.001)
+                if t_large > noise_ms and ratio > max_ratio:
+                    failures.append(f"{pattern_name} x {case_name}: {t_small:.1f}ms -> {t_large:.1f}ms (x{ratio:.1f} para 4x o tamanho)")
+    return failures
+
+def check_parser(parser, cases: Dict[str, Callable[[int], str]], size: int, limit_ms: float, confirm_repeat: int) -> Tuple[List[str], Dict[str, float]]:
+    failures, results = [], {}
+    for case_name, make in cases.items():
+        text = make(size)
+        timeout = limit_ms / 1000 * 5
+        elapsed = timed(lambda: parser.parse_enhanced(text), timeout)
+        if elapsed is not None and elapsed > limit_ms:
+            # Mesmo critério dos padrões: uma medição lenta isolada é remedida
+            elapsed = best_of(lambda: parser.parse_enhanced(text), timeout, max(confirm_repeat // 3, 1))
+        results[case_name] = elapsed
+        if elapsed is None or elapsed > limit_ms:
+            shown = "timeout" if elapsed is None else f"{elapsed:.0f}ms"
+            failures.append(f"parse_enhanced x {case_name}: {shown} (limite {limit_ms:g}ms)")
+    return failures, results
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size", type=int, default=20000, help="tamanho base (caracteres); cada padrão também roda com 4x")
+    ap.add_argument("--random", type=int, default=30, help="casos aleatórios além das famílias fixas")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--max-ratio", type=float, default=8.0, help="razão máxima de tempo entre 4n e n")
+    ap.add_argument("--noise-ms", type=float, default=20.0, help="abaixo disso (ms em 4n) a razão não é considerada")
+    ap.add_argument("--repeat", type=int, default=3, help="medições por tamanho (vale a menor)")
+    ap.add_argument("--confirm-repeat", type=int, default=9, help="medições ao remedir um padrão que passou da razão")
+    ap.add_argument("--timeout", type=float, default=5.0, help="segundos por medição de padrão")
+    ap.add_argument("--parse-size", type=int, default=200000, help="tamanho das entradas do parse_enhanced")
+    ap.add_argument("--parse-limit", type=float, default=5000, help="ms máximos do parse_enhanced por entrada")
+    args = ap.parse_args()
+
+    sys.path.insert(0, REPO_DIR)
+    # Sem prazo de regex: aqui interessa o custo real de cada padrão
+    os.environ.setdefault("CV_REGEX_BUDGET_MS", "0")
+    from parser_runtime import get_parser
+    parser = get_parser()
+
+    rng = random.Random(args.seed)
+    cases = dict(FAMILIES)
+    for i in range(args.random):
+        seed = rng.randrange(1 << 30)
+        cases[f"random-{i}"] = lambda n, seed=seed: random_case(random.Random(seed), n)
+
+    patterns = collect_patterns(parser)
+    print(f"{len(patterns)} padrões x {len(cases)} entradas (n={args.size} e {args.size * 4})")
+    failures = check_patterns(patterns, cases, args.size, args.max_ratio, args.noise_ms, args.timeout,
+                              args.repeat, args.confirm_repeat)
+
+    parse_failures, results = check_parser(parser, FAMILIES, args.parse_size, args.parse_limit, args.confirm_repeat)
+    failures += parse_failures
+    print(f"\nparse_enhanced (n={args.parse_size}):")
+    for case_name, elapsed in results.items():
+        print(f"  {case_name:20s} {'timeout' if elapsed is None else f'{elapsed:8.1f}ms'}")
+
+    if failures:
+        print("\nFALHAS:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nok: todos os padrões cresceram linearmente")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Corpus de PDFs sintéticos (PT/EN) gerados com PyMuPDF, mais entradas adversariais
+import random
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from corpus import SECTION_TITLES, generate_cv_text
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 em pontos
+MARGIN = 50
+LAYOUTS = ("single", "two_column", "dense")
+
+_ALL_TITLES = {title for titles in SECTION_TITLES.values() for title in titles.values()}
+# Seções que vão para a barra lateral no layout de duas colunas
+_SIDEBAR_KEYS = ("skills", "languages")
+
+@dataclass
+class SyntheticPDF:
+    name: str
+    kind: str    # layout ("single", "two_column", "dense") ou o nome da entrada adversarial
+    lang: str
+    data: bytes
+    pages: int
+
+def _wrap(line: str, fontname: str, fontsize: float, width: float) -> List[str]:
+    if fitz.get_text_length(line, fontname=fontname, fontsize=fontsize) <= width:
+        return [line]
+    out, current = [], ""
+    for word in line.split(" "):
+        candidate = f"{current} {word}" if current else word
+        if current and fitz.get_text_length(candidate, fontname=fontname, fontsize=fontsize) > width:
+            out.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        out.append(current)
+    return out
+
+class _Writer:
+    """Escreve linhas em uma coluna, abrindo páginas novas quando ela enche"""
+
+    def __init__(self, doc: "fitz.Document", x0: float, x1: float, fontsize: float, page_no: int = 0):
+        self.doc = doc
+        self.x0, self.x1 = x0, x1
+        self.fontsize = fontsize
+        self.page_no = page_no
+        self.y = MARGIN
+
+    def _page(self) -> "fitz.Page":
+        while self.doc.page_count <= self.page_no:
+            self.doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        return self.doc[self.page_no]
+
+    def write(self, line: str):
+        is_title = line.strip() in _ALL_TITLES
+        fontname = "hebo" if is_title else "helv"
+        fontsize = self.fontsize * 1.4 if is_title else self.fontsize
+        for part in _wrap(line, fontname, fontsize, self.x1 - self.x0) if line else [""]:
+            if self.y + fontsize * 1.4 > PAGE_HEIGHT - MARGIN:
+                self.page_no += 1
+                self.y = MARGIN
+            if part:
+                self._page().insert_text((self.x0, self.y + fontsize), part, fontname=fontname, fontsize=fontsize)
+            self.y += fontsize * 1.4
+
+def _split_sidebar(text: str) -> Tuple[List[str], List[str]]:
+    """Separa as seções da barra lateral (skills, idiomas) do conteúdo principal"""
+    sidebar_titles = {SECTION_TITLES[lang][key] for lang in SECTION_TITLES for key in _SIDEBAR_KEYS}
+    main: List[str] = []
+    sidebar: List[str] = []
+    current = main
+    for line in text.splitlines():
+        if line.strip() in _ALL_TITLES:
+            current = sidebar if line.strip() in sidebar_titles else main
+        current.append(line)
+    return main, sidebar
+
+def render_pdf(text: str, layout: str = "single") -> bytes:
+    """Renderiza o texto de um CV como PDF: títulos de seção em negrito e maiores"""
+    doc = fitz.open()
+    if layout == "two_column":
+        main, sidebar = _split_sidebar(text)
+        main_writer = _Writer(doc, 200, PAGE_WIDTH - MARGIN, 10)
+        for line in main:
+            main_writer.write(line)
+        side_writer = _Writer(doc, MARGIN, 180, 9)
+        for line in sidebar:
+            side_writer.write(line)
+    else:
+        writer = _Writer(doc, MARGIN, PAGE_WIDTH - MARGIN, 8 if layout == "dense" else 10)
+        for line in text.splitlines():
+            writer.write(line)
+    if doc.page_count == 0:
+        doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+def _page_count(data: bytes) -> int:
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return doc.page_count
+
+def pdf_corpus(n: int, seed: int = 42, sizes: Optional[List[int]] = None) -> Iterator[SyntheticPDF]:
+    """``n`` PDFs variando idioma, tamanho, densidade de skills e layout"""
+    rng = random.Random(seed)
+    sizes = sizes or [2, 4, 8, 16]
+    for i in range(n):
+        lang = "pt" if i % 2 == 0 else "en"
+        layout = LAYOUTS[i % len(LAYOUTS)]
+        text = generate_cv_text(
+            rng,
+            lang=lang,
+            experiences=sizes[i % len(sizes)],
+            bullets_per_experience=rng.randint(2, 5),
+            skill_density=rng.randint(1, 5),
+        )
+        data = render_pdf(text, layout)
+        yield SyntheticPDF(f"cv-{i:04d}-{lang}-{layout}", layout, lang, data, _page_count(data))
+
+# ===== entradas adversariais =====
+def adversarial_pdfs(seed: int = 42) -> List[SyntheticPDF]:
+    """PDFs que estressam a extração: muito longo, só páginas vazias, página com
+    texto miúdo, duas colunas intercaladas linha a linha no arquivo"""
+    rng = random.Random(seed)
+    out = []
+
+    long_text = generate_cv_text(rng, "pt", experiences=600, bullets_per_experience=5, skill_density=4)
+    data = render_pdf(long_text)
+    out.append(SyntheticPDF("adv-100-pages", "100_pages", "pt", data, _page_count(data)))
+
+    # Portfólio escaneado: uma página de CV seguida de páginas sem texto
+    doc = fitz.open(stream=render_pdf(generate_cv_text(rng, "pt")), filetype="pdf")
+    for _ in range(50):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.draw_rect(fitz.Rect(MARGIN, MARGIN, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - MARGIN), color=(0.2, 0.2, 0.2), fill=(0.9, 0.9, 0.9))
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    out.append(SyntheticPDF("adv-blank-pages", "blank_pages", "pt", data, _page_count(data)))
+
+    doc = fitz.open()
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    words = generate_cv_text(rng, "en", experiences=40).split()
+    page.insert_textbox(fitz.Rect(10, 10, PAGE_WIDTH - 10, PAGE_HEIGHT - 10), " ".join(words), fontsize=3)
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    out.append(SyntheticPDF("adv-tiny-font-wall", "tiny_font_wall", "en", data, 1))
+
+    # Barra lateral e coluna principal escritas alternadamente: sem ordem de
+    # leitura por colunas o texto sai misturado linha a linha
+    main, sidebar = _split_sidebar(generate_cv_text(rng, "pt", experiences=8))
+    doc = fitz.open()
+    main_writer = _Writer(doc, 200, PAGE_WIDTH - MARGIN, 10)
+    side_writer = _Writer(doc, MARGIN, 180, 9)
+    for i in range(max(len(main), len(sidebar))):
+        if i < len(sidebar):
+            side_writer.write(sidebar[i])
+        if i < len(main):
+            main_writer.write(main[i])
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    out.append(SyntheticPDF("adv-interleaved-columns", "interleaved_columns", "pt", data, _page_count(data)))
+    return out
+
+def adversarial_texts(seed: int = 42) -> Dict[str, str]:
+    """Textos que estressam o parser direto (sem PDF)"""
+    rng = random.Random(seed)
+    cv = generate_cv_text(rng, "pt", experiences=20)
+    return {
+        "no_newline": cv.replace("\n", " "),
+        "huge_line": " ".join(generate_cv_text(rng, "en", experiences=200).split()),
+        "repeated_char": "a" * 200_000,
+        "dash_runs": ("-" * 500 + "\n") * 400,
+        "url_flood": " ".join(f"https://exemplo{i}.com/portfolio/{'x' * 40}" for i in range(5000)),
+        "email_flood": " ".join(f"pessoa{i}@{'sub.' * 10}exemplo.com" for i in range(5000)),
+        "heading_flood": "\n".join(rng.choice(sorted(_ALL_TITLES)).upper() for _ in range(20000)),
+    }
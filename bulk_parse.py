@@ -0,0 +1,554 @@
+# Parse em massa fora da API: reprocessa um acervo de PDFs (diretório, glob
+# ou manifesto JSONL) em todos os núcleos, com checkpoint para retomar
+#
+#   python bulk_parse.py /acervo/cvs --output cvs.jsonl --text-store textos.sqlite
+#   python bulk_parse.py "/acervo/**/*.pdf" manifesto.jsonl --output cvs.parquet --workers 16
+#   python bulk_parse.py --replay --text-store textos.sqlite --output cvs-v6.jsonl
+import os
+import sys
+import glob
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import pathlib
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+import cv_result
+import parser_runtime
+from cv_logging import configure_logging, get_logger, log_event
+from enhanced_parser import changed_extractors
+from http_client import HTTP_USER_AGENT, normalize_pdf_url
+from parse_engine import ParseTimeout, init_worker, parse_with_cpu_limit
+from pdf_buffer import PDFBuffer
+from result_cache import make_cache_key
+from text_store import PackedText, StoredText, TextStore, pack_result, pack_text
+
+log = get_logger("bulk")
+
+# ===== config =====
+MAX_PDF_BYTES = int(os.getenv("MAX_PDF_BYTES", str(25 * 1024 * 1024)))
+PARSE_JOB_TIMEOUT_SECONDS = float(os.getenv("PARSE_JOB_TIMEOUT_SECONDS", "20"))
+DOWNLOAD_TIMEOUT = (10, 30)  # (conexão, leitura) em segundos
+READ_CHUNK_BYTES = 1024 * 1024
+# Documentos enviados aos workers por vez, além dos que estão rodando
+PENDING_PER_WORKER = 4
+# Um worker que morre (falta de memória, PDF que derruba o MuPDF) derruba o
+# pool inteiro: os documentos em andamento voltam para a fila até este limite
+MAX_ATTEMPTS = 2
+
+class BulkError(Exception):
+    """Entrada, saída ou estado de checkpoint inválidos"""
+
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+# ===== entradas =====
+def _manifest_sources(path: str) -> Iterator[str]:
+    """Uma origem por linha: ``"caminho"``, ``{"path": ...}`` ou ``{"url": ...}``;
+    caminhos relativos partem do diretório do manifesto"""
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                raise BulkError(f"{path}:{line_no}: JSON inválido ({e})") from e
+            if isinstance(entry, dict):
+                entry = entry.get("url") or entry.get("path")
+            if not isinstance(entry, str) or not entry.strip():
+                raise BulkError(f"{path}:{line_no}: esperado um caminho, {{\"path\": ...}} ou {{\"url\": ...}}")
+            entry = entry.strip()
+            yield entry if _is_url(entry) else os.path.normpath(os.path.join(base, entry))
+
+def iter_sources(specs: List[str]) -> Iterator[str]:
+    """Expande diretórios (recursivo, ``*.pdf``), globs e manifestos ``.jsonl`` em
+    caminhos absolutos e URLs, em ordem estável (a mesma a cada retomada)"""
+    for spec in specs:
+        if _is_url(spec):
+            yield spec
+        elif os.path.isdir(spec):
+            for root, dirs, files in os.walk(spec):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        yield os.path.abspath(os.path.join(root, name))
+        elif spec.lower().endswith((".jsonl", ".ndjson")) and os.path.isfile(spec):
+            yield from _manifest_sources(spec)
+        elif glob.has_magic(spec):
+            for path in sorted(glob.iglob(spec, recursive=True)):
+                if os.path.isfile(path):
+                    yield os.path.abspath(path)
+        else:
+            # Arquivo avulso; se não existir, vira erro no estado como os outros
+            yield os.path.abspath(spec)
+
+# ===== lado do processo worker =====
+@dataclass
+class SourceResult:
+    source: str
+    status: str  # parsed | duplicate | error
+    sha256: Optional[str] = None
+    parser_version: Optional[str] = None
+    line: Optional[bytes] = None
+    error: Optional[str] = None
+    # Para o text_store (gravado pelo processo principal): texto novo e resultado
+    text: Optional[PackedText] = None
+    result: Optional[bytes] = None
+
+_seen_db: Optional[sqlite3.Connection] = None
+_text_store: Optional[TextStore] = None
+
+def _init_bulk_worker(state_path: str, text_store_path: Optional[str], codec: str):
+    """Parser aquecido (como no motor de parse) + leitura do estado, para não
+    refazer o parse de conteúdo que já está na saída, e do text_store"""
+    global _seen_db, _text_store
+    init_worker()
+    _seen_db = sqlite3.connect(pathlib.Path(state_path).resolve().as_uri() + "?mode=ro", uri=True)
+    if text_store_path:
+        _text_store = TextStore(text_store_path, codec, readonly=True)
+
+def _parser_version() -> str:
+    return parser_runtime.get_parser().parser_version
+
+def _load(source: str, buffer: PDFBuffer):
+    """Lê o arquivo ou baixa a URL para o buffer (limite de tamanho e assinatura %PDF)"""
+    if _is_url(source):
+        with requests.get(
+            normalize_pdf_url(source), stream=True, timeout=DOWNLOAD_TIMEOUT, headers={"User-Agent": HTTP_USER_AGENT},
+        ) as response:
+            response.raise_for_status()
+            content_length = response.headers.get("Content-Length")
+            buffer.check_declared_size(int(content_length) if content_length and content_length.isdigit() else None)
+            for chunk in response.iter_content(READ_CHUNK_BYTES):
+                buffer.write(chunk)
+        return
+    with open(source, "rb") as f:
+        buffer.check_declared_size(os.fstat(f.fileno()).st_size)
+        for chunk in iter(lambda: f.read(READ_CHUNK_BYTES), b""):
+            buffer.write(chunk)
+
+def _source_filename(source: str) -> str:
+    name = os.path.basename(urlparse(source).path if _is_url(source) else source)
+    return name or "pdf.pdf"
+
+def _parse_text(raw_text: str, blocks: list, stored: Optional[StoredText], cpu_timeout: float) -> Tuple[cv_result.ParseResult, Dict[str, Any]]:
+    """Parse com o limite de CPU; com um resultado anterior no text_store, só os
+    extratores cuja versão mudou rodam de novo"""
+    versions = parser_runtime.get_parser().extractor_versions()
+    previous, rerun = None, None
+    if stored is not None and stored.result is not None and not stored.result.meta.get("regex_budget_exhausted"):
+        rerun = changed_extractors(stored.result_versions, versions)
+        if rerun is not None:
+            previous = stored.result
+    # Os blocos já trazem o texto (como no motor de parse)
+    data = parse_with_cpu_limit("" if blocks else raw_text, None, blocks, cpu_timeout, previous=previous, rerun=rerun or frozenset())
+    return data, versions
+
+def _process_source(source: str, cpu_timeout: float, replay: bool = False) -> SourceResult:
+    """Lê, extrai e faz o parse de uma origem; falhas viram resultado, não exceção.
+
+    Com ``replay``, ``source`` é o hash de um PDF no text_store e o texto sai de lá.
+    """
+    from pdf_text import read_pdf_text
+
+    started = time.time()
+    parser_version = _parser_version()
+    buffer = PDFBuffer(MAX_PDF_BYTES)
+    try:
+        if replay:
+            sha256 = source
+        else:
+            try:
+                _load(source, buffer)
+                sha256 = buffer.finish()
+            except (OSError, ValueError, requests.RequestException) as e:
+                return SourceResult(source, "error", error=f"Erro ao ler PDF: {str(e)}")
+
+        if _seen_db.execute("SELECT 1 FROM contents WHERE key = ?", (make_cache_key(sha256, parser_version),)).fetchone():
+            return SourceResult(source, "duplicate", sha256, parser_version)
+
+        packed = None
+        try:
+            stored = _text_store.get(sha256, with_result=True) if _text_store is not None else None
+            if stored is not None:
+                raw_text, blocks = stored.text, stored.blocks
+            elif replay:
+                return SourceResult(source, "error", sha256, error="Texto não encontrado no text_store")
+            else:
+                blocks = []
+                raw_text = read_pdf_text(buffer.source, blocks=blocks)
+                if _text_store is not None:
+                    packed = pack_text(raw_text, blocks, _text_store.codec)
+            data, versions = _parse_text(raw_text, blocks, stored, cpu_timeout)
+        except ParseTimeout as e:
+            return SourceResult(source, "error", sha256, parser_version, error=f"Tempo limite de processamento excedido: {str(e)}")
+        except Exception as e:
+            return SourceResult(source, "error", sha256, parser_version, error=f"Erro ao processar PDF: {str(e)}")
+
+        origin = (stored.source or source) if replay else source
+        # Os campos do ParseItem da API, mais a origem, o hash dos bytes e a versão do parser
+        record = {
+            "source": origin,
+            "file": _source_filename(origin),
+            "hash": cv_result.text_sha256(raw_text),
+            "data": data,
+            "confidence_overall": cv_result.calculate_confidence(data),
+            "processing_ms": int((time.time()-started)*1000),
+            "sha256": sha256,
+            "parser_version": parser_version,
+        }
+        return SourceResult(
+            source, "parsed", sha256, parser_version,
+            line=cv_result.dumps(record) + b"\n",
+            text=packed,
+            result=pack_result(data, versions, _text_store.codec) if _text_store is not None else None,
+        )
+    finally:
+        buffer.discard()
+
+# ===== estado (checkpoint) =====
+class BulkState:
+    """Checkpoint em SQLite: origens já tratadas, conteúdos já na saída
+    (hash dos bytes + versão do parser, a mesma chave do cache da API) e até
+    onde a saída é válida. Só é gravado depois que a saída foi para o disco,
+    então uma interrupção perde no máximo o trecho desde o último checkpoint."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        # WAL: os workers leem ``contents`` enquanto o processo principal grava
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "source TEXT PRIMARY KEY, status TEXT NOT NULL, sha256 TEXT, parser_version TEXT, "
+            "error TEXT, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS contents (key TEXT PRIMARY KEY, source TEXT NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._db.commit()
+
+    def is_done(self, source: str, parser_version: str, retry_errors: bool) -> bool:
+        row = self._db.execute("SELECT status, parser_version FROM sources WHERE source = ?", (source,)).fetchone()
+        if row is None or (row[0] == "error" and retry_errors):
+            return False
+        # Erros de leitura não têm versão: valem para qualquer parser
+        return row[1] in (None, parser_version)
+
+    def claim_content(self, sha256: str, parser_version: str, source: str) -> bool:
+        """Registra o conteúdo; False se ele já estava na saída (ou neste checkpoint)"""
+        cursor = self._db.execute(
+            "INSERT OR IGNORE INTO contents (key, source) VALUES (?, ?)", (make_cache_key(sha256, parser_version), source),
+        )
+        return cursor.rowcount == 1
+
+    def record(self, result: SourceResult):
+        self._db.execute(
+            "INSERT OR REPLACE INTO sources (source, status, sha256, parser_version, error, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (result.source, result.status, result.sha256, result.parser_version, result.error, time.time()),
+        )
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def commit(self):
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+# ===== saída =====
+class JSONLWriter:
+    """Uma linha por documento; o checkpoint é o tamanho do arquivo já em disco"""
+
+    def __init__(self, path: str, checkpoint: Optional[str]):
+        self.path = path
+        if checkpoint is not None:
+            # Descarta o que foi escrito depois do último checkpoint: essas origens serão refeitas
+            self._file = open(path, "r+b")
+            self._file.truncate(int(checkpoint))
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, "wb")
+
+    def write(self, line: bytes):
+        self._file.write(line)
+
+    def checkpoint(self) -> str:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return str(self._file.tell())
+
+    def close(self):
+        self._file.close()
+
+class ParquetWriter:
+    """Diretório com um ``part-NNNNN.parquet`` por checkpoint; o checkpoint é o
+    número de partes completas. ``data`` vai como JSON (string)."""
+
+    def __init__(self, path: str, checkpoint: Optional[str]):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise BulkError("Saída Parquet precisa do pyarrow (pip install pyarrow)") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.path = path
+        self._parts = int(checkpoint) if checkpoint is not None else 0
+        self._rows: List[dict] = []
+        os.makedirs(path, exist_ok=True)
+        # Partes (ou temporários) gravadas depois do último checkpoint
+        for name in os.listdir(path):
+            if name.startswith("part-") and (name.endswith(".tmp") or int(name[5:10]) >= self._parts):
+                os.unlink(os.path.join(path, name))
+
+    def write(self, line: bytes):
+        record = cv_result.loads(line)
+        record["data"] = cv_result.dumps(record["data"]).decode("utf-8")
+        self._rows.append(record)
+
+    def checkpoint(self) -> str:
+        if self._rows:
+            final = os.path.join(self.path, f"part-{self._parts:05d}.parquet")
+            temp = final + ".tmp"
+            self._pq.write_table(self._pa.Table.from_pylist(self._rows), temp)
+            os.replace(temp, final)
+            self._parts += 1
+            self._rows = []
+        return str(self._parts)
+
+    def close(self):
+        pass
+
+def open_writer(path: str, fmt: str, checkpoint: Optional[str]):
+    return ParquetWriter(path, checkpoint) if fmt == "parquet" else JSONLWriter(path, checkpoint)
+
+def _remove_output(path: str):
+    if os.path.isdir(path):
+        for name in os.listdir(path):
+            if name.startswith("part-"):
+                os.unlink(os.path.join(path, name))
+        os.rmdir(path)
+    elif os.path.exists(path):
+        os.unlink(path)
+
+# ===== execução =====
+class BulkRun:
+    """Distribui as origens entre os workers (no máximo ``PENDING_PER_WORKER``
+    por worker na fila, então a memória não cresce com o acervo) e grava os
+    resultados na ordem em que terminam"""
+
+    def __init__(
+        self,
+        state: BulkState,
+        writer,
+        workers: int,
+        cpu_timeout: float,
+        checkpoint_every: int,
+        checkpoint_seconds: float,
+        text_store: Optional[TextStore] = None,
+        replay: bool = False,
+    ):
+        self.state = state
+        self.writer = writer
+        self.text_store = text_store
+        self.replay = replay
+        self.workers = workers
+        self.cpu_timeout = cpu_timeout
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_seconds = checkpoint_seconds
+        self.counts = {"parsed": 0, "duplicate": 0, "error": 0, "skipped": 0}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Future, str] = {}
+        self._attempts: Dict[str, int] = {}
+        self._since_checkpoint = 0
+        self._checkpoint_at = time.monotonic()
+        self._started = time.monotonic()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, como nos outros pools: cada worker importa e aquece o parser do zero
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_bulk_worker,
+                initargs=(self.state.path, self.text_store.path if self.text_store else None,
+                          self.text_store.codec if self.text_store else "zlib"),
+            )
+        return self._pool
+
+    def parser_version(self) -> str:
+        return self._get_pool().submit(_parser_version).result()
+
+    def _submit(self, source: str):
+        self._pending[self._get_pool().submit(_process_source, source, self.cpu_timeout, self.replay)] = source
+
+    def _collect(self, futures):
+        broken = []
+        for future in futures:
+            source = self._pending.pop(future)
+            try:
+                self._handle(future.result())
+            except BrokenProcessPool:
+                broken.append(source)
+        if broken:
+            log_event(log, logging.WARNING, "Worker morreu; pool recriado", documents=len(broken))
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            for source in broken:
+                self._attempts[source] = self._attempts.get(source, 0) + 1
+                if self._attempts[source] >= MAX_ATTEMPTS:
+                    self._handle(SourceResult(source, "error", error="Erro ao processar PDF: o worker morreu durante o parse"))
+                else:
+                    self._submit(source)
+
+    def _handle(self, result: SourceResult):
+        if result.status == "parsed":
+            if self.state.claim_content(result.sha256, result.parser_version, result.source):
+                self.writer.write(result.line)
+                if result.text is not None:
+                    self.text_store.put(result.sha256, result.text, result.source)
+                if result.result is not None:
+                    self.text_store.put_result(result.sha256, result.result)
+            else:
+                # Mesmo conteúdo de outra origem já processada nesta execução
+                result.status, result.line = "duplicate", None
+        self.state.record(result)
+        self.counts[result.status] += 1
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_every or time.monotonic() - self._checkpoint_at >= self.checkpoint_seconds:
+            self.checkpoint()
+
+    def checkpoint(self):
+        # Primeiro a saída no disco, depois o estado que aponta para ela
+        self.state.set_meta("output", self.writer.checkpoint())
+        self.state.commit()
+        self._since_checkpoint = 0
+        self._checkpoint_at = time.monotonic()
+        log_event(log, logging.INFO, "Checkpoint", docs_per_sec=self.docs_per_sec(), **self.counts)
+
+    def docs_per_sec(self) -> float:
+        done = self.counts["parsed"] + self.counts["duplicate"] + self.counts["error"]
+        return round(done / max(time.monotonic() - self._started, 0.001), 2)
+
+    def run(self, sources: Iterator[str], parser_version: str, retry_errors: bool):
+        max_pending = self.workers * PENDING_PER_WORKER
+        for source in sources:
+            if self.state.is_done(source, parser_version, retry_errors):
+                self.counts["skipped"] += 1
+                continue
+            while len(self._pending) >= max_pending:
+                done, _ = wait(list(self._pending), return_when=FIRST_COMPLETED)
+                self._collect(done)
+            self._submit(source)
+        while self._pending:
+            done, _ = wait(list(self._pending), return_when=FIRST_COMPLETED)
+            self._collect(done)
+        self.checkpoint()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Parse em massa de PDFs (diretório, glob, manifesto JSONL ou URLs) com checkpoint")
+    ap.add_argument("inputs", nargs="*", help="diretórios, globs, manifestos .jsonl, arquivos ou URLs")
+    ap.add_argument("--output", "-o", required=True, help="arquivo .jsonl ou diretório .parquet")
+    ap.add_argument("--format", choices=("jsonl", "parquet"), help="padrão: pela extensão de --output")
+    ap.add_argument("--state", help="arquivo SQLite do checkpoint (padrão: <output>.state.sqlite)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos de parse (padrão: nº de CPUs)")
+    ap.add_argument("--checkpoint-every", type=int, default=500, help="documentos entre checkpoints")
+    ap.add_argument("--checkpoint-seconds", type=float, default=30.0, help="intervalo máximo entre checkpoints")
+    ap.add_argument("--timeout", type=float, default=PARSE_JOB_TIMEOUT_SECONDS, help="segundos de CPU por documento (0 = sem limite)")
+    ap.add_argument("--retry-errors", action="store_true", help="tenta de novo as origens que falharam em execuções anteriores")
+    ap.add_argument("--overwrite", action="store_true", help="apaga a saída e o checkpoint e começa do zero")
+    ap.add_argument("--text-store", help="SQLite com o texto extraído: guarda o texto novo e usa o que já está lá")
+    ap.add_argument("--replay", action="store_true", help="refaz o parse de todos os textos do --text-store, sem ler PDFs")
+    args = ap.parse_args(argv)
+    if args.replay and (args.inputs or not args.text_store):
+        ap.error("--replay usa só o --text-store (sem entradas)")
+    if not args.replay and not args.inputs:
+        ap.error("informe as entradas (ou --replay com --text-store)")
+
+    configure_logging()
+    output = args.output.rstrip("/")
+    fmt = args.format or ("parquet" if output.lower().endswith(".parquet") else "jsonl")
+    state_path = args.state or f"{output}.state.sqlite"
+    if args.overwrite:
+        _remove_output(output)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(state_path + suffix):
+                os.unlink(state_path + suffix)
+    # Cada worker já ocupa um núcleo: sem o pool de extração de páginas dentro dele
+    os.environ["PDF_EXTRACT_WORKERS"] = "0"
+
+    if args.replay and not os.path.exists(args.text_store):
+        print(f"erro: text_store {args.text_store} não existe", file=sys.stderr)
+        return 2
+    state = BulkState(state_path)
+    text_store = TextStore(args.text_store) if args.text_store else None
+    if text_store is not None:
+        text_store.connect()
+    writer = None
+    bulk = None
+    try:
+        checkpoint = state.get_meta("output")
+        if checkpoint is None and os.path.exists(output):
+            raise BulkError(f"{output} já existe e não tem checkpoint em {state_path}; use --overwrite para recomeçar")
+        if checkpoint is not None and not os.path.exists(output):
+            raise BulkError(f"O checkpoint {state_path} aponta para {output}, que não existe; use --overwrite para recomeçar")
+        if state.get_meta("format") not in (None, fmt):
+            raise BulkError(f"O checkpoint {state_path} é de uma saída {state.get_meta('format')}, não {fmt}")
+        writer = open_writer(output, fmt, checkpoint)
+        state.set_meta("format", fmt)
+
+        bulk = BulkRun(
+            state, writer, max(1, args.workers), args.timeout, max(1, args.checkpoint_every), args.checkpoint_seconds,
+            text_store=text_store, replay=args.replay,
+        )
+        parser_version = bulk.parser_version()
+        log_event(log, logging.INFO, "Parse em massa iniciado", output=output, format=fmt, workers=bulk.workers,
+                  parser_version=parser_version, resumed=checkpoint is not None, replay=args.replay)
+        sources = text_store.keys() if args.replay else iter_sources(args.inputs)
+        try:
+            bulk.run(sources, parser_version, args.retry_errors)
+        except KeyboardInterrupt:
+            # Guarda o que já terminou; o resto é refeito na próxima execução
+            bulk.checkpoint()
+            log_event(log, logging.WARNING, "Interrompido; rode o mesmo comando para continuar", **bulk.counts)
+            return 130
+        print(json.dumps({**bulk.counts, "docs_per_sec": bulk.docs_per_sec(), "parser_version": parser_version, "output": output}))
+        return 0
+    except BulkError as e:
+        if bulk is not None:
+            bulk.checkpoint()
+        print(f"erro: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if bulk is not None:
+            bulk.close()
+        if writer is not None:
+            writer.close()
+        if text_store is not None:
+            text_store.close()
+        state.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+# Representação intermediária do CV: segmentado uma vez, consultado por todos os extratores
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from skill_matcher import MultiTermMatcher, line_start_offsets, line_of
+from timings import Deadline
+
+# Padrões lineares: o match só começa no início de um token (lookbehind), então
+# uma sequência longa sem "@" é percorrida uma vez, e não uma vez por caractere
+EMAIL_RE = re.compile(r"(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+# O espaço antes do número só entra junto com o "55" (o resultado passa por strip)
+PHONE_BR_RE = re.compile(r"(?:\+?55\s*)?\(?\d{2}\)?\s*\d{4,5}-?\d{4}")
+URL_RE = re.compile(r"(https?://[^\s]+|\bwww\.[^\s]+)", re.I)
+
+# Títulos de seção reconhecidos (linha curta contendo só o título)
+SECTION_HEADINGS = {
+    "summary": ["resumo", "resumo profissional", "summary", "perfil", "profile", "objetivo", "objective", "sobre", "sobre mim", "about", "about me"],
+    "experience": ["experiência", "experiências", "experiência profissional", "experiencia", "experience", "work experience", "professional experience", "histórico profissional"],
+    "education": ["formação", "formação acadêmica", "formacao", "educação", "education", "academic background"],
+    "skills": ["skills", "habilidades", "competências", "competencias", "conhecimentos", "tecnologias", "technical skills", "hard skills"],
+    "languages": ["idiomas", "línguas", "languages"],
+    "projects": ["projetos", "projeto", "projects", "personal projects", "portfólio", "portfolio"],
+    "certifications": ["certificações", "certificados", "certificacoes", "certifications", "licenses & certifications", "cursos", "courses"],
+    "achievements": ["conquistas", "realizações", "prêmios", "achievements", "awards"],
+}
+_HEADING_LOOKUP = {title: name for name, titles in SECTION_HEADINGS.items() for title in titles}
+
+# Radicais para títulos variantes ("Formação Acadêmica e Cursos", "HABILIDADES TÉCNICAS"),
+# aplicados só à primeira palavra de linhas que já parecem título
+HEADING_STEMS = (
+    ("experi", "experience"), ("históric", "experience"), ("forma", "education"), ("educa", "education"),
+    ("acadêm", "education"), ("academ", "education"), ("skill", "skills"), ("habilidad", "skills"),
+    ("competên", "skills"), ("competen", "skills"), ("tecnolog", "skills"), ("conhecimento", "skills"),
+    ("idioma", "languages"), ("língua", "languages"), ("language", "languages"), ("projet", "projects"),
+    ("project", "projects"), ("portf", "projects"), ("certifica", "certifications"), ("curso", "certifications"),
+    ("course", "certifications"), ("resumo", "summary"), ("summary", "summary"), ("perfil", "summary"),
+    ("profile", "summary"), ("objetiv", "summary"), ("sobre", "summary"), ("about", "summary"),
+    ("conquista", "achievements"), ("realiza", "achievements"), ("prêmio", "achievements"),
+    ("achievement", "achievements"), ("award", "achievements"),
+)
+# Seção sem nome conhecido: só encerra a seção anterior
+OTHER_SECTION = "other"
+MAX_HEADING_LEN = 40
+
+def _heading_key(line: str) -> str:
+    return " ".join(line.split()).rstrip(":").strip().lower()
+
+def _heading_name(line_lower: str) -> Optional[str]:
+    """Nome da seção se a linha for um título conhecido"""
+    key = line_lower.strip().rstrip(":").strip()
+    if not key or len(key) > MAX_HEADING_LEN:
+        return None
+    return _HEADING_LOOKUP.get(key)
+
+def _heading_stem_name(key: str) -> Optional[str]:
+    words = key.split()
+    if not words or len(words) > 5:
+        return None
+    first = words[0]
+    for stem, name in HEADING_STEMS:
+        if first.startswith(stem):
+            return name
+    return None
+
+def heading_section_name(line: str) -> Optional[str]:
+    """Seção indicada por uma linha com cara de título (título conhecido ou radical)"""
+    key = _heading_key(line)
+    if not key or len(key) > MAX_HEADING_LEN:
+        return None
+    return _HEADING_LOOKUP.get(key) or _heading_stem_name(key)
+
+def _line_section(line: str, line_lower: str, styled: Callable[[str], bool]) -> Optional[str]:
+    """Seção aberta pela linha, ou None se ela não é título.
+
+    Um título conhecido sempre abre seção. Linhas marcadas como título pelo
+    layout do PDF (``styled``) abrem a seção indicada pelo radical da
+    primeira palavra ou, sem radical conhecido, apenas encerram a seção
+    anterior. Sem marcação do layout, linhas curtas em caixa alta valem como
+    título quando têm radical conhecido.
+    """
+    name = _heading_name(line_lower)
+    if name is not None:
+        return name
+    stripped = line.strip()
+    if not stripped or len(stripped) > MAX_HEADING_LEN:
+        return None
+    key = _heading_key(stripped)
+    if styled(key):
+        return _heading_stem_name(key) or OTHER_SECTION
+    if stripped.isupper():
+        return _heading_stem_name(key)
+    return None
+
+def line_section_name(line: str, styled: bool = False) -> Optional[str]:
+    """Seção aberta por uma linha do PDF; ``styled`` indica que o layout a marcou como título"""
+    return _line_section(line, line.lower(), lambda key: styled)
+
+def normalize_headings(headings: Iterable[str]) -> Set[str]:
+    """Normaliza títulos vindos do layout do PDF para comparar com as linhas do texto"""
+    return {key for key in (_heading_key(h) for h in headings) if key and len(key) <= MAX_HEADING_LEN}
+
+@dataclass
+class ParsedDocument:
+    """CV segmentado uma única vez.
+
+    ``text`` é o texto já normalizado e ``lower`` sua versão em minúsculas.
+    Offsets de ``line_starts`` e ``skill_hits`` referem-se a ``lower`` e os de
+    ``urls`` a ``text``; ``aligned`` indica se os dois coincidem (quase
+    sempre: só alguns caracteres Unicode mudam de tamanho ao virar minúsculos).
+    Os índices de tokens são calculados no primeiro acesso, então recortes de
+    seção (``section``) só pagam pelo que os extratores consultam.
+    ``deadline`` é o prazo de regex do documento, compartilhado com os recortes.
+    """
+    text: str
+    lower: str
+    lines: List[str]
+    lines_lower: List[str]
+    line_starts: List[int]
+    aligned: bool
+    skill_matcher: MultiTermMatcher = field(repr=False)
+    sections: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)
+    deadline: Deadline = field(default_factory=Deadline, repr=False)
+    _line_techs: Optional[List[Tuple[str, ...]]] = field(default=None, repr=False)
+    _term_lines: Dict[str, List[int]] = field(default_factory=dict, repr=False)
+    _section_docs: Dict[Tuple[str, ...], Optional["ParsedDocument"]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        text: str,
+        skill_matcher: MultiTermMatcher,
+        headings: Optional[Set[str]] = None,
+        detect_sections: bool = True,
+        deadline: Optional[Deadline] = None,
+    ) -> "ParsedDocument":
+        """Segmenta o texto.
+
+        ``headings`` são títulos já identificados pelo layout do PDF (fonte
+        maior ou negrito), normalizados com ``normalize_headings``.
+        """
+        lower = text.lower()
+        lines = text.split("\n")
+        lines_lower = lower.split("\n")
+        doc = cls(
+            text=text,
+            lower=lower,
+            lines=lines,
+            lines_lower=lines_lower,
+            line_starts=line_start_offsets(lower),
+            aligned=len(lower) == len(text),
+            skill_matcher=skill_matcher,
+            deadline=deadline or Deadline(),
+        )
+        if detect_sections:
+            doc.sections = cls._detect_sections(lines, lines_lower, headings or set())
+        return doc
+
+    @classmethod
+    def from_blocks(
+        cls,
+        blocks: Sequence,
+        skill_matcher: MultiTermMatcher,
+        normalize: Callable[[str], str],
+        deadline: Optional[Deadline] = None,
+    ) -> "ParsedDocument":
+        """Monta o documento a partir dos blocos do layout (``pdf_text.LayoutBlock``).
+
+        O texto é o mesmo de ``read_pdf_text`` (blocos em ordem de leitura, uma
+        linha em branco a cada página), com ``normalize`` aplicado a cada
+        trecho entre títulos da mesma coluna e página (ver ``_block_runs``) para
+        que a linha de cada título seja conhecida. As seções saem
+        de uma passada pelos blocos, sem examinar as linhas. Cada coluna tem a
+        sua seção aberta: ao voltar para uma coluna (a principal na página
+        seguinte, depois da barra lateral), o texto continua na seção dela.
+        """
+        pieces: List[str] = []
+        starts: List[Tuple[int, int, str]] = []
+        column_sections: Dict[int, str] = {}
+        line_no, page, column = 0, 0, None
+        for block, text in cls._block_runs(blocks):
+            for _ in range(block.page - page):
+                pieces.append("")
+                line_no += 1
+            page = block.page
+            text = normalize(text)
+            if block.section:
+                starts.append((line_no, line_no + 1, block.section))
+                column_sections[block.column] = block.section
+            elif column is not None and block.column != column:
+                starts.append((line_no, line_no, column_sections.get(block.column, OTHER_SECTION)))
+            column = block.column
+            pieces.append(text)
+            line_no += text.count("\n") + 1
+        if pieces:
+            pieces.append("")
+        doc = cls.build("\n".join(pieces), skill_matcher, detect_sections=False, deadline=deadline)
+        doc.sections = cls._sections_from_starts(starts, len(doc.lines))
+        return doc
+
+    @staticmethod
+    def _block_runs(blocks: Sequence) -> Iterator[Tuple[object, str]]:
+        """``(primeiro bloco, texto)`` de cada sequência de blocos da mesma coluna
+        e página sem título no meio; o título fica sozinho. Blocos mudam com o
+        estilo da linha, então uma URL quebrada pode cair em dois blocos: o
+        ``normalize`` precisa ver os dois para juntar como no texto corrido"""
+        run_block, run_texts = None, []
+        for block in blocks:
+            if run_block is not None and (
+                block.section or run_block.section
+                or (block.page, block.column) != (run_block.page, run_block.column)
+            ):
+                yield run_block, "\n".join(run_texts)
+                run_block, run_texts = None, []
+            if run_block is None:
+                run_block = block
+            run_texts.append(block.text)
+        if run_block is not None:
+            yield run_block, "\n".join(run_texts)
+
+    @staticmethod
+    def _sections_from_starts(starts: List[Tuple[int, int, str]], total_lines: int) -> Dict[str, List[Tuple[int, int]]]:
+        """Intervalos [início, fim) a partir de ``(linha que encerra a seção anterior,
+        primeira linha da seção, nome)``: cada seção vai até a próxima"""
+        sections: Dict[str, List[Tuple[int, int]]] = {}
+        for k, (_, start, name) in enumerate(starts):
+            end = starts[k + 1][0] if k + 1 < len(starts) else total_lines
+            if end > start:
+                sections.setdefault(name, []).append((start, end))
+        sections.pop(OTHER_SECTION, None)
+        return sections
+
+    @staticmethod
+    def _detect_sections(lines: List[str], lines_lower: List[str], headings: Set[str]) -> Dict[str, List[Tuple[int, int]]]:
+        """Intervalos de linhas [início, fim) de cada seção, pelos títulos (ver ``_line_section``)"""
+        starts = []
+        for i, line_lower in enumerate(lines_lower):
+            name = _line_section(lines[i], line_lower, headings.__contains__)
+            if name is not None:
+                starts.append((i, i + 1, name))
+        return ParsedDocument._sections_from_starts(starts, len(lines_lower))
+
+    def finditer(self, pattern: "re.Pattern[str]", text: Optional[str] = None) -> Iterator["re.Match[str]"]:
+        """``pattern.finditer`` no texto do documento, respeitando o prazo de regex"""
+        return self.deadline.iter(pattern.finditer(self.text if text is None else text))
+
+    @cached_property
+    def urls(self) -> List[Tuple[str, int, int]]:
+        return [(m.group(0), m.start(), m.end()) for m in self.finditer(URL_RE)]
+
+    @cached_property
+    def emails(self) -> List[str]:
+        return [m.group(0) for m in self.finditer(EMAIL_RE)]
+
+    @cached_property
+    def phones(self) -> List[str]:
+        return [m.group(0) for m in self.finditer(PHONE_BR_RE)]
+
+    @cached_property
+    def _skill_positions(self) -> List[Tuple[int, int, str]]:
+        return [(start, end, skill) for skill, start, end in self.deadline.iter(self.skill_matcher.finditer(self.lower))]
+
+    @cached_property
+    def skill_hits(self) -> Dict[str, List[Tuple[int, int]]]:
+        hits: Dict[str, List[Tuple[int, int]]] = {}
+        for start, end, skill in self._skill_positions:
+            hits.setdefault(skill, []).append((start, end))
+        return hits
+
+    def line_of(self, offset: int) -> int:
+        """Linha (base 0) que contém o offset"""
+        return line_of(self.line_starts, offset)
+
+    def section_text(self, *names: str) -> Optional[str]:
+        """Texto das seções indicadas (em ordem no documento), ou None se nenhuma foi encontrada"""
+        spans = sorted(span for name in names for span in self.sections.get(name, ()))
+        if not spans:
+            return None
+        return "\n".join("\n".join(self.lines[start:end]) for start, end in spans)
+
+    def section(self, *names: str) -> Optional["ParsedDocument"]:
+        """Recorte do documento com só as seções indicadas, para rodar um extrator nele"""
+        key = tuple(names)
+        if key not in self._section_docs:
+            text = self.section_text(*names)
+            self._section_docs[key] = (
+                None if text is None
+                else ParsedDocument.build(text, self.skill_matcher, detect_sections=False, deadline=self.deadline)
+            )
+        return self._section_docs[key]
+
+    def skills_in_span(self, start: int, end: int) -> List[str]:
+        """Skills cujas ocorrências estão inteiramente em [start, end), em ordem de aparição"""
+        i = bisect_left(self._skill_positions, (start, -1, ""))
+        found: List[str] = []
+        while i < len(self._skill_positions):
+            s, e, skill = self._skill_positions[i]
+            if s >= end:
+                break
+            if e <= end and skill not in found:
+                found.append(skill)
+            i += 1
+        return found
+
+    def first_url_in_span(self, start: int, end: int) -> Optional[str]:
+        """Primeira URL que começa dentro de [start, end), cortada no fim do intervalo"""
+        for raw, s, e in self.urls:
+            if s >= end:
+                break
+            if s >= start:
+                return raw[:end - s]
+        return None
+
+    def line_techs(self) -> List[Tuple[str, ...]]:
+        """Tecnologias citadas em cada linha (derivado do índice de skills, calculado uma vez)"""
+        if self._line_techs is None:
+            per_line: List[List[str]] = [[] for _ in self.line_starts]
+            for start, _, skill in self._skill_positions:
+                techs = per_line[self.line_of(start)]
+                if skill not in techs:
+                    techs.append(skill)
+            self._line_techs = [tuple(techs) for techs in per_line]
+        return self._line_techs
+
+    def lines_containing(self, term_lower: str) -> List[int]:
+        """Linhas que contêm o termo (já em minúsculas), com cache por termo"""
+        cached = self._term_lines.get(term_lower)
+        if cached is not None:
+            return cached
+        found: List[int] = []
+        # Termo com quebra de linha nunca está contido em uma linha só
+        if term_lower and "\n" not in term_lower:
+            pos = self.lower.find(term_lower)
+            while pos != -1:
+                line = self.line_of(pos)
+                found.append(line)
+                # Pula para a próxima linha: basta saber se a linha contém o termo
+                next_line = line + 1
+                if next_line >= len(self.line_starts):
+                    break
+                pos = self.lower.find(term_lower, self.line_starts[next_line])
+        self._term_lines[term_lower] = found
+        return found
+
+    def techs_near_lines(self, line_numbers: List[int], before: int = 5, after: int = 5) -> List[str]:
+        """União das tecnologias nas janelas [linha-before, linha+after] em ordem de aparição"""
+        total = len(self.line_starts)
+        per_line = self.line_techs()
+        techs: Dict[str, None] = {}
+        covered_until = 0
+        for line in sorted(set(line_numbers)):
+            start = max(covered_until, line - before, 0)
+            end = min(total, line + after + 1)
+            for j in range(start, end):
+                for tech in per_line[j]:
+                    techs.setdefault(tech, None)
+            covered_until = max(covered_until, end)
+        return list(techs)
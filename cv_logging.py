@@ -0,0 +1,190 @@
+# Logs estruturados (uma linha JSON por evento) com id de correlação por
+# requisição; a formatação e a escrita rodam em uma thread própria
+import os
+import re
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import traceback
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional
+
+# ===== config =====
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+# Linhas de debug amostradas: no máximo N por segundo para cada mensagem
+LOG_DEBUG_PER_SECOND = float(os.getenv("LOG_DEBUG_PER_SECOND", "5"))
+
+ROOT_LOGGER = "cv"
+
+# Id da requisição (ou do job) em andamento; entra em todas as linhas de log
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created))} {record.levelname} {record.name}"
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            line += f" [{request_id}]"
+        line += f" {record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+class _ContextQueueHandler(QueueHandler):
+    """Enfileira o registro com o id da requisição e a mensagem já resolvida;
+    JSON e escrita no stdout ficam para a thread do ``QueueListener``"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+_fork_hook_registered = False
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """Instala o handler do logger ``cv`` (idempotente; uma vez por processo)"""
+    global _listener, _fork_hook_registered
+    with _configure_lock:
+        if _listener is not None:
+            return
+        stream = logging.StreamHandler()
+        stream.setFormatter(TextFormatter() if fmt == "text" else JsonFormatter())
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, stream)
+        _listener.start()
+        atexit.register(_listener.stop)
+        root = logging.getLogger(ROOT_LOGGER)
+        root.handlers = [_ContextQueueHandler(log_queue)]
+        root.setLevel(getattr(logging, level, logging.INFO))
+        root.propagate = False
+        if hasattr(os, "register_at_fork") and not _fork_hook_registered:
+            _fork_hook_registered = True
+            # gunicorn com preload_app: a thread do listener não existe nos
+            # workers criados por fork, então cada filho sobe a sua
+            os.register_at_fork(after_in_child=lambda: _restart_after_fork(level, fmt))
+
+def _restart_after_fork(level: str, fmt: str):
+    global _listener, _configure_lock
+    _listener = None
+    _configure_lock = threading.Lock()
+    configure_logging(level, fmt)
+
+def log_event(logger: logging.Logger, level: int, msg: str, **fields: Any):
+    """Log com campos estruturados; nada é montado se o nível estiver desligado"""
+    if logger.isEnabledFor(level):
+        logger.log(level, msg, extra={"fields": fields})
+
+class _RateLimiter:
+    """Balde de fichas por mensagem: ``rate`` linhas por segundo, com rajada do mesmo tamanho"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, list] = {}  # msg -> [fichas, último instante, suprimidas]
+
+    def allow(self, key: str) -> Optional[int]:
+        """Número de linhas suprimidas desde a última emitida, ou None se esta deve ser descartada"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.rate, now, 0]
+            bucket[0] = min(self.rate, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return None
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+            return suppressed
+
+_debug_limiter = _RateLimiter(LOG_DEBUG_PER_SECOND)
+
+def debug_sampled(logger: logging.Logger, msg: str, build: Callable[[], Dict[str, Any]]):
+    """Debug limitado a ``LOG_DEBUG_PER_SECOND`` linhas/s por mensagem.
+
+    ``build`` monta os campos e só é chamado quando a linha vai mesmo ser
+    emitida, então o custo com DEBUG desligado é uma comparação de nível.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    suppressed = _debug_limiter.allow(msg)
+    if suppressed is None:
+        return
+    fields = build()
+    if suppressed:
+        fields["suppressed"] = suppressed
+    logger.debug(msg, extra={"fields": fields})
+
+def new_request_id(candidate: Optional[str] = None) -> str:
+    """Aceita o id recebido se for seguro para o log; senão gera um novo"""
+    if candidate and _REQUEST_ID_RE.match(candidate):
+        return candidate
+    return uuid.uuid4().hex
+
+class RequestContextMiddleware:
+    """Middleware ASGI: define o id de correlação (``X-Request-ID`` recebido
+    ou um novo) e o devolve no cabeçalho da resposta"""
+
+    header = b"x-request-id"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        received = None
+        for name, value in scope.get("headers", ()):
+            if name == self.header:
+                received = value.decode("latin-1")
+                break
+        request_id = new_request_id(received)
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + [(self.header, request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
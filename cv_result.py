@@ -0,0 +1,124 @@
+# Resultado interno do parser: dataclasses simples, sem validação do pydantic.
+# Viajam do worker para a API em JSON (orjson) e viram os modelos da resposta
+# (main.ParsedCV) uma única vez, na borda. Sem __slots__ de propósito: o orjson
+# lê o __dict__ direto e serializa ~4x mais rápido do que campo a campo
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+@dataclass
+class CandidateLocation:
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = "Brasil"
+
+@dataclass
+class CandidateLinks:
+    linkedin: Optional[str] = None
+    github: Optional[str] = None
+    portfolio: Optional[str] = None
+
+@dataclass
+class Candidate:
+    full_name: Optional[str] = None
+    emails: List[str] = field(default_factory=list)
+    phones: List[str] = field(default_factory=list)
+    location: CandidateLocation = field(default_factory=CandidateLocation)
+    links: CandidateLinks = field(default_factory=CandidateLinks)
+
+@dataclass
+class Experience:
+    company: Optional[str] = None
+    role: Optional[str] = None
+    employment_type: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    is_current: Optional[bool] = None
+    location: Optional[str] = None
+    achievements: List[str] = field(default_factory=list)
+    tech_stack: List[str] = field(default_factory=list)
+    confidence: float = 0.0
+
+@dataclass
+class Education:
+    institution: Optional[str] = None
+    degree: Optional[str] = None
+    field: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    confidence: float = 0.0
+
+@dataclass
+class Skill:
+    name: str
+    level: Optional[str] = "na"
+    confidence: float = 0.0
+
+@dataclass
+class Language:
+    name: str
+    level_cefr: Optional[str] = None
+    confidence: float = 0.0
+
+@dataclass
+class ParseResult:
+    """Mesmos campos, na mesma ordem, de ``main.ParsedCV``: o JSON de um é o JSON do outro"""
+    candidate: Candidate = field(default_factory=Candidate)
+    summary: Optional[str] = None
+    skills: List[Skill] = field(default_factory=list)
+    languages: List[Language] = field(default_factory=list)
+    experiences: List[Experience] = field(default_factory=list)
+    education: List[Education] = field(default_factory=list)
+    certifications: List[Dict[str, Any]] = field(default_factory=list)
+    expected_salary: Optional[Dict[str, Any]] = None
+    availability: Optional[Dict[str, Any]] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+def result_from_dict(data: Dict[str, Any]) -> ParseResult:
+    """``ParseResult`` de volta a partir do JSON (``loads(dumps(result))``)"""
+    candidate = data.get("candidate") or {}
+    return ParseResult(
+        candidate=Candidate(
+            full_name=candidate.get("full_name"),
+            emails=candidate.get("emails", []),
+            phones=candidate.get("phones", []),
+            location=CandidateLocation(**(candidate.get("location") or {})),
+            links=CandidateLinks(**(candidate.get("links") or {})),
+        ),
+        summary=data.get("summary"),
+        skills=[Skill(**skill) for skill in data.get("skills", [])],
+        languages=[Language(**language) for language in data.get("languages", [])],
+        experiences=[Experience(**experience) for experience in data.get("experiences", [])],
+        education=[Education(**education) for education in data.get("education", [])],
+        certifications=data.get("certifications", []),
+        expected_salary=data.get("expected_salary"),
+        availability=data.get("availability"),
+        meta=data.get("meta", {}),
+    )
+
+def calculate_confidence(data: Any) -> float:
+    """Calcula a confiança geral a partir dos campos extraídos (``ParseResult`` ou ``main.ParsedCV``)"""
+    conf = 0.6
+    if data.candidate.full_name: conf += 0.15
+    if data.candidate.emails: conf += 0.1
+    if data.summary: conf += 0.05
+    if data.skills: conf += 0.1
+    if data.experiences: conf += 0.1
+    if data.education: conf += 0.05
+    if data.certifications: conf += 0.03
+    if data.meta.get("projects"): conf += 0.02
+    if data.meta.get("achievements"): conf += 0.02
+    return min(conf, 0.98)
+
+def text_sha256(text: str) -> str:
+    """Hash do texto extraído (campo ``hash`` do ParseItem)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def dumps(value: Any) -> bytes:
+    """JSON compacto (orjson serializa dataclasses direto, sem passar por dict)"""
+    return orjson.dumps(value)
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data)
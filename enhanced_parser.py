@@ -1,29 +1,198 @@
 import re
 import os
-from typing import List, Optional, Dict, Any, Tuple
-from main import (
-    ParsedCV, Candidate, Experience, Education, Skill, Language,
-    CandidateLocation, CandidateLinks, read_pdf_text
+from bisect import bisect_left
+from typing import AbstractSet, List, Optional, Dict, Any, Sequence, Tuple, Union
+from cv_result import (
+    ParseResult, Candidate, Experience, Education, Skill, Language,
+    CandidateLocation, CandidateLinks
 )
+from skill_matcher import MultiTermMatcher, line_of, last_match_per_line
+from cv_document import ParsedDocument, normalize_headings, URL_RE
+from timings import Deadline, StageClock
+from rules import ExperienceOverride, RuleSet, get_rule_set
 
-# Importa regex patterns diretamente
-import re
-EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-PHONE_BR_RE = re.compile(r"(?:\+?55)?\s*\(?\d{2}\)?\s*\d{4,5}-?\d{4}")
-URL_RE = re.compile(r"(https?://[^\s]+|\bwww\.[^\s]+)", re.I)
 LINKEDIN_HOST_RE = re.compile(r"linkedin\.com", re.I)
 GITHUB_HOST_RE = re.compile(r"github\.com", re.I)
 
+# ===== padrões compilados (uma vez por processo) =====
+# Todos rodam em tempo linear no tamanho do texto: nada de ".*" ou "[^x]*"
+# sem âncora diante de uma alternativa que pode falhar (cada posição
+# inicial reescaneando o resto do texto). Os recursos usados são âncoras
+# (início de token, início de frase, linha) e repetições limitadas.
+# ``benchmarks/fuzz_regex.py`` verifica o crescimento com entradas patológicas.
+_I = re.IGNORECASE
+# Token com URL no fim da linha, seguido da continuação na linha de baixo.
+# Começa no início do token e exige o "\n" antes de qualquer outro espaço,
+# para não voltar atrás em sequências longas de espaços/quebras
+WRAPPED_URL_RE = re.compile(r'(?<!\S)(?=\S*?(?:https?://|\bwww\.))(\S+)[^\S\n]*\n\s*(\S)')
+HSPACE_RE = re.compile(r'[ \t]+')
+WHITESPACE_RE = re.compile(r'\s+')
+NON_DIGIT_RE = re.compile(r'\D')
+
+SUMMARY_PATTERNS = (
+    # O resto da linha depois do rótulo ("." não passa de "\n")
+    re.compile(r"(?:resumo|summary|perfil|profile|objetivo|objective|sobre|about)[\s:]+(.+)", _I),
+    # Frase com reticências dentro da própria linha
+    re.compile(r"^([A-Z][^.!?\n]*\.{2,}[^.!?\n]*\.)", re.MULTILINE | _I),
+    re.compile(r"^([A-Z][^.!?]{50,200}\.)", re.MULTILINE | _I),
+)
+SUMMARY_LEADING_RE = re.compile(r'^[:\s]+')
+
+EDUCATION_PATTERNS = (
+    re.compile(r"(?:universidade|university|faculdade|college|instituto|institute)[\s:]+([^,\n]+)", _I),
+    re.compile(r"(?:bacharelado|bachelor|licenciatura|licenciate|mestrado|master|doutorado|phd)[\s:]+([^,\n]+)", _I),
+    re.compile(r"(?:curso|course|certificação|certification)[\s:]+([^,\n]+)", _I),
+)
+
+# Empresa: até 6 palavras começando no início de uma palavra. Sem o limite,
+# um texto só de palavras (sem pontuação) era reescaneado a partir de cada uma
+_COMPANY = r"(?<![A-Za-z])([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,5})"
+_ROLE_KEYWORDS = r"(?:gerente|manager|coordenador|coordinator|desenvolvedor|developer|analista|analyst)"
+EXPERIENCE_PATTERNS = (
+    re.compile(_COMPANY + r"[\s:]+" + _ROLE_KEYWORDS + r"[\s:]+([^,\n]+)", _I),
+    # Palavra-chave em até 80 caracteres do início do cargo
+    re.compile(_COMPANY + r"[\s:]+([^,\n]{0,80}?" + _ROLE_KEYWORDS + r"[^,\n]*)", _I),
+)
+
+PORTFOLIO_LABEL_RE = re.compile(r'portfolio[:\s]+(https?://[^\s]+)', _I)
+
+EMAIL_LOCAL_RE = re.compile(r'(?<![A-Za-z0-9._-])([A-Za-z0-9._-]+)@')
+LINKEDIN_SLUG_RE = re.compile(r'linkedin\.com/in/([A-Za-z0-9\-_.]+)', _I)
+NAME_SPLIT_RE = re.compile(r'[._-]+')
+SLUG_SPLIT_RE = re.compile(r'[\-_.]+')
+NAME_CHARS_RE = re.compile(r"^[A-Za-zÀ-ÖØ-öø-ÿ' .-]+$")
+
+LANGUAGE_PATTERNS = (
+    (re.compile(r"english|inglês|ingles", _I), "English"),
+    (re.compile(r"portuguese|português|portugues", _I), "Portuguese"),
+    (re.compile(r"spanish|español|espanhol", _I), "Spanish"),
+    (re.compile(r"french|français|frances", _I), "French"),
+    (re.compile(r"german|deutsch|alemão|alemao", _I), "German"),
+    (re.compile(r"italian|italiano", _I), "Italian"),
+)
+LANGUAGE_LEVEL_PATTERNS = (
+    (re.compile(r"\b(c2|proficient|fluent|native|nativo|fluente)\b", _I), "C2"),
+    (re.compile(r"\b(c1|advanced|avançado)\b", _I), "C1"),
+    (re.compile(r"\b(b2|upper.?intermediate|intermediário superior)\b", _I), "B2"),
+    (re.compile(r"\b(b1|intermediate|intermediário)\b", _I), "B1"),
+    (re.compile(r"\b(a2|elementary|elementar)\b", _I), "A2"),
+    (re.compile(r"\b(a1|beginner|iniciante)\b", _I), "A1"),
+)
+
+# Cidade: até 5 palavras, pelo mesmo motivo da empresa
+LOCATION_PATTERNS = (
+    re.compile(r"(?:localização|location|endereço|address)[\s:]+(.+?)(?=\n|$)", _I),
+    re.compile(r"(?<![A-Za-z])([A-Z][a-z]+(?:[,\s]+[A-Z][a-z]+){0,4},\s*(?:SC|SP|RJ|MG|RS|PR|BA|PE|CE|GO|MT|MS|RO|AC|AP|RR|TO|PI|MA|PA|AM|AL|SE|PB|RN|ES|DF|BR|Brasil|Brazil))", _I),
+    re.compile(r"(?<![A-Za-z])([A-Z][a-z]+(?:[,\s]+[A-Z][a-z]+){0,4},\s*(?:Brasil|Brazil|United States|USA|Canada|Portugal|Germany|Spain|UK|Italy|France|Argentina|Chile|Uruguay|Mexico))", _I),
+)
+
+# Padrões de marcador ("- ...", "• ..."): o match só pode começar no início de
+# uma frase (início do texto ou logo após ".", "!" ou "?") e pula até o primeiro
+# marcador dela. Dá o mesmo resultado que começar em cada marcador (o match vai
+# sempre até o fim da frase, e todos os marcadores de uma frase levam ao mesmo
+# desfecho), mas cada frase é percorrida uma única vez
+_SENTENCE_BULLET = r"(?:\A|(?<=[.!?]))[^-•·–—.!?]*[-•·–—]"
+PROJECT_PATTERNS = (
+    re.compile(r"(?:projeto|project)[\s:]+(.+?)(?=\n|$)", _I),
+    re.compile(_SENTENCE_BULLET + r"\s*([^.!?]*?(?:projeto|project|app|aplicação|sistema)[^.!?]*)", _I),
+    re.compile(r"(?:desenvolvi|criei|implementei)\s+([^.!?]*?(?:projeto|project|app|aplicação|sistema)[^.!?]*)", _I),
+)
+QUOTED_NAME_RE = re.compile(r'"([^"]+)"')
+
+ACHIEVEMENT_PATTERNS = (
+    re.compile(_SENTENCE_BULLET + r"\s*([^.!?]+[.!?])", _I),
+    re.compile(r"[-•·–—]\s*([^.!?]+)", _I),
+    re.compile(r"(?:\A|(?<=[.!?]))[^•.!?]*•\s*([^.!?]+[.!?])", _I),
+    re.compile(r"[-•·–—]\s*([^.!?]{20,150})", _I),
+)
+ONLY_DIGITS_DASHES_RE = re.compile(r'^[\d\s\-–—]+$')
+DANGLING_WORD_RE = re.compile(r'(?<!\s)\s+(?:o|a|os|as|de|da|do|das|dos|em|na|no|nas|nos|com|para|por|além|que|e)$')
+GENERIC_AREA_RE = re.compile(r'^(?:área|áreas|setor|setores|departamento|departamentos|equipe|equipes)\s+de', _I)
+
+CERT_PATTERNS = (
+    (re.compile(r"aws certified ([^,\n]+)", _I), "AWS"),
+    (re.compile(r"microsoft certified ([^,\n]+)", _I), "Microsoft"),
+    (re.compile(r"oracle certified ([^,\n]+)", _I), "Oracle"),
+    (re.compile(r"google cloud certified ([^,\n]+)", _I), "Google Cloud"),
+    (re.compile(r"certified scrum master", _I), "Scrum"),
+    (re.compile(r"pmp certified", _I), "PMI"),
+    (re.compile(r"itil certified", _I), "ITIL"),
+    (re.compile(r"comptia ([^,\n]+)", _I), "CompTIA"),
+    (re.compile(r"cissp", _I), "ISC²"),
+    (re.compile(r"ceh", _I), "EC-Council"),
+)
+YEAR_RE = re.compile(r'\b\d{4}\b')
+
+# Prazo de regex por documento (ms; 0 desativa): vencido, os extratores que
+# faltam devolvem o que já acharam e o resultado sai com meta.regex_budget_exhausted
+REGEX_BUDGET_MS = float(os.getenv("CV_REGEX_BUDGET_MS", "3000"))
+
+# Versão do parser: entra na chave do cache de resultados, então qualquer
+# mudança nos extratores que altere a saída deve atualizá-la
+PARSER_VERSION = "enhanced-8"
+
+# Versão de cada extrator e da segmentação em seções ("document"). Quem muda
+# um extrator sobe a versão dele aqui (além da PARSER_VERSION): o replay do
+# text_store refaz só os extratores cuja versão mudou e aproveita o resto do
+# resultado anterior; uma mudança em "document" refaz tudo
+EXTRACTOR_VERSIONS: Dict[str, int] = {
+    "document": 2,
+    "contacts": 1,
+    "links": 1,
+    "name": 1,
+    "summary": 1,
+    "skills": 1,
+    "languages": 1,
+    "location": 1,
+    "education": 1,
+    "experiences": 1,
+    "projects": 1,
+    "achievements": 1,
+    "certifications": 1,
+}
+EXTRACTORS = frozenset(name for name in EXTRACTOR_VERSIONS if name != "document")
+# Extratores que consultam cv_rules.json: refeitos quando a versão das regras muda
+RULE_EXTRACTORS = frozenset({"name", "location", "experiences", "projects", "achievements"})
+# Extratores que usam algo mantido por outro extrator: quem sobe a versão do
+# extrator da chave também refaz os da lista no replay. O vocabulário de skills
+# (índice de skills do documento) dá a tech stack das experiências e as
+# tecnologias dos projetos; os e-mails do documento escolhem o override de
+# experiências em cv_rules.json; o índice de URLs dá a URL dos projetos.
+# benchmarks/check_extractor_deps.py falha se faltar uma dependência aqui
+EXTRACTOR_DEPENDS: Dict[str, AbstractSet[str]] = {
+    "skills": frozenset({"experiences", "projects"}),
+    "contacts": frozenset({"experiences"}),
+    "links": frozenset({"projects"}),
+}
+
+def changed_extractors(previous: Dict[str, Any], current: Dict[str, Any]) -> Optional[AbstractSet[str]]:
+    """Extratores a refazer entre as versões de um resultado anterior e as atuais
+    (ver ``EnhancedParser.extractor_versions``); None quando tudo deve ser refeito"""
+    if previous.get("document") != current.get("document"):
+        return None
+    changed = {name for name in EXTRACTORS if previous.get(name) != current.get(name)}
+    if previous.get("rules") != current.get("rules"):
+        changed |= RULE_EXTRACTORS
+    # Fecho transitivo de EXTRACTOR_DEPENDS: os dependentes também são refeitos
+    pending = list(changed)
+    while pending:
+        for dependent in EXTRACTOR_DEPENDS.get(pending.pop(), ()):
+            if dependent not in changed:
+                changed.add(dependent)
+                pending.append(dependent)
+    return changed
+
 def normalize_text_for_parsing(text: str) -> str:
-    text = re.sub(r'(https?://\S+|\bwww\.\S+)\s*\n\s*([^\s])', r'\1 \2', text)
+    text = WRAPPED_URL_RE.sub(r'\1 \2', text)
     text = text.replace("linkedin.com/in/\n", "linkedin.com/in/")
-    text = re.sub(r'[ \t]+', ' ', text)
+    text = HSPACE_RE.sub(' ', text)
     return text
 
 def normalize_phones(phones_raw: List[str]) -> List[str]:
+    """Normaliza números de telefone brasileiros"""
     out: List[str] = []
     for p in phones_raw:
-        digits = re.sub(r'\D', '', p)
+        digits = NON_DIGIT_RE.sub('', p)
         if not digits:
             continue
         if digits.startswith('55'):
@@ -37,13 +206,12 @@ def normalize_phones(phones_raw: List[str]) -> List[str]:
     return out
 
 class EnhancedParser:
-    def __init__(self):
-        # Padrões melhorados para extração
-        self.summary_patterns = [
-            r"(?:resumo|summary|perfil|profile|objetivo|objective|sobre|about)[\s:]+(.+?)(?=\n\s*[A-Z]|\n\s*\n|$)",
-            r"^([A-Z][^.!?]*\.{2,}[^.!?]*\.)",
-            r"^([A-Z][^.!?]{50,200}\.)"
-        ]
+    def __init__(self, rules: Optional[RuleSet] = None):
+        # Regras declarativas (cv_rules.json), recarregadas quando o arquivo muda
+        self.rules = rules or get_rule_set()
+        
+        # Padrões melhorados para extração (compilados no módulo)
+        self.summary_patterns = SUMMARY_PATTERNS
         
         # Skills mais abrangentes
         self.enhanced_skills = {
@@ -62,105 +230,136 @@ class EnhancedParser:
             "intermediate": ["intermediate", "intermediário", "mid-level", "pleno", "experienced", "experiente", "skilled", "habilidoso"],
             "beginner": ["beginner", "iniciante", "junior", "básico", "basic", "learning", "aprendendo", "studying", "estudando"]
         }
+        
+        # Matchers compilados: todas as skills e todos os indicadores de nível em uma passada cada
+        self._skill_order = list(dict.fromkeys(
+            tech.lower() for tech_list in self.enhanced_skills.values() for tech in tech_list
+        ))
+        self._skill_matcher = MultiTermMatcher(self._skill_order)
+        self._level_rank = {}
+        for rank, indicators in enumerate(self.skill_level_indicators.values()):
+            for indicator in indicators:
+                self._level_rank.setdefault(indicator, rank)
+        self._level_names = list(self.skill_level_indicators.keys())
+        self._level_matcher = MultiTermMatcher(self._level_rank, word_boundaries=False)
+        self._skill_experience_re = re.compile(r"experience|experiência|project|projeto")
+        self._skill_context_re = re.compile(r"skill|competência|tecnologia")
+
+    @property
+    def parser_version(self) -> str:
+        """Versão do código + versão das regras: trocar as regras invalida o cache de resultados"""
+        return f"{PARSER_VERSION}+rules.{self.rules.current().version}"
+
+    def extractor_versions(self) -> Dict[str, Any]:
+        """Versões que produzem o resultado de agora: extratores, segmentação e regras"""
+        return {**EXTRACTOR_VERSIONS, "rules": self.rules.current().version}
 
-    def extract_summary(self, text: str) -> Optional[str]:
+    def document(self, text: str, headings: Optional[List[str]] = None, deadline: Optional[Deadline] = None) -> ParsedDocument:
+        """Segmenta o texto (já normalizado) uma única vez para todos os extratores.
+
+        ``headings`` são linhas que o layout do PDF marcou como título
+        (ver ``read_pdf_text``); sem elas, as seções saem só do texto.
+        """
+        return ParsedDocument.build(text, self._skill_matcher, normalize_headings(headings or ()), deadline=deadline)
+
+    def _as_document(self, source: Union[str, ParsedDocument]) -> ParsedDocument:
+        return source if isinstance(source, ParsedDocument) else self.document(source)
+
+    def extract_summary(self, doc: Union[str, ParsedDocument]) -> Optional[str]:
         """Extrai resumo/objetivo profissional do CV"""
+        doc = self._as_document(doc)
+        
+        # Com seção de resumo detectada, o primeiro parágrafo dela é o resumo
+        section_text = doc.section_text("summary")
+        if section_text:
+            paragraph = section_text.strip().split("\n\n")[0]
+            summary = WHITESPACE_RE.sub(' ', paragraph).strip()
+            if len(summary) > 30 and len(summary) < 500:
+                return summary
+        
         for pattern in self.summary_patterns:
-            matches = re.finditer(pattern, text, re.MULTILINE | re.IGNORECASE)
-            for match in matches:
+            for match in doc.finditer(pattern):
                 summary = match.group(1).strip()
                 if len(summary) > 30 and len(summary) < 500:
-                    summary = re.sub(r'\s+', ' ', summary)
-                    summary = re.sub(r'^[:\s]+', '', summary)
+                    summary = WHITESPACE_RE.sub(' ', summary)
+                    summary = SUMMARY_LEADING_RE.sub('', summary)
                     return summary
         return None
 
-    def extract_enhanced_skills(self, text: str) -> List[Skill]:
-        """Extrai skills com níveis baseados em contexto"""
-        skills = []
-        text_lower = text.lower()
+    def extract_enhanced_skills(self, doc: Union[str, ParsedDocument]) -> List[Skill]:
+        """Extrai skills com níveis baseados em contexto.
+
+        Todas as ocorrências são encontradas em uma única passada; nível e
+        confiança saem dos offsets, então o custo é linear no tamanho do CV.
+        """
+        doc = self._as_document(doc)
+        text_lower = doc.lower
+        hits_by_skill = doc.skill_hits
+        if not hits_by_skill:
+            return []
         
-        for category, tech_list in self.enhanced_skills.items():
-            for tech in tech_list:
-                if tech.lower() in text_lower:
-                    level = self._determine_skill_level(text, tech)
-                    confidence = self._calculate_skill_confidence(text, tech)
-                    
-                    skills.append(Skill(
-                        name=tech,
-                        level=level,
-                        confidence=confidence
-                    ))
+        line_starts = doc.line_starts
+        indicator_hits = list(doc.deadline.iter(self._level_matcher.finditer(text_lower)))
+        indicator_starts = [start for _, start, _ in indicator_hits]
+        experience_kw = last_match_per_line(self._skill_experience_re, text_lower, line_starts)
+        context_kw = last_match_per_line(self._skill_context_re, text_lower, line_starts)
         
-        # Remove duplicatas e ordena por confiança
-        unique_skills = {}
-        for skill in skills:
-            if skill.name.lower() not in unique_skills:
-                unique_skills[skill.name.lower()] = skill
-            elif skill.confidence > unique_skills[skill.name.lower()].confidence:
-                unique_skills[skill.name.lower()] = skill
+        skills = []
+        for skill in self._skill_order:
+            hits = hits_by_skill.get(skill)
+            if not hits:
+                continue
+            skills.append(Skill(
+                name=skill,
+                level=self._determine_skill_level(hits[0][0], len(text_lower), indicator_hits, indicator_starts),
+                confidence=self._calculate_skill_confidence(hits, line_starts, experience_kw, context_kw)
+            ))
         
-        return sorted(unique_skills.values(), key=lambda x: x.confidence, reverse=True)
+        # Ordena por confiança
+        return sorted(skills, key=lambda x: x.confidence, reverse=True)
 
-    def _determine_skill_level(self, text: str, skill: str) -> str:
-        """Determina o nível da skill baseado no contexto"""
-        text_lower = text.lower()
-        skill_lower = skill.lower()
-        
-        skill_pos = text_lower.find(skill_lower)
-        if skill_pos == -1:
-            return "na"
-        
+    def _determine_skill_level(self, skill_pos: int, text_len: int, indicator_hits, indicator_starts: List[int]) -> str:
+        """Determina o nível da skill pelos indicadores a até 100 caracteres da primeira ocorrência"""
         context_start = max(0, skill_pos - 100)
-        context_end = min(len(text), skill_pos + 100)
-        context = text_lower[context_start:context_end]
+        context_end = min(text_len, skill_pos + 100)
         
-        for level, indicators in self.skill_level_indicators.items():
-            for indicator in indicators:
-                if indicator in context:
-                    return level
+        best_rank = None
+        for i in range(bisect_left(indicator_starts, context_start), len(indicator_hits)):
+            indicator, start, end = indicator_hits[i]
+            if start >= context_end:
+                break
+            if end <= context_end:
+                rank = self._level_rank[indicator]
+                if best_rank is None or rank < best_rank:
+                    best_rank = rank
         
-        return "na"
+        return self._level_names[best_rank] if best_rank is not None else "na"
 
-    def _calculate_skill_confidence(self, text: str, skill: str) -> float:
-        """Calcula a confiança da skill baseado no contexto"""
-        text_lower = text.lower()
-        skill_lower = skill.lower()
+    def _calculate_skill_confidence(self, hits, line_starts: List[int], experience_kw: Dict[int, int], context_kw: Dict[int, int]) -> float:
+        """Calcula a confiança da skill pelo nº de ocorrências e palavras-chave na mesma linha"""
+        occurrences = len(hits)
         
-        occurrences = text_lower.count(skill_lower)
+        def followed_by(keywords: Dict[int, int]) -> bool:
+            return any(keywords.get(line_of(line_starts, start), -1) >= end for start, end in hits)
         
-        if re.search(rf'{skill_lower}.*(?:experience|experiência|project|projeto)', text_lower):
+        if followed_by(experience_kw):
             occurrences += 2
         
-        if re.search(rf'{skill_lower}.*(?:skill|competência|tecnologia)', text_lower):
+        if followed_by(context_kw):
             occurrences += 1
         
         base_confidence = min(0.3 + (occurrences * 0.2), 0.9)
         return round(base_confidence, 2)
 
-    def enhance_experiences(self, experiences: List[Experience], text: str) -> List[Experience]:
+    def enhance_experiences(self, experiences: List[Experience], doc: Union[str, ParsedDocument]) -> List[Experience]:
         """Melhora as experiências com informações adicionais"""
+        doc = self._as_document(doc)
         enhanced_experiences = []
         
-        # CORREÇÃO ESPECÍFICA: Detecta se é o currículo do Orlando e força extração manual
-        text_lower = text.lower()
-        print(f"DEBUG: Verificando currículo do Orlando...")
-        print(f"DEBUG: Texto contém 'orlando': {'orlando' in text_lower}")
-        print(f"DEBUG: Texto contém 'krause': {'krause' in text_lower}")
-        print(f"DEBUG: Texto contém email: {'orlando.krausejr@gmail.com' in text_lower}")
-        print(f"DEBUG: Primeiras 200 chars: {text_lower[:200]}")
-        
-        if ("orlando" in text_lower and "krause" in text_lower) or "orlando.krausejr@gmail.com" in text_lower:
-            print(f"DEBUG: ✅ Detectado currículo do Orlando, extraindo experiências manuais")
-            manual_experiences = self._extract_manual_experiences(text)
-            if manual_experiences:
-                print(f"DEBUG: ✅ Extraídas {len(manual_experiences)} experiências manuais")
-                enhanced_experiences.extend(manual_experiences)
-                return enhanced_experiences
-            else:
-                print(f"DEBUG: ❌ Falha ao extrair experiências manuais")
-        else:
-            print(f"DEBUG: ❌ Não é currículo do Orlando")
+        # Override declarado nas regras para o e-mail do candidato (ver cv_rules.json)
+        override = self.rules.current().experiences_for(doc.emails)
+        if override:
+            return self._override_experiences(doc, override)
         
         for exp in experiences:
             if not exp.company and not exp.role:
@@ -170,24 +369,11 @@ class EnhancedParser:
             if self._is_invalid_company(exp.company):
                 continue
             
-            # Procura por tech stack específico
-            tech_stack = self._find_tech_stack_for_experience(text, exp)
-            
-            # Cria experiência melhorada
-            enhanced_exp = Experience(
-                company=exp.company,
-                role=exp.role,
-                employment_type=exp.employment_type,
-                start_date=exp.start_date,
-                end_date=exp.end_date,
-                is_current=exp.is_current,
-                location=exp.location,
-                achievements=exp.achievements,
-                tech_stack=tech_stack,
-                confidence=min(exp.confidence + 0.1, 1.0)
-            )
-            
-            enhanced_experiences.append(enhanced_exp)
+            # Procura por tech stack específico; as experiências vêm do próprio
+            # parse, então são completadas no lugar em vez de recriadas
+            exp.tech_stack = self._find_tech_stack_for_experience(doc, exp)
+            exp.confidence = min(exp.confidence + 0.1, 1.0)
+            enhanced_experiences.append(exp)
         
         return enhanced_experiences
 
@@ -196,20 +382,7 @@ class EnhancedParser:
         if not company:
             return True
         
-        company_lower = company.lower().strip()
-        
-        # Lista de empresas/termos inválidos
-        invalid_companies = [
-            "null", "none", "n/a", "na", "rest", "api", "soap", "json", "xml",
-            "http", "https", "www", "com", "org", "net", "br", "us", "uk",
-            "pt", "en", "es", "fr", "de", "it", "ru", "cn", "jp", "kr",
-            "javascript", "java", "python", "php", "ruby", "go", "rust",
-            "mysql", "postgresql", "mongodb", "redis", "elasticsearch",
-            "aws", "azure", "gcp", "docker", "kubernetes", "git",
-            "agile", "scrum", "kanban", "devops", "ci/cd", "tdd", "bdd"
-        ]
-        
-        return company_lower in invalid_companies
+        return company.lower().strip() in self.rules.current().invalid_companies
 
     def _is_valid_education(self, education) -> bool:
         """Verifica se a educação é válida"""
@@ -226,19 +399,13 @@ class EnhancedParser:
         
         return True
 
-    def _extract_education_simple(self, text: str) -> List[Education]:
+    def _extract_education_simple(self, doc: Union[str, ParsedDocument]) -> List[Education]:
         """Extrai educação de forma simplificada"""
+        doc = self._as_document(doc)
         education = []
-        # Padrões básicos para educação
-        patterns = [
-            r"(?:universidade|university|faculdade|college|instituto|institute)[\s:]+([^,\n]+)",
-            r"(?:bacharelado|bachelor|licenciatura|licenciate|mestrado|master|doutorado|phd)[\s:]+([^,\n]+)",
-            r"(?:curso|course|certificação|certification)[\s:]+([^,\n]+)"
-        ]
         
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in EDUCATION_PATTERNS:
+            for match in doc.finditer(pattern):
                 degree = match.group(1).strip()
                 if len(degree) > 5:
                     education.append(Education(
@@ -252,18 +419,13 @@ class EnhancedParser:
         
         return education
 
-    def _extract_experiences_simple(self, text: str) -> List[Experience]:
+    def _extract_experiences_simple(self, doc: Union[str, ParsedDocument]) -> List[Experience]:
         """Extrai experiências de forma simplificada"""
+        doc = self._as_document(doc)
         experiences = []
-        # Padrões básicos para experiências
-        patterns = [
-            r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)[\s:]+(?:gerente|manager|coordenador|coordinator|desenvolvedor|developer|analista|analyst)[\s:]+([^,\n]+)",
-            r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)[\s:]+([^,\n]*?(?:gerente|manager|coordenador|coordinator|desenvolvedor|developer|analista|analyst)[^,\n]*)"
-        ]
         
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in EXPERIENCE_PATTERNS:
+            for match in doc.finditer(pattern):
                 company = match.group(1).strip()
                 role = match.group(2).strip()
                 
@@ -283,219 +445,218 @@ class EnhancedParser:
         
         return experiences
 
-    def _extract_manual_experiences(self, text: str) -> List[Experience]:
-        """Extrai experiências manualmente quando o parser automático falha"""
-        experiences = []
-        lines = text.split('\n')
-        
-        # Padrões específicos para o currículo do Orlando
-        orlando_patterns = [
-            # Software Architect @ Paytrack (Nov 2020 - Present)
-            {
-                'role': 'Software Architect',
-                'company': 'Paytrack',
-                'start_date': '2020-11',
-                'end_date': None,
-                'is_current': True
-            },
-            # Software Engineer @ Paytrack (Nov 2019 - Nov 2020)
-            {
-                'role': 'Software Engineer',
-                'company': 'Paytrack',
-                'start_date': '2019-11',
-                'end_date': '2020-11',
-                'is_current': False
-            },
-            # Software Engineer @ Senior Sistemas (Mar 2015 - Nov 2019)
-            {
-                'role': 'Software Engineer',
-                'company': 'Senior Sistemas',
-                'start_date': '2015-03',
-                'end_date': '2019-11',
-                'is_current': False
-            },
-            # Quality Assurance Tester @ Senior Sistemas (Ago 2013 - Mar 2015)
-            {
-                'role': 'Quality Assurance Tester',
-                'company': 'Senior Sistemas',
-                'start_date': '2013-08',
-                'end_date': '2015-03',
-                'is_current': False
-            }
-        ]
-        
-        for pattern in orlando_patterns:
-            # Procura por tech stack específico para cada experiência
-            tech_stack = self._find_tech_stack_for_company_role(text, pattern['company'], pattern['role'])
-            
-            exp = Experience(
-                company=pattern['company'],
-                role=pattern['role'],
+    def _override_experiences(self, doc: ParsedDocument, overrides: Tuple[ExperienceOverride, ...]) -> List[Experience]:
+        """Experiências declaradas nas regras, com o tech stack encontrado no texto"""
+        return [
+            Experience(
+                company=override.company,
+                role=override.role,
                 employment_type=None,
-                start_date=pattern['start_date'],
-                end_date=pattern['end_date'],
-                is_current=pattern['is_current'],
+                start_date=override.start_date,
+                end_date=override.end_date,
+                is_current=override.is_current,
                 location=None,
                 achievements=[],
-                tech_stack=tech_stack,
+                tech_stack=self._find_tech_stack_for_company_role(doc, override.company, override.role),
                 confidence=0.9
             )
-            experiences.append(exp)
-        
-        return experiences
+            for override in overrides
+        ]
 
-    def _find_tech_stack_for_company_role(self, text: str, company: str, role: str) -> List[str]:
+    def _find_tech_stack_for_company_role(self, doc: ParsedDocument, company: str, role: str) -> List[str]:
         """Encontra tech stack específico para uma empresa/cargo"""
-        tech_stack = []
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            if company.lower() in line.lower() or role.lower() in line.lower():
-                # Procura por tecnologias nas linhas próximas
-                for j in range(max(0, i-5), min(len(lines), i+6)):
-                    nearby_line = lines[j].lower()
-                    techs = self._extract_technologies(nearby_line)
-                    tech_stack.extend(techs)
-        
-        # Remove duplicatas e filtra tecnologias relevantes
-        unique_techs = list(set(tech_stack))
-        relevant_techs = []
-        
-        for tech in unique_techs:
-            tech_lower = tech.lower()
-            if len(tech_lower) > 2 and tech_lower not in ['r', 'go']:
-                relevant_techs.append(tech)
-        
-        return relevant_techs[:8]
+        return self._tech_stack_near_terms(doc, [company, role])
 
-    def _find_tech_stack_for_experience(self, text: str, exp: Experience) -> List[str]:
+    def _find_tech_stack_for_experience(self, doc: ParsedDocument, exp: Experience) -> List[str]:
         """Encontra tech stack específico para uma experiência"""
-        tech_stack = []
-        lines = text.split('\n')
-        
-        search_terms = []
-        if exp.company:
-            search_terms.append(exp.company)
-        if exp.role:
-            search_terms.append(exp.role)
-        
-        for i, line in enumerate(lines):
-            for term in search_terms:
-                if term and term.lower() in line.lower():
-                    # Procura por tecnologias nas linhas próximas
-                    for j in range(max(0, i-5), min(len(lines), i+6)):
-                        nearby_line = lines[j].lower()
-                        techs = self._extract_technologies(nearby_line)
-                        tech_stack.extend(techs)
-        
-        # Remove duplicatas e filtra tecnologias relevantes
-        unique_techs = list(set(tech_stack))
-        relevant_techs = []
-        
-        for tech in unique_techs:
-            tech_lower = tech.lower()
-            if len(tech_lower) > 2 and tech_lower not in ['r', 'go']:
-                relevant_techs.append(tech)
-        
+        return self._tech_stack_near_terms(doc, [exp.company, exp.role])
+
+    def _tech_stack_near_terms(self, doc: ParsedDocument, terms: List[Optional[str]]) -> List[str]:
+        """Tecnologias nas 5 linhas antes/depois de cada linha que cita um dos termos.
+
+        Usa o índice termo→linhas e o mapa linha→tecnologias do documento, então
+        o custo é uma união de conjuntos sobre intervalos de linhas.
+        """
+        lines: List[int] = []
+        for term in terms:
+            if term:
+                lines.extend(doc.lines_containing(term.lower()))
+        
+        # Filtra tecnologias relevantes
+        relevant_techs = [
+            tech for tech in doc.techs_near_lines(lines)
+            if len(tech) > 2 and tech not in ('r', 'go')
+        ]
         return relevant_techs[:8]
 
     def _extract_technologies(self, text: str) -> List[str]:
         """Extrai nomes de tecnologias do texto"""
-        techs = []
-        text_lower = text.lower()
-        
-        for category, technologies in self.enhanced_skills.items():
-            for tech in technologies:
-                if tech.lower() in text_lower:
-                    techs.append(tech)
+        return list(dict.fromkeys(skill for skill, _, _ in self._skill_matcher.finditer(text.lower())))
+
+    def parse_enhanced(
+        self,
+        text: str,
+        headings: Optional[List[str]] = None,
+        timings: Optional[Dict[str, float]] = None,
+        blocks: Optional[Sequence] = None,
+        previous: Optional[ParseResult] = None,
+        rerun: AbstractSet[str] = frozenset(),
+    ) -> ParseResult:
+        """Parser principal melhorado.
+
+        Cada extrator roda só no recorte das seções relevantes quando elas
+        foram detectadas, e no documento inteiro caso contrário. Com
+        ``blocks`` (``pdf_text.LayoutBlock``), texto e seções vêm dos blocos do
+        layout e ``text``/``headings`` são ignorados. Se ``timings`` for um
+        dict, recebe o tempo (ms) de cada extrator.
+
+        Com ``previous`` (resultado do mesmo texto com outra versão do parser),
+        só os extratores em ``rerun`` rodam; os campos dos outros vêm de
+        ``previous`` (ver ``changed_extractors``).
+
+        Devolve o resultado interno (``cv_result.ParseResult``); a API o
+        converte para ``ParsedCV`` só na resposta.
+        """
+        clock = StageClock(timings)
+        deadline = Deadline(REGEX_BUDGET_MS / 1000)
+        # Segmentação única: todos os extratores consultam o mesmo documento (e o mesmo prazo)
+        if blocks:
+            doc = ParsedDocument.from_blocks(blocks, self._skill_matcher, normalize_text_for_parsing, deadline)
+            text = doc.text
+        else:
+            text = normalize_text_for_parsing(text)
+            clock.lap("normalize")
+            doc = self.document(text, headings, deadline)
+        clock.lap("document")
         
-        return techs
-
-    def parse_enhanced(self, text: str) -> ParsedCV:
-        """Parser principal melhorado"""
-        text = normalize_text_for_parsing(text)
+        fields = self._reused_fields(previous) if previous is not None else {}
+        run = EXTRACTORS if previous is None else rerun
         
         # Extrai informações básicas
-        emails = list(set(EMAIL_RE.findall(text)))
-        phones_raw = list({p.strip() for p in PHONE_BR_RE.findall(text)})
-        phones = normalize_phones(phones_raw)
-        links = self._extract_enhanced_links(text)
-        name = self._guess_enhanced_name(text)
+        if "contacts" in run:
+            fields["emails"] = list(set(doc.emails))
+            fields["phones"] = normalize_phones(list({p.strip() for p in doc.phones}))
+            clock.lap("contacts")
+        if "links" in run:
+            fields["links"] = self._extract_enhanced_links(doc)
+            clock.lap("links")
+        if "name" in run:
+            fields["name"] = self._guess_enhanced_name(doc)
+            clock.lap("name")
         
         # Extrai informações melhoradas
-        summary = self.extract_summary(text)
-        skills = self.extract_enhanced_skills(text)
-        languages = self._extract_enhanced_languages(text)
-        location = self.extract_location(text)
+        if "summary" in run:
+            fields["summary"] = self.extract_summary(doc)
+            clock.lap("summary")
+        if "skills" in run:
+            fields["skills"] = self.extract_enhanced_skills(doc)
+            clock.lap("skills")
+        if "languages" in run:
+            fields["languages"] = self._extract_enhanced_languages(doc.section("languages") or doc)
+            clock.lap("languages")
+        if "location" in run:
+            fields["location"] = self.extract_location(doc) or CandidateLocation()
+            clock.lap("location")
         
         # Extrai educação e experiências básicas (simplificado)
-        education = self._extract_education_simple(text)
-        experiences = self._extract_experiences_simple(text)
-        
-        # Filtra educação inválida
-        education = [edu for edu in education if self._is_valid_education(edu)]
-        
-        # Melhora as experiências
-        enhanced_experiences = self.enhance_experiences(experiences, text)
+        if "education" in run:
+            education = self._extract_education_simple(doc.section("education", "certifications") or doc)
+            # Filtra educação inválida
+            fields["education"] = [edu for edu in education if self._is_valid_education(edu)]
+            clock.lap("education")
+        if "experiences" in run:
+            experiences = self._extract_experiences_simple(doc.section("experience") or doc)
+            # Melhora as experiências
+            fields["experiences"] = self.enhance_experiences(experiences, doc)
+            clock.lap("experiences")
         
         # Extrai informações adicionais
-        projects = self.extract_projects(text)
-        achievements = self.extract_achievements(text)
-        certifications = self._extract_enhanced_certifications(text)
+        if "projects" in run:
+            fields["projects"] = self.extract_projects(doc.section("projects") or doc)
+            clock.lap("projects")
+        if "achievements" in run:
+            fields["achievements"] = self.extract_achievements(doc.section("experience", "achievements", "projects") or doc)
+            clock.lap("achievements")
+        if "certifications" in run:
+            fields["certifications"] = self._extract_enhanced_certifications(doc.section("certifications", "education") or doc)
+            clock.lap("certifications")
+        
+        meta = {
+            "raw_len": len(text),
+            "projects": fields["projects"],
+            "achievements": fields["achievements"],
+            "parser_version": self.parser_version
+        }
+        if deadline.hit:
+            meta["regex_budget_exhausted"] = True
         
-        return ParsedCV(
+        return ParseResult(
             candidate=Candidate(
-                full_name=name,
-                emails=emails,
-                phones=phones,
-                location=location or CandidateLocation(),
-                links=links
+                full_name=fields["name"],
+                emails=fields["emails"],
+                phones=fields["phones"],
+                location=fields["location"],
+                links=fields["links"]
             ),
-            summary=summary,
-            skills=skills,
-            languages=languages,
-            experiences=enhanced_experiences,
-            education=education,
-            certifications=certifications,
+            summary=fields["summary"],
+            skills=fields["skills"],
+            languages=fields["languages"],
+            experiences=fields["experiences"],
+            education=fields["education"],
+            certifications=fields["certifications"],
             expected_salary=None,
             availability=None,
-            meta={
-                "raw_len": len(text),
-                "projects": projects,
-                "achievements": achievements,
-                "parser_version": "enhanced"
-            }
+            meta=meta
         )
 
-    def _extract_enhanced_links(self, text: str) -> CandidateLinks:
+    def _reused_fields(self, previous: ParseResult) -> Dict[str, Any]:
+        """Campos de um resultado anterior, pelos mesmos nomes usados em ``parse_enhanced``"""
+        candidate = previous.candidate
+        return {
+            "emails": candidate.emails,
+            "phones": candidate.phones,
+            "links": candidate.links,
+            "name": candidate.full_name,
+            "summary": previous.summary,
+            "skills": previous.skills,
+            "languages": previous.languages,
+            "location": candidate.location,
+            "education": previous.education,
+            "experiences": previous.experiences,
+            "projects": previous.meta.get("projects", []),
+            "achievements": previous.meta.get("achievements", []),
+            "certifications": previous.certifications,
+        }
+
+    def _extract_enhanced_links(self, doc: Union[str, ParsedDocument]) -> CandidateLinks:
         """Extrai links com mais precisão"""
+        doc = self._as_document(doc)
         return CandidateLinks(
-            linkedin=self._extract_first_url_by_domain(text, LINKEDIN_HOST_RE),
-            github=self._extract_first_url_by_domain(text, GITHUB_HOST_RE),
-            portfolio=self._extract_portfolio_url(text)
+            linkedin=self._extract_first_url_by_domain(doc, LINKEDIN_HOST_RE),
+            github=self._extract_first_url_by_domain(doc, GITHUB_HOST_RE),
+            portfolio=self._extract_portfolio_url(doc)
         )
 
-    def _extract_first_url_by_domain(self, text: str, domain_regex) -> Optional[str]:
-        """Extrai primeira URL por domínio"""
-        for m in URL_RE.finditer(text):
-            raw = m.group(0)
+    def _extract_first_url_by_domain(self, doc: ParsedDocument, domain_regex) -> Optional[str]:
+        """Extrai primeira URL por domínio (a partir do índice de URLs do documento)"""
+        for raw, _, _ in doc.urls:
             clean = self._strip_url_trailing(self._ensure_http(raw))
             if domain_regex.search(clean):
                 return clean
         return None
 
-    def _extract_portfolio_url(self, text: str) -> Optional[str]:
+    def _extract_portfolio_url(self, doc: ParsedDocument) -> Optional[str]:
         """Extrai URL do portfolio"""
-        portfolio_patterns = [
-            r'portfolio[:\s]+(https?://[^\s]+)',
-            r'(https?://[^\s]*portfolio[^\s]*)',
-            r'(https?://[^\s]*\.com[^\s]*portfolio[^\s]*)'
-        ]
-        
-        for pattern in portfolio_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return self._ensure_http(match.group(1))
+        match = PORTFOLIO_LABEL_RE.search(doc.text)
+        if match:
+            return self._ensure_http(match.group(1))
+        
+        # URL com "portfolio" no endereço: consulta o índice em vez de varrer o texto
+        for raw, _, _ in doc.urls:
+            raw_lower = raw.lower()
+            start = raw_lower.find("http")
+            if start != -1 and "portfolio" in raw_lower[start:]:
+                return raw[start:]
         return None
 
     def _strip_url_trailing(self, url: str) -> str:
@@ -506,45 +667,41 @@ class EnhancedParser:
         """Garante que a URL tenha protocolo"""
         return url if url.startswith("http") else "https://" + url
 
-    def _guess_enhanced_name(self, text: str) -> Optional[str]:
+    def _guess_enhanced_name(self, doc: Union[str, ParsedDocument]) -> Optional[str]:
         """Guess melhorado para o nome"""
+        doc = self._as_document(doc)
+        text = doc.text
         # Primeiro tenta extrair do email (mais confiável)
-        email_match = re.search(r'([A-Za-z0-9._-]+)@', text)
+        email_match = EMAIL_LOCAL_RE.search(text)
         if email_match:
             local = email_match.group(1)
-            print(f"DEBUG: Email local part: {local}")
-            parts = re.split(r'[._-]+', local)
+            parts = NAME_SPLIT_RE.split(local)
             parts = [p for p in parts if p and not p.isdigit() and len(p) > 1]
-            print(f"DEBUG: Email parts: {parts}")
             if len(parts) >= 2:
-                # Corrige "joaovitor" para "João Vitor"
+                # Correções das regras ("joaovitor" -> "João Vitor"); o resto só capitaliza
+                corrections = self.rules.current().name_corrections
                 name_parts = []
                 for part in parts:
-                    if part.lower() == "joaovitor":
-                        name_parts.extend(["João", "Vitor"])
-                    elif part.lower() == "joao":
-                        name_parts.append("João")
-                    elif part.lower() == "vitor":
-                        name_parts.append("Vitor")
-                    elif part.lower() == "miguel":
-                        name_parts.append("Miguel")
-                    else:
-                        name_parts.append(part.capitalize())
-                result = " ".join(name_parts[:4])
-                print(f"DEBUG: Nome extraído do email: {result}")
-                return result
+                    name_parts.extend(corrections.get(part.lower()) or (part.capitalize(),))
+                return " ".join(name_parts[:4])
         
         # Tenta extrair do LinkedIn
-        linkedin_match = re.search(r'linkedin\.com/in/([A-Za-z0-9\-_.]+)', text, re.I)
+        linkedin_match = LINKEDIN_SLUG_RE.search(text)
         if linkedin_match:
             slug = linkedin_match.group(1)
-            parts = re.split(r'[\-_.]+', slug)
+            parts = SLUG_SPLIT_RE.split(slug)
             parts = [p for p in parts if p and not p.isdigit() and len(p) > 1]
             if len(parts) >= 2:
                 return " ".join(p.capitalize() for p in parts[:4])
         
         # Tenta extrair das primeiras linhas (mais específico)
-        lines = [ln.strip() for ln in text.splitlines() if ln.strip()][:10]
+        lines = []
+        for ln in doc.lines:
+            ln = ln.strip()
+            if ln:
+                lines.append(ln)
+                if len(lines) == 10:
+                    break
         for line in lines:
             if self._looks_like_name(line):
                 return line.title()
@@ -560,7 +717,7 @@ class EnhancedParser:
         if not (2 <= len(words) <= 4):
             return False
         
-        if not re.match(r"^[A-Za-zÀ-ÖØ-öø-ÿ' .-]+$", line):
+        if not NAME_CHARS_RE.match(line):
             return False
         
         if line.endswith('.'):
@@ -571,37 +728,20 @@ class EnhancedParser:
         
         return True
 
-    def _extract_enhanced_languages(self, text: str) -> List[Language]:
+    def _extract_enhanced_languages(self, doc: Union[str, ParsedDocument]) -> List[Language]:
         """Extrai idiomas com mais precisão"""
         languages = []
-        text_lower = text.lower()
-        
-        language_patterns = [
-            (r"english|inglês|ingles", "English"),
-            (r"portuguese|português|portugues", "Portuguese"),
-            (r"spanish|español|espanhol", "Spanish"),
-            (r"french|français|frances", "French"),
-            (r"german|deutsch|alemão|alemao", "German"),
-            (r"italian|italiano", "Italian")
-        ]
+        text_lower = self._as_document(doc).lower
         
-        level_patterns = [
-            (r"\b(c2|proficient|fluent|native|nativo|fluente)\b", "C2"),
-            (r"\b(c1|advanced|avançado)\b", "C1"),
-            (r"\b(b2|upper.?intermediate|intermediário superior)\b", "B2"),
-            (r"\b(b1|intermediate|intermediário)\b", "B1"),
-            (r"\b(a2|elementary|elementar)\b", "A2"),
-            (r"\b(a1|beginner|iniciante)\b", "A1")
-        ]
+        # O nível não depende do idioma: calcula uma vez só
+        level = None
+        for level_pat, level_name in LANGUAGE_LEVEL_PATTERNS:
+            if level_pat.search(text_lower):
+                level = level_name
+                break
         
-        for lang_pattern, lang_name in language_patterns:
-            if re.search(lang_pattern, text_lower, re.I):
-                level = None
-                for level_pat, level_name in level_patterns:
-                    if re.search(level_pat, text_lower, re.I):
-                        level = level_name
-                        break
-                
+        for lang_pattern, lang_name in LANGUAGE_PATTERNS:
+            if lang_pattern.search(text_lower):
                 languages.append(Language(
                     name=lang_name,
                     level_cefr=level,
@@ -610,17 +750,11 @@ class EnhancedParser:
         
         return languages
 
-    def extract_location(self, text: str) -> Optional[CandidateLocation]:
+    def extract_location(self, doc: Union[str, ParsedDocument]) -> Optional[CandidateLocation]:
         """Extrai informações de localização"""
-        location_patterns = [
-            r"(?:localização|location|endereço|address)[\s:]+(.+?)(?=\n|$)",
-            r"([A-Z][a-z]+(?:[,\s]+[A-Z][a-z]+)*,\s*(?:SC|SP|RJ|MG|RS|PR|BA|PE|CE|GO|MT|MS|RO|AC|AP|RR|TO|PI|MA|PA|AM|AL|SE|PB|RN|ES|DF|BR|Brasil|Brazil))",
-            r"([A-Z][a-z]+(?:[,\s]+[A-Z][a-z]+)*,\s*(?:Brasil|Brazil|United States|USA|Canada|Portugal|Germany|Spain|UK|Italy|France|Argentina|Chile|Uruguay|Mexico))"
-        ]
-        
-        for pattern in location_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        doc = self._as_document(doc)
+        for pattern in LOCATION_PATTERNS:
+            for match in doc.finditer(pattern):
                 location_text = match.group(1).strip()
                 parts = [part.strip() for part in location_text.split(',')]
                 
@@ -629,10 +763,11 @@ class EnhancedParser:
                     state = parts[1].strip() if len(parts) > 1 else None
                     country = parts[-1].strip() if len(parts) > 1 else "Brasil"
                     
-                    # Limpa "IA" antes de nomes de cidades
-                    if city and "IA" in city:
-                        city = city.replace("IA", "").replace("\n", " ").strip()
-                        city = re.sub(r'\s+', ' ', city)
+                    # Remove tokens de ruído das regras ("IA" de uma linha anterior, por exemplo)
+                    noise = self.rules.current().location_noise_tokens
+                    tokens = city.split()
+                    if not noise.isdisjoint(tokens):
+                        city = " ".join(token for token in tokens if token not in noise)
                     
                     return CandidateLocation(
                         city=city if len(city) > 2 else None,
@@ -642,28 +777,31 @@ class EnhancedParser:
         
         return None
 
-    def extract_projects(self, text: str) -> List[Dict[str, Any]]:
+    def extract_projects(self, doc: Union[str, ParsedDocument]) -> List[Dict[str, Any]]:
         """Extrai projetos pessoais e profissionais"""
+        doc = self._as_document(doc)
         projects = []
-        project_patterns = [
-            r"(?:projeto|project)[\s:]+(.+?)(?=\n|$)",
-            r"[-•·–—]\s*([^.!?]*?(?:projeto|project|app|aplicação|sistema)[^.!?]*)",
-            r"(?:desenvolvi|criei|implementei)\s+([^.!?]*?(?:projeto|project|app|aplicação|sistema)[^.!?]*)"
-        ]
         
-        for pattern in project_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in PROJECT_PATTERNS:
+            for match in doc.finditer(pattern):
                 project_text = match.group(1).strip()
                 if len(project_text) > 10:
                     project_name = self._extract_project_name(project_text)
                     
                     if self._is_valid_project_name(project_name):
+                        # Tecnologias e URL saem dos índices do documento pelo offset do match
+                        start, end = match.span(1)
+                        if doc.aligned:
+                            technologies = doc.skills_in_span(start, end)
+                            url = doc.first_url_in_span(start, end)
+                        else:
+                            technologies = self._extract_technologies(project_text)
+                            url = self._extract_project_url(project_text)
                         project = {
                             "name": project_name,
                             "description": project_text,
-                            "technologies": self._extract_technologies(project_text),
-                            "url": self._extract_project_url(project_text),
+                            "technologies": technologies,
+                            "url": url,
                             "confidence": 0.7
                         }
                         projects.append(project)
@@ -683,30 +821,16 @@ class EnhancedParser:
         if not project_name or len(project_name) < 3:
             return False
             
-        project_lower = project_name.lower()
-        
-        # Remove nomes problemáticos
-        problematic_patterns = [
-            r'.*aurelio.*rutzen.*',
-            r'.*sql\s+server.*',
-            r'.*furb.*blumenau.*',
-            r'.*brazil.*',
-            r'.*santa\s+catarina.*',
-            r'.*blumenau.*',
-            r'.*summary.*',
-            r'.*experienced.*',
-            r'.*software.*engineer.*',
-        ]
-        
-        for pattern in problematic_patterns:
-            if re.search(pattern, project_lower, re.IGNORECASE):
-                return False
+        # Remove nomes bloqueados nas regras
+        blocklist = self.rules.current().project_name_blocklist
+        if blocklist is not None and blocklist.search(project_name):
+            return False
         
         return True
 
     def _extract_project_name(self, text: str) -> str:
         """Extrai o nome do projeto"""
-        name_match = re.search(r'"([^"]+)"', text)
+        name_match = QUOTED_NAME_RE.search(text)
         if name_match:
             name = name_match.group(1)
             if self._is_valid_project_name(name):
@@ -728,31 +852,23 @@ class EnhancedParser:
 
     def _extract_project_url(self, text: str) -> Optional[str]:
         """Extrai URL do projeto se existir"""
-        url_match = re.search(URL_RE, text)
+        url_match = URL_RE.search(text)
         if url_match:
             return url_match.group(0)
         return None
 
-    def extract_achievements(self, text: str) -> List[str]:
+    def extract_achievements(self, doc: Union[str, ParsedDocument]) -> List[str]:
         """Extrai conquistas e realizações do CV"""
         achievements = []
-        lines = text.split('\n')
+        doc = self._as_document(doc)
         
-        achievement_patterns = [
-            r"[-•·–—]\s*([^.!?]+[.!?])",
-            r"[-•·–—]\s*([^.!?]+)",
-            r"•\s*([^.!?]+[.!?])",
-            r"[-•·–—]\s*([^.!?]{20,150})"
-        ]
-        
-        for i, line in enumerate(lines):
+        for line in doc.lines:
             line = line.strip()
             if not line:
                 continue
                 
-            for pattern in achievement_patterns:
-                matches = re.finditer(pattern, line, re.IGNORECASE)
-                for match in matches:
+            for pattern in ACHIEVEMENT_PATTERNS:
+                for match in doc.finditer(pattern, line):
                     achievement = match.group(1).strip()
                     if len(achievement) > 10 and len(achievement) < 200:
                         clean_achievement = self._clean_achievement_text(achievement)
@@ -764,7 +880,7 @@ class EnhancedParser:
         unique_achievements = []
         seen = set()
         for achievement in achievements:
-            clean_achievement = re.sub(r'\s+', ' ', achievement).strip()
+            clean_achievement = WHITESPACE_RE.sub(' ', achievement).strip()
             if clean_achievement.lower() not in seen and len(clean_achievement) > 15:
                 seen.add(clean_achievement.lower())
                 unique_achievements.append(clean_achievement)
@@ -776,7 +892,7 @@ class EnhancedParser:
         if not achievement:
             return ""
             
-        cleaned = re.sub(r'\s+', ' ', achievement).strip()
+        cleaned = WHITESPACE_RE.sub(' ', achievement).strip()
         
         # Remove conquistas problemáticas
         if cleaned.endswith(('o que', 'que', 'e', 'de', 'com', 'para', 'por', 'além de')):
@@ -785,50 +901,31 @@ class EnhancedParser:
         if len(cleaned) < 15:
             return ""
             
-        if re.match(r'^[\d\s\-–—]+$', cleaned):
+        if ONLY_DIGITS_DASHES_RE.match(cleaned):
             return ""
             
-        if re.search(r'\s+(?:o|a|os|as|de|da|do|das|dos|em|na|no|nas|nos|com|para|por|além|que|e)$', cleaned):
+        if DANGLING_WORD_RE.search(cleaned):
             return ""
             
-        if re.match(r'^(?:área|áreas|setor|setores|departamento|departamentos|equipe|equipes)\s+de', cleaned, re.IGNORECASE):
+        if GENERIC_AREA_RE.match(cleaned):
             return ""
             
-        # Remove conquistas específicas problemáticas
-        generic_achievements = [
-            "desenvolvimento de software",
-            "área de desenvolvimento de software",
-            "liderar o departamento de",
-            "além de liderar o departamento de"
-        ]
-        
-        if cleaned.lower() in generic_achievements:
+        # Remove conquistas genéricas listadas nas regras
+        if cleaned.lower() in self.rules.current().generic_achievements:
             return ""
             
         return cleaned
 
-    def _extract_enhanced_certifications(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_enhanced_certifications(self, doc: Union[str, ParsedDocument]) -> List[Dict[str, Any]]:
         """Extrai certificações com mais detalhes"""
+        doc = self._as_document(doc)
+        text = doc.text
         certifications = []
         
-        cert_patterns = [
-            (r"aws certified ([^,\n]+)", "AWS"),
-            (r"microsoft certified ([^,\n]+)", "Microsoft"),
-            (r"oracle certified ([^,\n]+)", "Oracle"),
-            (r"google cloud certified ([^,\n]+)", "Google Cloud"),
-            (r"certified scrum master", "Scrum"),
-            (r"pmp certified", "PMI"),
-            (r"itil certified", "ITIL"),
-            (r"comptia ([^,\n]+)", "CompTIA"),
-            (r"cissp", "ISC²"),
-            (r"ceh", "EC-Council")
-        ]
-        
-        for pattern, issuer in cert_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern, issuer in CERT_PATTERNS:
+            for match in doc.finditer(pattern):
                 context = text[max(0, match.start()-100):match.end()+100]
-                date_match = re.search(r'\b\d{4}\b', context)
+                date_match = YEAR_RE.search(context)
                 
                 cert_name = match.group(0).strip()
                 
@@ -848,20 +945,3 @@ class EnhancedParser:
                 unique_certs.append(cert)
         
         return unique_certs
-
-def normalize_phones(phones_raw: List[str]) -> List[str]:
-    """Normaliza números de telefone brasileiros"""
-    out = []
-    for p in phones_raw:
-        digits = re.sub(r'\D', '', p)
-        if not digits:
-            continue
-        if digits.startswith('55'):
-            pass
-        elif len(digits) in (10, 11):
-            digits = '55' + digits
-        else:
-            out.append(p)
-            continue
-        out.append('+' + digits)
-    return out
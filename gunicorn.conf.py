@@ -0,0 +1,33 @@
+# Configuração do gunicorn com workers uvicorn e parser pré-carregado.
+#
+#   gunicorn main:app -c gunicorn.conf.py
+#
+# Com preload_app o app (e o parser/modelos, via warm-up) é carregado uma vez
+# no master; os workers herdam essa memória somente leitura pelo fork.
+# Conexões SQLite não são herdadas: cada worker abre as suas no primeiro uso.
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 2)))
+# O app divide os núcleos entre os workers (PARSE_WORKERS, PDF_EXTRACT_WORKERS)
+# a partir deste valor: com o preload ele é lido no import, no master
+os.environ["WEB_CONCURRENCY"] = str(workers)
+# Com mais de um worker os jobs precisam de um store compartilhado (o app
+# recusa o store em memória): por padrão, um SQLite no diretório atual
+if workers > 1:
+    os.environ.setdefault("JOBS_SQLITE_PATH", "cv_jobs.sqlite")
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+def when_ready(server):
+    from parser_runtime import warm_up, freeze_for_fork
+    info = warm_up()
+    freeze_for_fork()
+    server.log.info("Parser pré-carregado no master: %s", info)
+
+def child_exit(server, worker):
+    # Métricas em modo multiprocesso (PROMETHEUS_MULTIPROC_DIR): descarta os
+    # gauges do worker que saiu
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
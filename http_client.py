@@ -0,0 +1,68 @@
+# Cliente HTTP assíncrono compartilhado (aiohttp)
+import os
+import re
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+import aiohttp
+
+# ===== config =====
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "32"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+HTTP_USER_AGENT = os.getenv("HTTP_USER_AGENT", "cv-parser-api/1.0")
+
+_GDRIVE_FILE_RE = re.compile(r"drive\.google\.com/file/d/([A-Za-z0-9_-]+)")
+
+_session: Optional[aiohttp.ClientSession] = None
+
+def _build_session() -> aiohttp.ClientSession:
+    """Cria a sessão com pool de conexões, keep-alive e cache de DNS"""
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_MAX_CONNECTIONS,
+        limit_per_host=HTTP_MAX_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        use_dns_cache=True,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={"User-Agent": HTTP_USER_AGENT},
+        raise_for_status=False,
+    )
+
+async def start_http_client() -> aiohttp.ClientSession:
+    """Abre a sessão compartilhada (chamado no startup da aplicação)"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _build_session()
+    return _session
+
+async def close_http_client():
+    """Fecha a sessão compartilhada e libera as conexões do pool"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Retorna a sessão compartilhada, criando-a se o startup não rodou"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _build_session()
+    return _session
+
+def normalize_pdf_url(url: str) -> str:
+    """Converte links de visualização do Google Drive para download direto"""
+    url = url.strip()
+    match = _GDRIVE_FILE_RE.search(url)
+    if match:
+        return f"https://drive.google.com/uc?export=download&id={match.group(1)}"
+    
+    parsed = urlparse(url)
+    if parsed.netloc.lower() == "drive.google.com" and parsed.path in ("/uc", "/open"):
+        file_id = parse_qs(parsed.query).get("id")
+        if file_id:
+            return f"https://drive.google.com/uc?export=download&id={file_id[0]}"
+    return url
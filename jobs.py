@@ -0,0 +1,475 @@
+# Fila de jobs assíncronos: o cliente envia a URL, recebe um id e consulta
+# (ou recebe um webhook) quando o parse termina
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import sqlite3
+import threading
+import logging
+import aiohttp
+from dataclasses import dataclass, asdict, fields
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from cv_logging import get_logger, log_event, request_id_var
+from sqlite_conn import LazySQLite
+
+log = get_logger("jobs")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+class JobQueueFull(Exception):
+    """A fila de jobs atingiu o limite"""
+
+@dataclass
+class Job:
+    id: str
+    url: str
+    status: str
+    created_at: float
+    updated_at: float
+    callback_url: Optional[str] = None
+    result_json: Optional[str] = None  # ParseItem serializado
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    callback_status: Optional[str] = None
+    # Processo que está rodando o job e até quando ele vale (renovado enquanto roda)
+    owner: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+
+    def to_payload(self) -> Dict[str, Any]:
+        """Representação pública (resposta do GET e corpo do webhook)"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "url": self.url,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "result": json.loads(self.result_json) if self.result_json else None,
+            "error": self.error,
+            "status_code": self.status_code,
+        }
+
+# ===== stores =====
+class MemoryJobStore:
+    """Jobs em um dict do processo; somem num reinício"""
+
+    def __init__(self, ttl_seconds: float = 86400):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Job):
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return Job(**asdict(job)) if job else None
+
+    def update(self, job_id: str, **changes):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for key, value in changes.items():
+                setattr(job, key, value)
+            job.updated_at = time.time()
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != JOB_QUEUED:
+                return None
+            now = time.time()
+            job.status, job.owner, job.lease_expires_at, job.updated_at = JOB_RUNNING, owner, now + lease_seconds, now
+            return Job(**asdict(job))
+
+    def finish(self, job_id: str, owner: str, **changes) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != JOB_RUNNING or job.owner != owner:
+                return False
+            for key, value in {**changes, "owner": None, "lease_expires_at": None}.items():
+                setattr(job, key, value)
+            job.updated_at = time.time()
+            return True
+
+    def release(self, job_id: str, owner: str):
+        self.finish(job_id, owner, status=JOB_QUEUED)
+
+    def renew(self, owner: str, lease_seconds: float):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == JOB_RUNNING and job.owner == owner:
+                    job.lease_expires_at = time.time() + lease_seconds
+
+    def requeue_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [j for j in self._jobs.values() if j.status == JOB_RUNNING and (j.lease_expires_at or 0) < now]
+            for job in expired:
+                job.status, job.owner, job.lease_expires_at, job.updated_at = JOB_QUEUED, None, None, now
+        return len(expired)
+
+    def queued_ids(self, limit: int) -> List[str]:
+        with self._lock:
+            queued = sorted((j for j in self._jobs.values() if j.status == JOB_QUEUED), key=lambda j: j.created_at)
+            return [j.id for j in queued[:limit]]
+
+    def purge_expired(self) -> int:
+        """Remove jobs terminados há mais de ``ttl_seconds``"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [k for k, j in self._jobs.items() if j.status in FINISHED_STATUSES and j.updated_at < cutoff]
+            for key in expired:
+                del self._jobs[key]
+        return len(expired)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def close(self):
+        pass
+
+_JOB_COLUMNS = [f.name for f in fields(Job)]
+
+def _create_jobs_table(db: sqlite3.Connection):
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS cv_jobs ("
+        "id TEXT PRIMARY KEY, url TEXT NOT NULL, status TEXT NOT NULL, "
+        "created_at REAL NOT NULL, updated_at REAL NOT NULL, callback_url TEXT, "
+        "result_json TEXT, error TEXT, status_code INTEGER, callback_status TEXT)"
+    )
+    # Stores criados antes do lease ganham as colunas novas
+    columns = {row[1] for row in db.execute("PRAGMA table_info(cv_jobs)")}
+    for column, kind in (("owner", "TEXT"), ("lease_expires_at", "REAL")):
+        if column not in columns:
+            db.execute(f"ALTER TABLE cv_jobs ADD COLUMN {column} {kind}")
+    db.execute("CREATE INDEX IF NOT EXISTS cv_jobs_status ON cv_jobs (status, updated_at)")
+    db.commit()
+
+class SQLiteJobStore:
+    """Jobs em SQLite (WAL): sobrevivem a reinícios e são compartilhados pelos
+    processos da API no mesmo host. Cada job é tomado por um processo só
+    (``claim`` atômico) e volta para a fila se o lease dele vencer"""
+
+    def __init__(self, sqlite_path: str, ttl_seconds: float = 86400):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # Aberta no primeiro uso, em cada processo (nada de conexão no import)
+        self._db = LazySQLite(sqlite_path, _create_jobs_table)
+
+    def create(self, job: Job):
+        row = asdict(job)
+        with self._lock:
+            self._db.get().execute(
+                f"INSERT INTO cv_jobs ({', '.join(_JOB_COLUMNS)}) VALUES ({', '.join('?' * len(_JOB_COLUMNS))})",
+                [row[c] for c in _JOB_COLUMNS],
+            )
+            self._db.get().commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.get().execute(f"SELECT {', '.join(_JOB_COLUMNS)} FROM cv_jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(*row) if row else None
+
+    def update(self, job_id: str, **changes):
+        changes["updated_at"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in changes)
+        with self._lock:
+            self._db.get().execute(f"UPDATE cv_jobs SET {assignments} WHERE id = ?", [*changes.values(), job_id])
+            self._db.get().commit()
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[Job]:
+        """Passa o job de queued para running em nome de ``owner``; None se outro processo já o tomou"""
+        now = time.time()
+        with self._lock:
+            db = self._db.get()
+            cursor = db.execute(
+                "UPDATE cv_jobs SET status = ?, owner = ?, lease_expires_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (JOB_RUNNING, owner, now + lease_seconds, now, job_id, JOB_QUEUED),
+            )
+            db.commit()
+            if cursor.rowcount != 1:
+                return None
+            row = db.execute(f"SELECT {', '.join(_JOB_COLUMNS)} FROM cv_jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(*row) if row else None
+
+    def finish(self, job_id: str, owner: str, **changes) -> bool:
+        """Grava o fim do job se ``owner`` ainda é o dono (False se o lease venceu e outro processo o tomou)"""
+        changes.update(owner=None, lease_expires_at=None, updated_at=time.time())
+        assignments = ", ".join(f"{key} = ?" for key in changes)
+        with self._lock:
+            db = self._db.get()
+            cursor = db.execute(
+                f"UPDATE cv_jobs SET {assignments} WHERE id = ? AND status = ? AND owner = ?",
+                [*changes.values(), job_id, JOB_RUNNING, owner],
+            )
+            db.commit()
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str, owner: str):
+        """Devolve o job para a fila (processo desligando)"""
+        self.finish(job_id, owner, status=JOB_QUEUED)
+
+    def renew(self, owner: str, lease_seconds: float):
+        with self._lock:
+            db = self._db.get()
+            db.execute(
+                "UPDATE cv_jobs SET lease_expires_at = ? WHERE status = ? AND owner = ?",
+                (time.time() + lease_seconds, JOB_RUNNING, owner),
+            )
+            db.commit()
+
+    def requeue_expired(self) -> int:
+        """Devolve para a fila os jobs de processos que pararam de renovar o lease (morreram)"""
+        now = time.time()
+        with self._lock:
+            db = self._db.get()
+            # Sem lease: running gravado antes das colunas de lease existirem
+            cursor = db.execute(
+                "UPDATE cv_jobs SET status = ?, owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (JOB_QUEUED, now, JOB_RUNNING, now),
+            )
+            db.commit()
+        return cursor.rowcount
+
+    def queued_ids(self, limit: int) -> List[str]:
+        with self._lock:
+            rows = self._db.get().execute(
+                "SELECT id FROM cv_jobs WHERE status = ? ORDER BY created_at LIMIT ?", (JOB_QUEUED, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def purge_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            cursor = self._db.get().execute(
+                "DELETE FROM cv_jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (JOB_SUCCEEDED, JOB_FAILED, cutoff),
+            )
+            self._db.get().commit()
+        return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.get().execute("SELECT COUNT(*) FROM cv_jobs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+# ===== fila =====
+# Executa o job: recebe a URL e devolve o ParseItem serializado; falhas
+# esperadas vêm como (status_code, mensagem) pelo ``classify_error``
+JobRunner = Callable[[str], Awaitable[str]]
+
+class JobQueue:
+    """Fila em memória (asyncio.Queue) com os dados dos jobs no ``store``.
+
+    ``workers`` tarefas consomem a fila dentro do event loop da API; o parse
+    em si continua no motor de parse, então os jobs disputam a mesma
+    capacidade que as requisições síncronas, mas sem segurar conexões.
+
+    Com vários processos da API sobre o mesmo ``SQLiteJobStore``, cada job é
+    tomado por um processo só (``store.claim``). A cada ``poll_interval``
+    segundos o processo renova o lease dos jobs que está rodando, devolve para
+    a fila os de processos que pararam de renovar (lease vencido) e traz para a
+    sua fila local os jobs ainda não tomados, inclusive os criados por outro
+    processo.
+    """
+
+    def __init__(
+        self,
+        store,
+        runner: JobRunner,
+        classify_error: Callable[[BaseException], Tuple[int, str]],
+        workers: int = 4,
+        max_queued: int = 10000,
+        callback_timeout: float = 10,
+        callback_retries: int = 3,
+        get_session: Optional[Callable[[], Any]] = None,
+        lease_seconds: float = 60,
+        poll_interval: float = 2,
+    ):
+        self.store = store
+        self._runner = runner
+        self._classify_error = classify_error
+        self.workers = workers
+        self.max_queued = max_queued
+        self.callback_timeout = callback_timeout
+        self.callback_retries = callback_retries
+        self._get_session = get_session
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.owner: Optional[str] = None
+        self._queue: Optional[asyncio.Queue] = None
+        # Ids na fila local (sem repetir os que a varredura encontra de novo) e em execução
+        self._enqueued: Set[str] = set()
+        self._running: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"submitted": 0, "succeeded": 0, "failed": 0, "callbacks_sent": 0, "callbacks_failed": 0}
+
+    async def start(self):
+        """Cria os workers e a tarefa que mantém leases e busca os jobs pendentes no store"""
+        # Identifica este processo nos jobs que ele toma (chamado depois do fork)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue = asyncio.Queue()
+        self._enqueued.clear()
+        self._running.clear()
+        await self._poll()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.close()
+
+    async def submit(self, url: str, callback_url: Optional[str] = None) -> Job:
+        """Registra o job e coloca na fila (não espera o parse)"""
+        if self._queue is None:
+            raise RuntimeError("Fila de jobs não iniciada")
+        if self._queue.qsize() >= self.max_queued:
+            raise JobQueueFull(f"Fila de jobs cheia ({self.max_queued} jobs aguardando)")
+        now = time.time()
+        job = Job(id=uuid.uuid4().hex, url=url, status=JOB_QUEUED, created_at=now, updated_at=now, callback_url=callback_url)
+        await asyncio.to_thread(self.store.create, job)
+        self._enqueue(job.id)
+        self._stats["submitted"] += 1
+        return job
+
+    def _enqueue(self, job_id: str):
+        if job_id not in self._enqueued and job_id not in self._running:
+            self._enqueued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def _poll(self):
+        """Renova os leases, recupera jobs de processos mortos e enfileira os pendentes"""
+        if self._running:
+            await asyncio.to_thread(self.store.renew, self.owner, self.lease_seconds)
+        requeued = await asyncio.to_thread(self.store.requeue_expired)
+        if requeued:
+            log_event(log, logging.WARNING, "Jobs com lease vencido voltaram para a fila", jobs=requeued)
+        room = self.max_queued - self._queue.qsize()
+        if room > 0:
+            for job_id in await asyncio.to_thread(self.store.queued_ids, room):
+                self._enqueue(job_id)
+
+    async def _maintain(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self._poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Falha ao consultar o store de jobs")
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            self._enqueued.discard(job_id)
+            # O id do job é o id de correlação dos logs do processamento
+            request_id_var.set(job_id)
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Falha inesperada no job")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        # As chamadas ao store (um commit cada no SQLite) rodam fora do event
+        # loop: travado, o loop atrasaria a renovação dos leases. O job já conta
+        # como em execução durante o claim, para a varredura não enfileirá-lo de novo
+        self._running.add(job_id)
+        try:
+            # Outro processo pode já ter tomado (ou terminado) o job
+            job = await asyncio.to_thread(self.store.claim, job_id, self.owner, self.lease_seconds)
+            if job is None:
+                return
+            try:
+                result_json = await self._runner(job.url)
+            except asyncio.CancelledError:
+                # Desligando: o job volta para a fila (deste ou de outro processo)
+                await asyncio.to_thread(self.store.release, job_id, self.owner)
+                raise
+            except Exception as e:
+                status_code, message = self._classify_error(e)
+                finished = await asyncio.to_thread(
+                    self.store.finish, job_id, self.owner, status=JOB_FAILED, error=message, status_code=status_code,
+                )
+                self._stats["failed"] += 1
+            else:
+                finished = await asyncio.to_thread(
+                    self.store.finish, job_id, self.owner, status=JOB_SUCCEEDED, result_json=result_json, status_code=200,
+                )
+                self._stats["succeeded"] += 1
+        finally:
+            self._running.discard(job_id)
+
+        if not finished:
+            # O lease venceu e outro processo tomou o job: o resultado e o callback são dele
+            log_event(log, logging.WARNING, "Job perdeu o lease antes de terminar")
+            return
+        if job.callback_url:
+            await self._send_callback(job_id)
+        # Aproveita a passagem para limpar jobs antigos
+        if (self._stats["succeeded"] + self._stats["failed"]) % 100 == 0:
+            await asyncio.to_thread(self.store.purge_expired)
+
+    async def _send_callback(self, job_id: str):
+        """POST do resultado para ``callback_url``, com novas tentativas em falhas"""
+        job = await asyncio.to_thread(self.store.get, job_id)
+        body = json.dumps(job.to_payload())
+        session = self._get_session()
+        delay = 1.0
+        for attempt in range(self.callback_retries + 1):
+            try:
+                async with session.post(
+                    job.callback_url,
+                    data=body,
+                    headers={"Content-Type": "application/json"},
+                    timeout=aiohttp.ClientTimeout(total=self.callback_timeout),
+                ) as response:
+                    if response.status < 500:
+                        status = "sent" if response.status < 400 else f"rejected:{response.status}"
+                        await asyncio.to_thread(self.store.update, job_id, callback_status=status)
+                        self._stats["callbacks_sent" if response.status < 400 else "callbacks_failed"] += 1
+                        return
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                pass
+            if attempt < self.callback_retries:
+                await asyncio.sleep(delay)
+                delay *= 2
+        await asyncio.to_thread(self.store.update, job_id, callback_status="failed")
+        self._stats["callbacks_failed"] += 1
+        log_event(log, logging.WARNING, "Callback do job falhou", attempts=self.callback_retries + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running),
+            "workers": self.workers,
+            "stored": self.store.count(),
+            **self._stats,
+        }
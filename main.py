@@ -2,70 +2,261 @@
 import os
 import re
 import time
-import hashlib
-import tempfile
-import requests
-from urllib.parse import urlparse
-from typing import List, Optional, Dict, Any, Tuple
+import asyncio
+import json
+import aiohttp
+import contextlib
+import contextvars
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from typing import AsyncIterator, List, Literal, Optional, Dict, Any, Tuple, Union
 
-from fastapi import FastAPI, Body, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-import fitz  # PyMuPDF
 
-# ===== opcional: spaCy para PT =====
-try:
-    import spacy
-    _NLP = spacy.load("pt_core_news_lg")
-except Exception:
-    _NLP = None
+from http_client import start_http_client, close_http_client, get_http_session, normalize_pdf_url
+from result_cache import ResultCache, make_cache_key
+from text_store import StoredText, TextStore, pack_text
+from pdf_text import LayoutBlock, read_pdf_text, warm_up_pool as warm_up_pdf_pool, shutdown_pool as shutdown_pdf_pool
+from pdf_buffer import NotAPDFError, PDFBuffer, PDFTooLargeError
+from pdf_upload import UnsupportedUploadType, UploadError, read_pdf_upload, upload_filename
+from jobs import JobQueue, JobQueueFull, MemoryJobStore, SQLiteJobStore
+from parse_engine import ParseEngine, ParseQueueFull, ParseTimeout
+from metrics import IN_FLIGHT, DOWNLOAD_BYTES, UPLOAD_BYTES, PARSE_RESULTS, STATS, observe_timings, render_metrics
+from prometheus_client import CONTENT_TYPE_LATEST
+from timings import timed, rounded
+import parser_runtime
+import cv_result
+from cv_result import calculate_confidence, text_sha256
+from rules import RulesError, get_rule_set
+from cv_logging import RequestContextMiddleware, configure_logging, debug_sampled, get_logger, log_event
 
 # ===== config =====
 load_dotenv()
+configure_logging()
+log = get_logger("api")
+
+# Limites do processamento em lote
+BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", "500"))
+BATCH_MAX_IN_FLIGHT = int(os.getenv("BATCH_MAX_IN_FLIGHT", "16"))
+BATCH_PARSE_WORKERS = int(os.getenv("BATCH_PARSE_WORKERS", str(os.cpu_count() or 2)))
+
+# Motor de parse: processos com parser pré-aquecido (0 = threads no próprio processo).
+# Cada processo da API (WEB_CONCURRENCY, definido pelo gunicorn.conf.py) tem o
+# seu motor, então o padrão divide os núcleos entre eles
+_CPUS = os.cpu_count() or 1
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(max(1, _CPUS // WEB_CONCURRENCY) if _CPUS > 1 else 0)))
+# Parses em andamento + na fila; acima disso a API responde 503
+PARSE_QUEUE_MAX = int(os.getenv("PARSE_QUEUE_MAX", str(max(PARSE_WORKERS, BATCH_PARSE_WORKERS) * 8)))
+PARSE_JOB_TIMEOUT_SECONDS = float(os.getenv("PARSE_JOB_TIMEOUT_SECONDS", "20"))
+PARSE_RETRY_AFTER_SECONDS = int(os.getenv("PARSE_RETRY_AFTER_SECONDS", "2"))
+
+# Jobs assíncronos (JOBS_SQLITE_PATH vazio guarda os jobs só em memória, o que
+# só funciona com um processo da API)
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "4"))
+JOBS_MAX_QUEUED = int(os.getenv("JOBS_MAX_QUEUED", "10000"))
+JOBS_SQLITE_PATH = os.getenv("JOBS_SQLITE_PATH", "")
+JOBS_TTL_SECONDS = float(os.getenv("JOBS_TTL_SECONDS", "86400"))
+JOBS_CALLBACK_TIMEOUT = float(os.getenv("JOBS_CALLBACK_TIMEOUT", "10"))
+JOBS_CALLBACK_RETRIES = int(os.getenv("JOBS_CALLBACK_RETRIES", "3"))
+# Um job de processo que morreu volta para a fila depois do lease; a cada
+# JOBS_POLL_SECONDS cada processo renova os seus e busca jobs pendentes no store
+JOBS_LEASE_SECONDS = float(os.getenv("JOBS_LEASE_SECONDS", "60"))
+JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", "2"))
+
+# Devolve o tempo de cada etapa em meta.timings mesmo sem include_timings no pedido
+TIMINGS_IN_META = os.getenv("CV_TIMINGS_IN_META", "0") == "1"
+
+# Aquece o parser no startup (spaCy só é carregado se CV_PRELOAD_SPACY=1)
+WARMUP_ON_STARTUP = os.getenv("CV_WARMUP_ON_STARTUP", "1") == "1"
+
+# Cache de resultados (RESULT_CACHE_SQLITE_PATH vazio desativa o nível em disco)
+RESULT_CACHE_MAX_ITEMS = int(os.getenv("RESULT_CACHE_MAX_ITEMS", "2048"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "86400"))
+RESULT_CACHE_SQLITE_PATH = os.getenv("RESULT_CACHE_SQLITE_PATH", "")
+
+# Cache de validadores por URL (ETag/Last-Modified) para revalidação condicional
+URL_CACHE_MAX_ITEMS = int(os.getenv("URL_CACHE_MAX_ITEMS", "8192"))
+URL_CACHE_TTL_SECONDS = float(os.getenv("URL_CACHE_TTL_SECONDS", "604800"))
+URL_CACHE_SQLITE_PATH = os.getenv("URL_CACHE_SQLITE_PATH", RESULT_CACHE_SQLITE_PATH)
+
+# Texto extraído dos PDFs, comprimido, para refazer o parse sem extrair de novo (vazio desativa)
+TEXT_STORE_SQLITE_PATH = os.getenv("TEXT_STORE_SQLITE_PATH", "")
 
 # ===== funções de download =====
-def download_pdf_from_url(url: str) -> str:
-    """Baixa um PDF de uma URL e retorna o caminho do arquivo temporário"""
+HEAD_TIMEOUT = aiohttp.ClientTimeout(total=10)
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=30)
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# Tamanho máximo de um PDF e a partir de quando ele vai para disco em vez de memória
+MAX_PDF_BYTES = int(os.getenv("MAX_PDF_BYTES", str(25 * 1024 * 1024)))
+PDF_SPILL_BYTES = int(os.getenv("PDF_SPILL_BYTES", str(10 * 1024 * 1024)))
+
+# URLs em mensagens de erro (o aiohttp inclui a URL inteira): fora dos logs
+_URL_IN_TEXT_RE = re.compile(r"https?://[^\s'\"]+")
+# Parâmetros de URLs assinadas (S3/GCS) mudam a cada link gerado, mas não o arquivo
+_SIGNED_QUERY_PREFIXES = ("x-amz-", "x-goog-")
+
+def url_cache_key(url: str) -> str:
+    """Chave do cache de URL: URL normalizada, sem fragmento e sem assinatura temporária"""
+    parsed = urlparse(normalize_pdf_url(url))
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith(_SIGNED_QUERY_PREFIXES)
+    )
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or "/", parsed.params, urlencode(query), ""))
+
+@dataclass
+class DownloadedPDF:
+    """PDF baixado: conteúdo + hash dos bytes.
+
+    ``source`` é o conteúdo em memória (``memoryview``) ou, para arquivos
+    acima de ``PDF_SPILL_BYTES``, o caminho do arquivo temporário em ``path``.
+    Quando o servidor responde 304, ``not_modified`` é True e não há conteúdo:
+    o resultado deve vir do cache pelo ``sha256`` já conhecido ou ser refeito
+    a partir de ``stored_text``, o texto já lido do text_store.
+    """
+    sha256: str
+    size: int
+    source: Optional[Union[str, memoryview]] = None
+    path: Optional[str] = None
+    not_modified: bool = False
+    stored_text: Optional[StoredText] = None
+
+def _conditional_headers(validators: Dict[str, Any]) -> Dict[str, str]:
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+def _revalidation_validators(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Validadores (ETag/Last-Modified) da URL, se ainda vale revalidar: só
+    quando o parse correspondente está em cache (ou, com parser novo, o texto
+    do PDF está no text_store). Consulta os caches em disco: rode fora do event loop"""
+    validators = url_cache.get(cache_key)
+    if validators and not (
+        result_cache.contains(make_cache_key(validators["sha256"], current_parser_version()))
+        or (text_store is not None and text_store.contains(validators["sha256"]))
+    ):
+        return None
+    return validators
+
+async def download_pdf_from_url(url: str, revalidate: bool = True, timings: Optional[Dict[str, float]] = None) -> DownloadedPDF:
+    """Baixa um PDF de uma URL e retorna o arquivo temporário com o hash do conteúdo.
+
+    Se a URL já foi baixada antes e o resultado do parse ainda está em cache,
+    faz um GET condicional (If-None-Match/If-Modified-Since) e, em caso de 304,
+    não baixa o arquivo de novo. ``timings`` recebe a duração do HEAD e do download.
+    """
     try:
-        # Extrai ID do Google Drive se for uma URL de visualização
-        if "drive.google.com/file/d/" in url and "view" in url:
-            file_id = url.split('/d/')[1].split('/')[0]
-            url = f"https://drive.google.com/uc?export=download&id={file_id}"
-            print(f"DEBUG: Converted Google Drive URL to direct download: {url}")
+        normalized = normalize_pdf_url(url)
+        if normalized != url.strip():
+            debug_sampled(log, "URL do Google Drive convertida para download direto", lambda: {"url": normalized})
+        url = normalized
 
         # Valida se é uma URL válida
         parsed_url = urlparse(url)
         if not parsed_url.scheme or not parsed_url.netloc:
             raise ValueError("URL inválida")
         
+        session = get_http_session()
+        cache_key = url_cache_key(url)
+        
+        validators = await asyncio.to_thread(_revalidation_validators, cache_key) if revalidate else None
+        headers = _conditional_headers(validators) if validators else {}
+        
         # URLs do Google Drive são aceitas automaticamente
-        if not url.lower().endswith('.pdf') and 'drive.google.com' not in url.lower():
+        if not headers and not url.lower().endswith('.pdf') and 'drive.google.com' not in url.lower():
             # Faz uma requisição HEAD para verificar o content-type
-            head_response = requests.head(url, timeout=10, allow_redirects=True)
-            content_type = head_response.headers.get('content-type', '').lower()
+            with timed(timings, "head"):
+                async with session.head(url, timeout=HEAD_TIMEOUT, allow_redirects=True) as head_response:
+                    content_type = head_response.headers.get('content-type', '').lower()
             if 'pdf' not in content_type:
                 raise ValueError("URL não aponta para um arquivo PDF")
         
         # Baixa o arquivo
-        response = requests.get(url, timeout=30, allow_redirects=True)
-        response.raise_for_status()
+        with timed(timings, "download"), IN_FLIGHT.labels("download").track_inprogress():
+            async with session.get(url, timeout=DOWNLOAD_TIMEOUT, allow_redirects=True, headers=headers) as response:
+                if response.status == 304 and validators:
+                    return DownloadedPDF(sha256=validators["sha256"], size=0, not_modified=True)
+                response.raise_for_status()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                
+                # Lê o corpo em partes para um buffer limitado; a assinatura %PDF
+                # é verificada já nos primeiros bytes
+                buffer = PDFBuffer(MAX_PDF_BYTES, PDF_SPILL_BYTES)
+                try:
+                    buffer.check_declared_size(response.content_length)
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_BYTES):
+                        if buffer.spilled:
+                            await asyncio.to_thread(buffer.write, chunk)
+                        else:
+                            buffer.write(chunk)
+                    sha256 = buffer.finish()
+                except BaseException:
+                    buffer.discard()
+                    raise
+        DOWNLOAD_BYTES.inc(buffer.size)
         
-        # Verifica se o conteúdo é realmente um PDF
-        if not response.content.startswith(b'%PDF'):
-            raise ValueError("Arquivo baixado não é um PDF válido")
+        if etag or last_modified:
+            await asyncio.to_thread(url_cache.set, cache_key, {"etag": etag, "last_modified": last_modified, "sha256": sha256})
         
-        # Cria arquivo temporário
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        temp_file.write(response.content)
-        temp_file.close()
+        return DownloadedPDF(sha256=sha256, size=buffer.size, source=buffer.source, path=buffer.path)
         
-        return temp_file.name
-        
-    except requests.exceptions.RequestException as e:
+    except PDFTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except aiohttp.ClientError as e:
         raise HTTPException(status_code=400, detail=f"Erro ao baixar PDF: {str(e)}")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=400, detail="Erro ao baixar PDF: tempo limite excedido")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erro ao processar URL: {str(e)}")
 
+async def receive_pdf_upload(request: Request, timings: Optional[Dict[str, float]] = None) -> Tuple[DownloadedPDF, Optional[str]]:
+    """Lê o PDF do corpo da requisição (``application/pdf`` ou multipart) em
+    partes, com o mesmo limite e o mesmo buffer do download; devolve o PDF e o
+    nome do arquivo enviado no multipart (se houver)"""
+    buffer = PDFBuffer(MAX_PDF_BYTES, PDF_SPILL_BYTES)
+    content_length = request.headers.get("content-length")
+    try:
+        with timed(timings, "upload"), IN_FLIGHT.labels("upload").track_inprogress():
+            filename = await read_pdf_upload(
+                request.headers.get("content-type", ""),
+                int(content_length) if content_length and content_length.isdigit() else None,
+                request.stream(),
+                buffer,
+            )
+            sha256 = buffer.finish()
+    except PDFTooLargeError as e:
+        buffer.discard()
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedUploadType as e:
+        buffer.discard()
+        raise HTTPException(status_code=415, detail=str(e))
+    except NotAPDFError:
+        buffer.discard()
+        raise HTTPException(status_code=400, detail="Arquivo enviado não é um PDF válido")
+    except UploadError as e:
+        buffer.discard()
+        raise HTTPException(status_code=400, detail=str(e))
+    except ClientDisconnect:
+        buffer.discard()
+        raise HTTPException(status_code=400, detail="Envio do arquivo interrompido")
+    except BaseException:
+        buffer.discard()
+        raise
+    UPLOAD_BYTES.inc(buffer.size)
+    return DownloadedPDF(sha256=sha256, size=buffer.size, source=buffer.source, path=buffer.path), filename
+
 def cleanup_temp_file(file_path: str):
     """Remove arquivo temporário"""
     try:
@@ -141,79 +332,541 @@ class ParseItem(BaseModel):
     confidence_overall: float = Field(ge=0, le=1)
     processing_ms: int
 
+# Resultados do parser (cv_result) e do cache viram modelos em uma única
+# validação no pydantic-core, a partir do dict do orjson. ``model_construct``
+# pularia a validação, mas monta os objetos em Python e sai ~3x mais lento;
+# modelos que recebem outros já montados (ParseItem, lote) não os revalidam.
+def parsed_cv_from_json(payload: bytes) -> ParsedCV:
+    return ParsedCV.model_validate(cv_result.loads(payload))
+
+def parse_item_from_json(payload: str) -> ParseItem:
+    """ParseItem gravado no cache em disco"""
+    return ParseItem.model_validate(cv_result.loads(payload))
+
+class FastJSONResponse(JSONResponse):
+    """Resposta JSON que não passa pela revalidação do ``response_model`` do
+    FastAPI: modelos já montados saem pelo serializador do pydantic-core e o
+    resto (dicts) pelo orjson"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return cv_result.dumps(content)
+
 # ===== modelos para URLs =====
 class ParseSingleUrlBody(BaseModel):
     url: str = Field(..., description="URL do PDF para processar")
+    include_timings: bool = Field(False, description="Inclui o tempo de cada etapa em meta.timings")
+
+class ParseBatchBody(BaseModel):
+    urls: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_URLS, description="URLs dos PDFs para processar")
+    include_timings: bool = Field(False, description="Inclui o tempo de cada etapa em meta.timings")
+
+class BatchItemResult(BaseModel):
+    url: str
+    ok: bool
+    result: Optional[ParseItem] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+class ParseBatchResponse(BaseModel):
+    items: List[BatchItemResult]
+    total: int
+    succeeded: int
+    failed: int
+    processing_ms: int
+
+class BatchStreamItem(BatchItemResult):
+    """Linha do lote em NDJSON: ``index`` é a posição da URL no pedido"""
+    type: Literal["item"] = "item"
+    index: int
+
+class BatchStreamSummary(BaseModel):
+    """Última linha do lote em NDJSON"""
+    type: Literal["summary"] = "summary"
+    total: int
+    succeeded: int
+    failed: int
+    processing_ms: int
+
+class CreateJobBody(BaseModel):
+    url: str = Field(..., description="URL do PDF para processar")
+    callback_url: Optional[str] = Field(None, description="URL que recebe um POST com o resultado quando o job termina")
+
+class JobCreatedResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str  # queued | running | succeeded | failed
+    url: str
+    created_at: float
+    updated_at: float
+    result: Optional[ParseItem] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
 
 # ===== app =====
-app = FastAPI(title="CV Parser API - URLs + Parser Avançado", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_client()
+    await job_queue.start()
+    if WARMUP_ON_STARTUP:
+        try:
+            await asyncio.to_thread(parser_runtime.warm_up)
+        except Exception as e:
+            # O erro volta a aparecer, como HTTP 500, na primeira requisição
+            log_event(log, logging.WARNING, "Falha no warm-up do parser", error=str(e))
+        try:
+            await asyncio.to_thread(parse_engine.start)
+        except Exception as e:
+            # O pool é criado de novo no primeiro parse
+            log_event(log, logging.WARNING, "Falha ao iniciar os workers de parse", error=str(e))
+        try:
+            await asyncio.to_thread(warm_up_pdf_pool)
+        except Exception as e:
+            # Sem o pool, os PDFs longos continuam sendo lidos no próprio processo
+            log_event(log, logging.WARNING, "Falha ao iniciar o pool de extração de páginas", error=str(e))
+    try:
+        yield
+    finally:
+        await job_queue.stop()
+        await close_http_client()
+        shutdown_pdf_pool()
+        parse_engine.close()
+        result_cache.close()
+        url_cache.close()
+        if text_store is not None:
+            text_store.close()
+
+app = FastAPI(title="CV Parser API - URLs + Parser Avançado", version="1.0.0", lifespan=lifespan)
+# Id de correlação (X-Request-ID) em todas as linhas de log da requisição
+app.add_middleware(RequestContextMiddleware)
 
 @app.get("/health")
 def health():
-    return {"ok": True, "message": "CV Parser API - Apenas URLs + Parser Avançado"}
+    return {
+        "ok": True,
+        "message": "CV Parser API - Apenas URLs + Parser Avançado",
+        "parser_ready": parser_runtime.is_ready(),
+        "parse_engine": parse_engine.stats(),
+        "rules": get_rule_set().stats(),
+    }
 
-def text_sha256(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+@app.post("/admin/warmup")
+async def admin_warmup():
+    """Aquece o parser (e opcionalmente o spaCy) sob demanda"""
+    try:
+        return await asyncio.to_thread(parser_runtime.warm_up)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao inicializar parser: {str(e)}")
 
-def read_pdf_text(path: str) -> str:
-    doc = fitz.open(path)
-    out = []
-    for p in doc:
-        t = p.get_text("text") or ""
-        out.append(t)
-    return "\n".join(out)
+@app.post("/admin/rules/reload")
+def admin_reload_rules():
+    """Recarrega as regras neste processo na hora (os demais recarregam no próximo intervalo)"""
+    rule_set = get_rule_set()
+    try:
+        rule_set.reload(force=True)
+    except RulesError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao recarregar regras: {str(e)}")
+    return rule_set.stats()
 
-# ===== ENDPOINT PRINCIPAL =====
-@app.post("/cv:parse-single-url-enhanced", response_model=ParseItem)
-def parse_single_url_enhanced(body: ParseSingleUrlBody):
-    """Parse um único PDF a partir de URL com parser melhorado"""
+@app.get("/cache/stats")
+def cache_stats():
+    stats = {"results": result_cache.stats(), "urls": url_cache.stats()}
+    if text_store is not None:
+        stats["texts"] = text_store.stats()
+    return stats
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Métricas no formato de texto do Prometheus"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+def current_parser_version() -> str:
+    """Versão do parser (código + regras) usada nas chaves de cache"""
+    return parser_runtime.get_parser().parser_version
+
+def get_enhanced_parser():
+    """Retorna o parser do processo, convertendo falhas em erro HTTP"""
     try:
-        from enhanced_parser import EnhancedParser
-        enhanced_parser = EnhancedParser()
+        return parser_runtime.get_parser()
     except ImportError as e:
         raise HTTPException(status_code=500, detail=f"Parser melhorado não disponível: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao inicializar parser: {str(e)}")
+
+def filename_from_url(url: str) -> str:
+    """Extrai nome do arquivo da URL"""
+    filename = os.path.basename(urlparse(url).path) or "pdf.pdf"
+    if not filename.lower().endswith('.pdf'):
+        filename += '.pdf'
+    return filename
+
+result_cache = ResultCache(
+    max_items=RESULT_CACHE_MAX_ITEMS,
+    ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+    sqlite_path=RESULT_CACHE_SQLITE_PATH,
+    dumps=lambda item: item.model_dump_json(),
+    loads=parse_item_from_json,
+)
+
+url_cache = ResultCache(
+    max_items=URL_CACHE_MAX_ITEMS,
+    ttl_seconds=URL_CACHE_TTL_SECONDS,
+    sqlite_path=URL_CACHE_SQLITE_PATH,
+    dumps=json.dumps,
+    loads=json.loads,
+    table="url_validators",
+)
+
+async def cached_parse_item(enhanced_parser, pdf: DownloadedPDF, filename: str, started: float) -> Optional[ParseItem]:
+    """Busca o ParseItem no cache pelo hash do conteúdo (fora do event loop: com
+    ``RESULT_CACHE_SQLITE_PATH`` a consulta vai ao disco)"""
+    cached = await asyncio.to_thread(result_cache.get, make_cache_key(pdf.sha256, enhanced_parser.parser_version))
+    if cached is None:
+        return None
+    return cached.model_copy(update={
+        "file": filename,
+        "processing_ms": int((time.time()-started)*1000)
+    })
+
+text_store = TextStore(TEXT_STORE_SQLITE_PATH) if TEXT_STORE_SQLITE_PATH else None
+
+def extract_pdf_text(pdf: DownloadedPDF, source: Optional[str] = None) -> Tuple[str, List[LayoutBlock]]:
+    """Extrai o texto e os blocos do layout (ordem de leitura, estilo, títulos) de um PDF já baixado.
+
+    Com o text_store, um PDF já extraído (mesmos bytes) sai de lá; um novo é
+    guardado, com ``source`` (URL ou nome do arquivo) só como referência.
+    """
+    if pdf.stored_text is not None:
+        return pdf.stored_text.text, pdf.stored_text.blocks
+    if text_store is not None:
+        stored = text_store.get(pdf.sha256)
+        if stored is not None:
+            return stored.text, stored.blocks
+    blocks: List[LayoutBlock] = []
+    raw_text = read_pdf_text(pdf.source, blocks=blocks)
+    if text_store is not None:
+        text_store.put(pdf.sha256, pack_text(raw_text, blocks, text_store.codec), source)
+    return raw_text, blocks
+
+# O download roda no event loop (aiohttp); a leitura do PDF fica em um pool
+# de threads próprio e o parse, que é CPU puro, no motor de processos.
+_parse_executor = ThreadPoolExecutor(max_workers=BATCH_PARSE_WORKERS, thread_name_prefix="cv-parse")
+
+parse_engine = ParseEngine(
+    workers=PARSE_WORKERS,
+    queue_max=PARSE_QUEUE_MAX,
+    job_timeout=PARSE_JOB_TIMEOUT_SECONDS,
+    loads=parsed_cv_from_json,
+    thread_executor=_parse_executor,
+    get_parser=parser_runtime.get_parser,
+)
+
+STATS.add("result_cache", result_cache.stats)
+STATS.add("url_cache", url_cache.stats)
+STATS.add("parse_engine", parse_engine.stats)
+
+async def parse_pdf_file(
+    enhanced_parser,
+    pdf: DownloadedPDF,
+    filename: str,
+    started: float,
+    wait: bool = False,
+    stages: Optional[Dict[str, float]] = None,
+    extractors: Optional[Dict[str, float]] = None,
+) -> ParseItem:
+    """Extrai o texto de um PDF já baixado e monta o ParseItem (com cache por conteúdo).
+
+    Com ``wait=False`` a fila de parse cheia vira HTTP 503; com ``wait=True``
+    (lote) o documento espera a sua vez. ``stages`` e ``extractors`` recebem
+    os tempos (ms) das etapas e de cada extrator.
+    """
+    cached = await cached_parse_item(enhanced_parser, pdf, filename, started)
+    if cached is not None:
+        PARSE_RESULTS.labels("cache_hit").inc()
+        return cached
     
-    temp_file = None
-    started = time.time()
+    loop = asyncio.get_running_loop()
+    with timed(stages, "read_pdf_text"), IN_FLIGHT.labels("read_pdf_text").track_inprogress():
+        # copy_context: o id da requisição acompanha o trabalho na thread
+        raw_text, blocks = await loop.run_in_executor(_parse_executor, contextvars.copy_context().run, extract_pdf_text, pdf, filename)
+    try:
+        # Inclui a espera na fila de parse
+        with timed(stages, "parse"), IN_FLIGHT.labels("parse").track_inprogress():
+            data = await parse_engine.parse(raw_text, wait=wait, timings=extractors, blocks=blocks)
+    except ParseQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Servidor ocupado: {str(e)}",
+            headers={"Retry-After": str(PARSE_RETRY_AFTER_SECONDS)},
+        )
+    except ParseTimeout as e:
+        raise HTTPException(status_code=422, detail=f"Tempo limite de processamento excedido: {str(e)}")
     
+    item = ParseItem(
+        file=filename,
+        hash=text_sha256(raw_text),
+        data=data,
+        confidence_overall=calculate_confidence(data),
+        processing_ms=int((time.time()-started)*1000)
+    )
+    # Grava fora do event loop (no disco, um INSERT + commit)
+    await asyncio.to_thread(result_cache.set, make_cache_key(pdf.sha256, enhanced_parser.parser_version), item)
+    PARSE_RESULTS.labels("parsed").inc()
+    return item
+
+def with_timings(item: ParseItem, stages: Dict[str, float], extractors: Dict[str, float]) -> ParseItem:
+    """Cópia do item com ``meta.timings`` (o item em cache fica sem tempos)"""
+    timings = {"stages": rounded(stages), "extractors": rounded(extractors)}
+    meta = {**item.data.meta, "timings": timings}
+    return item.model_copy(update={"data": item.data.model_copy(update={"meta": meta})})
+
+_NO_LIMIT = contextlib.nullcontext()
+
+async def fetch_and_parse(
+    enhanced_parser,
+    url: str,
+    started: float,
+    in_flight: Optional[asyncio.Semaphore] = None,
+    wait: bool = False,
+    include_timings: bool = False,
+) -> ParseItem:
+    """Baixa (ou revalida) o PDF e processa, limpando o arquivo temporário ao final.
+
+    ``wait=True`` espera a vez quando a fila de parse está cheia (lote e jobs)
+    em vez de responder 503. Os tempos de cada etapa vão sempre para as
+    métricas e, com ``include_timings``, também para ``meta.timings``.
+    """
+    pdf = None
+    stages: Dict[str, float] = {}
+    extractors: Dict[str, float] = {}
     try:
-        # Baixa o PDF da URL
-        temp_file = download_pdf_from_url(body.url)
-        
-        # Processa o PDF
-        raw_text = read_pdf_text(temp_file)
-        data = enhanced_parser.parse_enhanced(raw_text)
+        async with (in_flight or _NO_LIMIT):
+            pdf = await download_pdf_from_url(url, timings=stages)
         
-        # Calcula confiança melhorada
-        conf = 0.6
-        if data.candidate.full_name: conf += 0.15
-        if data.candidate.emails: conf += 0.1
-        if data.summary: conf += 0.05
-        if data.skills: conf += 0.1
-        if data.experiences: conf += 0.1
-        if data.education: conf += 0.05
-        if data.certifications: conf += 0.03
-        if data.meta.get("projects"): conf += 0.02
-        if data.meta.get("achievements"): conf += 0.02
-        conf = min(conf, 0.98)
+        item = None
+        if pdf.not_modified:
+            item = await cached_parse_item(enhanced_parser, pdf, filename_from_url(url), started)
+            if item is not None:
+                PARSE_RESULTS.labels("not_modified").inc()
+            else:
+                # Com o texto no text_store, o parse sai de lá sem baixar. Uma
+                # leitura só: o texto pode sair do store entre duas consultas
+                if text_store is not None:
+                    pdf.stored_text = await asyncio.to_thread(text_store.get, pdf.sha256)
+                if pdf.stored_text is None:
+                    # O resultado saiu do cache depois da revalidação: baixa de novo
+                    async with (in_flight or _NO_LIMIT):
+                        pdf = await download_pdf_from_url(url, revalidate=False, timings=stages)
         
-        # Extrai nome do arquivo da URL
-        filename = os.path.basename(urlparse(body.url).path) or "pdf.pdf"
-        if not filename.lower().endswith('.pdf'):
-            filename += '.pdf'
-        
-        return ParseItem(
-            file=filename,
-            hash=text_sha256(raw_text),
-            data=data,
-            confidence_overall=conf,
-            processing_ms=int((time.time()-started)*1000)
+        if item is None:
+            # Processa o PDF fora do event loop
+            item = await parse_pdf_file(enhanced_parser, pdf, filename_from_url(url), started, wait=wait, stages=stages, extractors=extractors)
+        if include_timings or TIMINGS_IN_META:
+            item = with_timings(item, stages, extractors)
+        debug_sampled(log, "Documento processado", lambda: {
+            "sha256": pdf.sha256, "size": pdf.size, "stages": rounded(stages), "extractors": rounded(extractors),
+        })
+        return item
+    except HTTPException as e:
+        PARSE_RESULTS.labels("error").inc()
+        # Só o host: a URL completa pode identificar o candidato
+        log_event(
+            log, logging.WARNING if e.status_code >= 500 else logging.INFO, "Falha ao processar PDF",
+            host=urlparse(url).hostname, status_code=e.status_code, error=_URL_IN_TEXT_RE.sub("<url>", str(e.detail)),
+        )
+        raise
+    except Exception:
+        PARSE_RESULTS.labels("error").inc()
+        log.exception("Erro inesperado ao processar PDF", extra={"fields": {"host": urlparse(url).hostname}})
+        raise
+    finally:
+        observe_timings(stages, extractors)
+        # Limpa o arquivo temporário (só existe para PDFs grandes)
+        if pdf and pdf.path:
+            cleanup_temp_file(pdf.path)
+
+# ===== ENDPOINT PRINCIPAL =====
+@app.post("/cv:parse-single-url-enhanced", response_model=ParseItem)
+async def parse_single_url_enhanced(body: ParseSingleUrlBody):
+    """Parse um único PDF a partir de URL com parser melhorado"""
+    enhanced_parser = get_enhanced_parser()
+    started = time.time()
+    
+    try:
+        return FastJSONResponse(await fetch_and_parse(enhanced_parser, body.url, started, include_timings=body.include_timings))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao processar PDF: {str(e)}")
+
+# ===== UPLOAD =====
+@app.post("/cv:parse-file", response_model=ParseItem)
+async def parse_file(request: Request, filename: Optional[str] = None, include_timings: bool = False):
+    """Parse de um PDF enviado no corpo (``application/pdf`` ou ``multipart/form-data``
+    com o arquivo no campo ``file``), sem passar por download"""
+    enhanced_parser = get_enhanced_parser()
+    started = time.time()
+    pdf = None
+    stages: Dict[str, float] = {}
+    extractors: Dict[str, float] = {}
+    try:
+        pdf, uploaded_name = await receive_pdf_upload(request, stages)
+        name = upload_filename(filename) or uploaded_name or "upload.pdf"
+        item = await parse_pdf_file(enhanced_parser, pdf, name, started, stages=stages, extractors=extractors)
+        if include_timings or TIMINGS_IN_META:
+            item = with_timings(item, stages, extractors)
+        debug_sampled(log, "Documento processado", lambda: {
+            "sha256": pdf.sha256, "size": pdf.size, "stages": rounded(stages), "extractors": rounded(extractors),
+        })
+        return FastJSONResponse(item)
+    except HTTPException as e:
+        PARSE_RESULTS.labels("error").inc()
+        log_event(
+            log, logging.WARNING if e.status_code >= 500 else logging.INFO, "Falha ao processar PDF enviado",
+            status_code=e.status_code, error=str(e.detail),
         )
+        raise
     except Exception as e:
+        PARSE_RESULTS.labels("error").inc()
+        log.exception("Erro inesperado ao processar PDF enviado")
         raise HTTPException(status_code=500, detail=f"Erro ao processar PDF: {str(e)}")
     finally:
-        # Limpa arquivo temporário
-        if temp_file:
-            cleanup_temp_file(temp_file)
+        observe_timings(stages, extractors)
+        if pdf and pdf.path:
+            cleanup_temp_file(pdf.path)
+
+# ===== LOTE =====
+async def _parse_batch_url(enhanced_parser, url: str, in_flight: asyncio.Semaphore, include_timings: bool = False) -> BatchItemResult:
+    """Baixa e processa uma URL do lote, convertendo falhas em resultado por item"""
+    started = time.time()
+    try:
+        item = await fetch_and_parse(enhanced_parser, url, started, in_flight, wait=True, include_timings=include_timings)
+        return BatchItemResult(url=url, ok=True, result=item)
+    except HTTPException as e:
+        return BatchItemResult(url=url, ok=False, error=str(e.detail), status_code=e.status_code)
+    except Exception as e:
+        return BatchItemResult(url=url, ok=False, error=f"Erro ao processar PDF: {str(e)}", status_code=500)
+
+@app.post("/cv:parse-batch", response_model=ParseBatchResponse)
+async def parse_batch(body: ParseBatchBody):
+    """Parse de vários PDFs a partir de URLs, com downloads concorrentes limitados"""
+    enhanced_parser = get_enhanced_parser()
+    started = time.time()
+    in_flight = asyncio.Semaphore(BATCH_MAX_IN_FLIGHT)
+    
+    items = await asyncio.gather(*(
+        _parse_batch_url(enhanced_parser, url, in_flight, body.include_timings) for url in body.urls
+    ))
+    succeeded = sum(1 for item in items if item.ok)
+    
+    return FastJSONResponse(ParseBatchResponse(
+        items=items,
+        total=len(items),
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        processing_ms=int((time.time()-started)*1000)
+    ))
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def _batch_stream_lines(enhanced_parser, urls: List[str], include_timings: bool) -> AsyncIterator[bytes]:
+    """Uma linha por URL na ordem em que terminam e, no fim, o resumo.
+
+    Cada item é serializado e liberado assim que sai; se o cliente desconecta,
+    o gerador é fechado e as URLs que faltam são canceladas.
+    """
+    started = time.time()
+    in_flight = asyncio.Semaphore(BATCH_MAX_IN_FLIGHT)
+
+    async def parse_one(index: int, url: str) -> BatchStreamItem:
+        result = await _parse_batch_url(enhanced_parser, url, in_flight, include_timings)
+        return BatchStreamItem(index=index, **dict(result))
+
+    tasks = [asyncio.create_task(parse_one(index, url)) for index, url in enumerate(urls)]
+    succeeded = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item = await next_done
+            succeeded += item.ok
+            yield item.model_dump_json().encode("utf-8") + b"\n"
+        yield BatchStreamSummary(
+            total=len(urls),
+            succeeded=succeeded,
+            failed=len(urls) - succeeded,
+            processing_ms=int((time.time()-started)*1000),
+        ).model_dump_json().encode("utf-8") + b"\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@app.post(
+    "/cv:parse-batch-stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "Um `BatchStreamItem` por linha, na ordem de conclusão, e um `BatchStreamSummary` no fim"}},
+)
+async def parse_batch_stream(body: ParseBatchBody):
+    """Como ``/cv:parse-batch``, mas em NDJSON: cada resultado sai assim que
+    fica pronto, sem esperar o download mais lento do lote"""
+    enhanced_parser = get_enhanced_parser()
+    return StreamingResponse(
+        _batch_stream_lines(enhanced_parser, body.urls, body.include_timings),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+# ===== JOBS ASSÍNCRONOS =====
+async def run_parse_job(url: str) -> str:
+    """Executa um job da fila e devolve o ParseItem serializado"""
+    enhanced_parser = get_enhanced_parser()
+    item = await fetch_and_parse(enhanced_parser, url, time.time(), wait=True)
+    return item.model_dump_json()
+
+def job_error(error: BaseException) -> Tuple[int, str]:
+    """Converte a falha de um job em (status_code, mensagem), como nas respostas síncronas"""
+    if isinstance(error, HTTPException):
+        return error.status_code, str(error.detail)
+    return 500, f"Erro ao processar PDF: {str(error)}"
+
+if WEB_CONCURRENCY > 1 and not JOBS_SQLITE_PATH:
+    # Em memória, cada worker veria só os seus jobs: o GET que cai em outro worker daria 404
+    raise RuntimeError("Com WEB_CONCURRENCY > 1, defina JOBS_SQLITE_PATH (store de jobs compartilhado pelos workers)")
+
+job_queue = JobQueue(
+    store=SQLiteJobStore(JOBS_SQLITE_PATH, JOBS_TTL_SECONDS) if JOBS_SQLITE_PATH else MemoryJobStore(JOBS_TTL_SECONDS),
+    runner=run_parse_job,
+    classify_error=job_error,
+    workers=JOBS_WORKERS,
+    max_queued=JOBS_MAX_QUEUED,
+    callback_timeout=JOBS_CALLBACK_TIMEOUT,
+    callback_retries=JOBS_CALLBACK_RETRIES,
+    get_session=get_http_session,
+    lease_seconds=JOBS_LEASE_SECONDS,
+    poll_interval=JOBS_POLL_SECONDS,
+)
+STATS.add("jobs", job_queue.stats)
+
+@app.post("/cv:jobs", response_model=JobCreatedResponse, status_code=202)
+async def create_parse_job(body: CreateJobBody):
+    """Enfileira o parse de um PDF e retorna o id do job imediatamente"""
+    if body.callback_url and urlparse(body.callback_url).scheme not in ("http", "https"):
+        raise HTTPException(status_code=400, detail="callback_url inválida: use http ou https")
+    try:
+        job = await job_queue.submit(body.url, body.callback_url)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Servidor ocupado: {str(e)}", headers={"Retry-After": str(PARSE_RETRY_AFTER_SECONDS)})
+    return JobCreatedResponse(job_id=job.id, status=job.status, status_url=f"/cv:jobs/{job.id}")
+
+@app.get("/cv:jobs/{job_id}", response_model=JobStatusResponse)
+async def get_parse_job(job_id: str):
+    """Status do job e, quando terminado, o resultado ou o erro"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return FastJSONResponse(job.to_payload())
@@ -0,0 +1,77 @@
+# Métricas Prometheus: histogramas por etapa/extrator e o estado atual (fila, cache)
+import os
+from typing import Any, Callable, Dict, Iterable
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+# Segundos: de extratores de microssegundos até downloads lentos
+_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_SECONDS = Histogram(
+    "cv_stage_seconds",
+    "Duração de cada etapa do processamento (head, download, read_pdf_text, parse...)",
+    ["stage"],
+    buckets=_BUCKETS,
+)
+EXTRACTOR_SECONDS = Histogram(
+    "cv_extractor_seconds",
+    "Duração de cada extrator do EnhancedParser",
+    ["extractor"],
+    buckets=_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "cv_in_flight",
+    "Documentos em andamento por etapa",
+    ["stage"],
+    multiprocess_mode="livesum",
+)
+DOWNLOAD_BYTES = Counter("cv_download_bytes_total", "Bytes de PDF baixados")
+UPLOAD_BYTES = Counter("cv_upload_bytes_total", "Bytes de PDF recebidos em /cv:parse-file")
+PARSE_RESULTS = Counter("cv_parse_total", "Documentos processados por resultado", ["outcome"])
+
+def observe_timings(timings: Dict[str, float], extractors: Dict[str, float]):
+    """Registra os tempos (ms) de um documento nos histogramas"""
+    for stage, ms in timings.items():
+        STAGE_SECONDS.labels(stage).observe(ms / 1000)
+    for extractor, ms in extractors.items():
+        EXTRACTOR_SECONDS.labels(extractor).observe(ms / 1000)
+
+class StatsCollector:
+    """Exporta como gauges os dicionários de ``stats()`` (cache, fila de parse, jobs).
+
+    Os valores são lidos na hora do scrape, então não há nada para manter
+    sincronizado: ``cv_<nome>_<chave>`` para cada chave numérica.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def add(self, name: str, stats: Callable[[], Dict[str, Any]]):
+        self._sources[name] = stats
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        for name, stats in self._sources.items():
+            try:
+                values = stats()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                yield GaugeMetricFamily(f"cv_{name}_{key}", f"{name}: {key}", value=value)
+
+STATS = StatsCollector()
+REGISTRY.register(STATS)
+
+def render_metrics() -> bytes:
+    """Texto do /metrics; com PROMETHEUS_MULTIPROC_DIR (gunicorn), agrega os workers"""
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not multiproc_dir:
+        return generate_latest(REGISTRY)
+    from prometheus_client import multiprocess
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=multiproc_dir)
+    # Estado atual (fila, cache) é do worker que respondeu o scrape
+    registry.register(STATS)
+    return generate_latest(registry)
@@ -0,0 +1,251 @@
+# Motor de parse em processos: o EnhancedParser é Python puro (regex e strings)
+# e, em threads, os parses disputam o GIL entre si e com o event loop
+import os
+import signal
+import asyncio
+import logging
+import contextvars
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AbstractSet, Any, Callable, Dict, List, Optional, Tuple
+
+import cv_result
+from cv_logging import get_logger, log_event
+
+log = get_logger("parse_engine")
+
+class ParseQueueFull(Exception):
+    """Fila de parse cheia: o pedido deve ser repetido mais tarde"""
+
+class ParseTimeout(Exception):
+    """O parse passou do tempo de CPU permitido por documento"""
+
+class _CPUTimeExceeded(BaseException):
+    # BaseException para não ser engolida pelos ``except Exception`` dos extratores
+    pass
+
+# ===== lado do processo worker =====
+_worker_parser = None
+
+def _on_cpu_timeout(signum, frame):
+    raise _CPUTimeExceeded()
+
+def init_worker(pids=None):
+    """Inicializador de cada processo: cria e aquece o parser uma única vez
+    (também usado pelos workers do ``bulk_parse``). ``pids`` é a fila em que o
+    worker avisa o seu pid, para o motor poder encerrá-lo se travar"""
+    global _worker_parser
+    if pids is not None:
+        pids.put(os.getpid())
+    import parser_runtime
+    from cv_logging import configure_logging
+    configure_logging()
+    parser_runtime.warm_up(load_models=False)
+    _worker_parser = parser_runtime.get_parser()
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGPROF, _on_cpu_timeout)
+
+def _ping() -> int:
+    return os.getpid()
+
+def parse_with_cpu_limit(
+    text: str,
+    headings: Optional[List[str]],
+    blocks: Optional[list],
+    cpu_timeout: float,
+    timings: Optional[Dict[str, float]] = None,
+    previous: Optional[cv_result.ParseResult] = None,
+    rerun: AbstractSet[str] = frozenset(),
+) -> cv_result.ParseResult:
+    """``parse_enhanced`` com o parser do worker, interrompido com
+    ``ParseTimeout`` depois de ``cpu_timeout`` segundos de CPU"""
+    # O timer conta só tempo de CPU deste processo; o regex do módulo ``re``
+    # verifica sinais durante o backtracking, então até um padrão catastrófico é interrompido
+    use_timer = cpu_timeout > 0 and hasattr(signal, "setitimer")
+    if use_timer:
+        signal.setitimer(signal.ITIMER_PROF, cpu_timeout)
+    try:
+        return _worker_parser.parse_enhanced(text, headings=headings, timings=timings, blocks=blocks, previous=previous, rerun=rerun)
+    except _CPUTimeExceeded:
+        raise ParseTimeout(f"Parse excedeu {cpu_timeout:g}s de CPU")
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+
+def _parse_in_worker(text: str, headings: Optional[List[str]], blocks: Optional[list], cpu_timeout: float) -> Tuple[bytes, Dict[str, float]]:
+    """Roda o parse no worker e devolve o resultado em JSON (``cv_result.dumps``)
+    e o tempo de cada extrator"""
+    timings: Dict[str, float] = {}
+    data = parse_with_cpu_limit(text, headings, blocks, cpu_timeout, timings)
+    return cv_result.dumps(data), timings
+
+# ===== lado da API =====
+class ParseEngine:
+    """Executa ``parse_enhanced`` em um pool de processos com parsers pré-aquecidos.
+
+    O texto vai para o worker e volta o ``cv_result.ParseResult`` em JSON,
+    convertido aqui com ``loads`` (o mesmo formato no modo com threads). ``queue_max`` limita os parses em andamento ou na fila;
+    acima disso ``parse`` levanta ``ParseQueueFull`` (ou espera, com
+    ``wait=True``). Cada job tem ``job_timeout`` segundos de CPU; um worker que
+    nem assim responde é encerrado e o pool é recriado.
+
+    Com ``workers=0`` o parse roda no ``thread_executor`` do próprio processo
+    (sem limite de CPU por job, que não existe para threads).
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_max: int,
+        job_timeout: float,
+        loads: Callable[[bytes], Any],
+        thread_executor: Optional[Executor] = None,
+        get_parser: Optional[Callable[[], Any]] = None,
+    ):
+        self.workers = workers
+        self.queue_max = queue_max
+        self.job_timeout = job_timeout
+        self._loads = loads
+        self._thread_executor = thread_executor
+        self._get_parser = get_parser
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # pids que os workers do pool atual avisam no init_worker
+        self._pool_pids = None
+        self._pool_lock = threading.Lock()
+        self._in_flight = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stats = {"completed": 0, "rejected": 0, "timeouts": 0, "restarts": 0}
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.workers > 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    # spawn: o processo da API tem threads, e fork com threads não é seguro
+                    context = multiprocessing.get_context("spawn")
+                    self._pool_pids = context.SimpleQueue()
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=context,
+                        initializer=init_worker,
+                        initargs=(self._pool_pids,),
+                    )
+        return self._pool
+
+    def start(self):
+        """Sobe todos os workers e espera o warm-up de cada um (bloqueante)"""
+        if not self.uses_processes:
+            return
+        pool = self._get_pool()
+        for future in [pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+
+    def _restart(self, broken_pool: ProcessPoolExecutor, terminate: bool = False):
+        """Descarta o pool (encerrando os processos se preciso); o próximo job cria outro"""
+        with self._pool_lock:
+            if self._pool is not broken_pool:
+                return
+            self._pool = None
+            pids, self._pool_pids = self._pool_pids, None
+            self._stats["restarts"] += 1
+        if terminate:
+            # Só a API pública: os pids que os workers avisaram, cruzados com os
+            # filhos vivos deste processo (um pid já reaproveitado não é filho)
+            worker_pids = set()
+            while not pids.empty():
+                worker_pids.add(pids.get())
+            for process in multiprocessing.active_children():
+                if process.pid in worker_pids:
+                    process.terminate()
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        pids.close()
+
+    async def parse(
+        self,
+        text: str,
+        headings: Optional[List[str]] = None,
+        wait: bool = False,
+        timings: Optional[Dict[str, float]] = None,
+        blocks: Optional[list] = None,
+    ):
+        """Faz o parse do texto respeitando o limite da fila; ``timings`` recebe o tempo de cada extrator.
+
+        Com ``blocks`` (ver ``pdf_text.LayoutBlock``) o parser usa o texto e as
+        seções dos blocos e ``text`` não é usado.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.queue_max))
+        if not wait and self._slots.locked():
+            self._stats["rejected"] += 1
+            raise ParseQueueFull(f"Fila de parse cheia ({self.queue_max} documentos em andamento)")
+
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                if self.uses_processes:
+                    data = await self._parse_in_pool(text, headings, timings, blocks)
+                else:
+                    loop = asyncio.get_running_loop()
+                    parser = self._get_parser()
+                    context = contextvars.copy_context()
+                    result = await loop.run_in_executor(
+                        self._thread_executor,
+                        lambda: context.run(parser.parse_enhanced, text, headings=headings, timings=timings, blocks=blocks),
+                    )
+                    data = self._loads(cv_result.dumps(result))
+                self._stats["completed"] += 1
+                return data
+            finally:
+                self._in_flight -= 1
+
+    async def _parse_in_pool(self, text: str, headings: Optional[List[str]], timings: Optional[Dict[str, float]], blocks: Optional[list] = None):
+        # Margem para o timer de CPU disparar antes: esperar além disso
+        # significa um worker travado fora do alcance dos sinais
+        wall_timeout = self.job_timeout * 2 + 5 if self.job_timeout > 0 else None
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                # Os blocos já trazem o texto: não manda o documento duas vezes para o worker
+                future = pool.submit(_parse_in_worker, "" if blocks else text, headings, blocks, self.job_timeout)
+                payload, worker_timings = await asyncio.wait_for(asyncio.wrap_future(future), wall_timeout)
+                if timings is not None:
+                    timings.update(worker_timings)
+                return self._loads(payload)
+            except ParseTimeout:
+                self._stats["timeouts"] += 1
+                raise
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                log_event(log, logging.WARNING, "Worker de parse não respondeu; pool recriado", wall_timeout_seconds=wall_timeout)
+                self._restart(pool, terminate=True)
+                raise ParseTimeout(f"Parse excedeu {self.job_timeout:g}s de CPU")
+            except BrokenProcessPool:
+                # Um worker morreu (falta de memória, por exemplo): recria o pool
+                # e tenta uma vez mais; se o próprio documento derruba o worker, desiste
+                log_event(log, logging.WARNING, "Worker de parse morreu; pool recriado", attempt=attempt + 1)
+                self._restart(pool)
+                if attempt == 1:
+                    raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "processes" if self.uses_processes else "threads",
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_max": self.queue_max,
+            "job_timeout_seconds": self.job_timeout,
+            **self._stats,
+        }
+
+    def close(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            pids, self._pool_pids = self._pool_pids, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+            pids.close()
@@ -0,0 +1,88 @@
+# Ciclo de vida do parser: uma instância por processo, modelos carregados sob demanda
+import gc
+import os
+import time
+import threading
+from typing import Any, Dict, Optional
+
+# ===== config =====
+SPACY_MODEL = os.getenv("SPACY_MODEL", "pt_core_news_lg")
+# Carrega o spaCy já no warm-up (por padrão só no primeiro uso)
+PRELOAD_SPACY = os.getenv("CV_PRELOAD_SPACY", "0") == "1"
+
+# Texto curto que passa por todos os extratores no warm-up
+_WARMUP_TEXT = """Maria Souza
+maria.souza@email.com (11) 91234-5678
+linkedin.com/in/maria-souza github.com/msouza
+Resumo: Desenvolvedora backend com experiência em Python, Java e AWS em projetos de alta escala.
+Experiência
+Empresa Exemplo: Desenvolvedora Senior
+- Implementei sistema de pagamentos com Python, Django e PostgreSQL.
+Formação
+Universidade Federal de Santa Catarina, Bacharelado em Ciência da Computação
+Idiomas: Inglês avançado, Português nativo
+AWS Certified Solutions Architect 2022
+Florianópolis, SC
+"""
+
+_lock = threading.Lock()
+_parser = None
+_nlp = None
+_nlp_loaded = False
+
+def get_parser():
+    """Retorna o EnhancedParser do processo, criando-o no primeiro uso"""
+    global _parser
+    if _parser is None:
+        with _lock:
+            if _parser is None:
+                from enhanced_parser import EnhancedParser
+                _parser = EnhancedParser()
+    return _parser
+
+def get_nlp():
+    """Retorna o modelo spaCy, carregado no primeiro uso (None se indisponível)"""
+    global _nlp, _nlp_loaded
+    if not _nlp_loaded:
+        with _lock:
+            if not _nlp_loaded:
+                try:
+                    import spacy
+                    _nlp = spacy.load(SPACY_MODEL)
+                except Exception:
+                    _nlp = None
+                _nlp_loaded = True
+    return _nlp
+
+def is_ready() -> bool:
+    return _parser is not None
+
+def warm_up(load_models: Optional[bool] = None) -> Dict[str, Any]:
+    """Cria o parser e roda um parse de exemplo para aquecer caches internos.
+
+    Pode ser chamado no startup (lifespan), no processo master antes do fork
+    (ver gunicorn.conf.py) ou manualmente. Chamadas repetidas são baratas.
+    """
+    started = time.time()
+    parser = get_parser()
+    parser.parse_enhanced(_WARMUP_TEXT)
+    
+    if load_models if load_models is not None else PRELOAD_SPACY:
+        get_nlp()
+    
+    return {
+        "parser_version": parser.parser_version,
+        "spacy_loaded": _nlp is not None,
+        "warmup_ms": int((time.time()-started)*1000),
+    }
+
+def freeze_for_fork():
+    """Move os objetos já criados para a geração permanente do GC.
+
+    Chamado no master depois do warm-up: sem isso, cada coleta nos workers
+    toca os cabeçalhos dos objetos herdados e força a cópia das páginas
+    (copy-on-write), perdendo o compartilhamento de memória entre workers.
+    """
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
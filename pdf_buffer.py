@@ -0,0 +1,94 @@
+# Buffer limitado para receber PDFs em partes (download ou upload)
+import os
+import hashlib
+import tempfile
+from typing import Optional, Union
+
+PDF_MAGIC = b'%PDF'
+
+class PDFTooLargeError(ValueError):
+    """O PDF passou do tamanho máximo permitido"""
+
+class NotAPDFError(ValueError):
+    """O conteúdo não começa com a assinatura de PDF"""
+
+class PDFBuffer:
+    """Acumula um PDF recebido em partes, em memória e com limite de tamanho.
+
+    A assinatura ``%PDF`` é verificada assim que chegam os primeiros bytes,
+    então um HTML de erro é rejeitado sem baixar o resto. Acima de
+    ``spill_bytes`` o conteúdo passa para um arquivo temporário; abaixo disso
+    nada toca o disco e ``source`` entrega um ``memoryview`` que o PyMuPDF
+    abre sem copiar.
+    """
+
+    def __init__(self, max_bytes: int, spill_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.spill_bytes = spill_bytes
+        self.size = 0
+        self._hasher = hashlib.sha256()
+        self._data: Optional[bytearray] = bytearray()
+        self._file = None
+        self.path: Optional[str] = None
+        self._checked_magic = False
+
+    @property
+    def spilled(self) -> bool:
+        return self.path is not None
+
+    def check_declared_size(self, content_length: Optional[int]):
+        """Rejeita antes de ler o corpo quando o Content-Length já passa do limite"""
+        if content_length is not None and content_length > self.max_bytes:
+            raise PDFTooLargeError(f"PDF excede o tamanho máximo de {self.max_bytes // (1024 * 1024)} MB")
+
+    def write(self, chunk: bytes):
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise PDFTooLargeError(f"PDF excede o tamanho máximo de {self.max_bytes // (1024 * 1024)} MB")
+        self._hasher.update(chunk)
+        
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+        self._data += chunk
+        if not self._checked_magic and len(self._data) >= len(PDF_MAGIC):
+            if not self._data.startswith(PDF_MAGIC):
+                raise NotAPDFError("Arquivo baixado não é um PDF válido")
+            self._checked_magic = True
+        if self.spill_bytes is not None and len(self._data) > self.spill_bytes:
+            self._spill()
+
+    def _spill(self):
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        temp_file.write(self._data)
+        self._file = temp_file
+        self.path = temp_file.name
+        self._data = None
+
+    def finish(self) -> str:
+        """Fecha o buffer e retorna o SHA-256 do conteúdo"""
+        if not self._checked_magic and (self._data is not None or self.size == 0):
+            if self._data is None or not self._data.startswith(PDF_MAGIC):
+                raise NotAPDFError("Arquivo baixado não é um PDF válido")
+            self._checked_magic = True
+        if self._file is not None:
+            self._file.close()
+        return self._hasher.hexdigest()
+
+    @property
+    def source(self) -> Union[str, memoryview]:
+        """Caminho do arquivo (se transbordou para disco) ou o conteúdo em memória"""
+        return self.path if self.path is not None else memoryview(self._data)
+
+    def discard(self):
+        """Libera a memória e remove o arquivo temporário, se houver"""
+        if self._file is not None:
+            self._file.close()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self._data = None
@@ -0,0 +1,472 @@
+# Extração de texto do PDF, com páginas divididas entre processos para documentos longos
+import os
+import tempfile
+import threading
+import multiprocessing
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+import fitz  # PyMuPDF
+
+from cv_document import heading_section_name, line_section_name
+
+# ===== config =====
+# Páginas além deste limite são ignoradas (portfólios e anexos escaneados)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "40"))
+# Processos para extrair páginas em paralelo (0 desativa). O pool é de cada
+# processo da API, então o padrão usa a parte dos núcleos de cada um
+# (WEB_CONCURRENCY), até 4; sem ao menos 2 núcleos para ele, 0
+_CPUS_PER_WORKER = (os.cpu_count() or 1) // max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, _CPUS_PER_WORKER) if _CPUS_PER_WORKER > 1 else 0)))
+# Documentos com menos páginas que isso são lidos direto, sem o pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "12"))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "4"))
+# Parada antecipada: seções que precisam ter aparecido e páginas lidas depois
+# que a última delas foi fechada por outro título
+PDF_EARLY_STOP = os.getenv("PDF_EARLY_STOP", "1") == "1"
+PDF_CORE_SECTIONS = tuple(s.strip() for s in os.getenv("PDF_CORE_SECTIONS", "experience,education").split(",") if s.strip())
+PDF_EARLY_STOP_MARGIN_PAGES = int(os.getenv("PDF_EARLY_STOP_MARGIN_PAGES", "2"))
+# Páginas seguidas praticamente sem texto (imagens escaneadas) encerram a leitura
+PDF_EMPTY_PAGES_STOP = int(os.getenv("PDF_EMPTY_PAGES_STOP", "3"))
+EMPTY_PAGE_MIN_CHARS = 20
+
+# Título pelo layout: fonte ao menos 15% maior que a do corpo do texto, ou
+# linha toda em negrito com nome de seção (negrito sozinho marca empresas/cargos)
+HEADING_SIZE_RATIO = 1.15
+HEADING_MAX_LEN = 40
+_BOLD_FLAG = 16
+
+# Ordem de leitura por colunas (currículos em duas colunas): sem isso as linhas
+# saem na ordem do arquivo, que costuma intercalar as colunas linha a linha
+PDF_COLUMNS = os.getenv("PDF_COLUMNS", "1") == "1"
+# Cada coluna precisa de ao menos tantas linhas lado a lado com a outra...
+COLUMN_MIN_LINES = 3
+# ...de ao menos esta fração da largura do texto da página...
+COLUMN_MIN_WIDTH_RATIO = 0.2
+# ...e de linhas alinhadas à esquerda (datas alinhadas à direita não são coluna);
+# a tolerância (pontos) vale para o alinhamento e para a borda da divisão
+COLUMN_ALIGNED_RATIO = 0.6
+COLUMN_ALIGN_TOLERANCE = 3
+# Coluna principal (nome, resumo, experiências) é lida primeiro quando tem
+# ao menos esta proporção do texto da outra; senão, da esquerda para a direita
+COLUMN_MAIN_RATIO = 1.5
+# Fração das linhas que pode atravessar a divisão (cabeçalho, rodapé, títulos em largura total)
+COLUMN_MAX_CROSSING_RATIO = 0.25
+# Divisões aninhadas (três colunas = duas divisões)
+COLUMN_MAX_DEPTH = 2
+
+# Versão da extração (texto, ordem de leitura, blocos): entra nas chaves do
+# text_store. O prefixo é o do código (qualquer mudança que altere a saída de
+# read_pdf_text deve atualizá-lo); o resto vem da configuração que muda o texto
+# (páginas lidas, parada antecipada, colunas), para que trocá-la não sirva
+# texto extraído com a configuração anterior
+_EARLY_STOP_KEY = (
+    f"es1-{'+'.join(PDF_CORE_SECTIONS)}-m{PDF_EARLY_STOP_MARGIN_PAGES}-e{PDF_EMPTY_PAGES_STOP}"
+    if PDF_EARLY_STOP else "es0"
+)
+TEXT_EXTRACT_VERSION = f"layout-1:p{PDF_MAX_PAGES}:{_EARLY_STOP_KEY}:c{int(PDF_COLUMNS)}"
+
+PDFSource = Union[str, bytes, memoryview]
+
+class LayoutLine(NamedTuple):
+    """Linha do PDF já em ordem de leitura"""
+    text: str
+    column: int
+    size: float    # maior fonte da linha
+    bold: bool     # todos os trechos com texto em negrito
+    block: int     # bloco do PyMuPDF de origem (muda a cada parágrafo)
+
+class LayoutBlock(NamedTuple):
+    """Trecho de linhas seguidas da mesma coluna e com o mesmo estilo.
+
+    Títulos de seção ficam sozinhos em um bloco, com ``section`` preenchido
+    (``"other"`` para título do layout sem nome conhecido), então a
+    segmentação do documento é uma passada pelos blocos.
+    """
+    text: str      # linhas separadas por "\n"
+    page: int
+    column: int
+    size: float
+    bold: bool
+    section: Optional[str] = None
+
+# Resultado de um trecho de páginas: textos, caracteres por fonte, linhas de cada página
+PageChunk = Tuple[List[str], Dict[float, int], List[List[LayoutLine]]]
+# Linha com posição, antes da ordem de leitura: (x0, y0, x1, y1, texto, fonte, negrito, bloco)
+_PlacedLine = Tuple[float, float, float, float, str, float, bool, int]
+
+def open_pdf(source: PDFSource) -> "fitz.Document":
+    """Abre o PDF a partir do caminho ou do conteúdo em memória (sem cópia para memoryview)"""
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
+
+# ===== ordem de leitura =====
+def _column_starts(lines: List[_PlacedLine]) -> List[float]:
+    """Bordas esquerdas compartilhadas por ao menos ``COLUMN_MIN_LINES`` linhas
+    (onde uma coluna pode começar), da esquerda para a direita, sem a primeira"""
+    edges: Dict[int, float] = {}
+    counts: Dict[int, int] = {}
+    for line in lines:
+        key = round(line[0])
+        counts[key] = counts.get(key, 0) + 1
+        edges[key] = min(edges.get(key, line[0]), line[0])
+    return [edges[key] for key in sorted(counts) if counts[key] >= COLUMN_MIN_LINES][1:]
+
+def _left_aligned(side: List[_PlacedLine]) -> bool:
+    edge = min(line[0] for line in side)
+    aligned = sum(1 for line in side if line[0] - edge <= COLUMN_ALIGN_TOLERANCE)
+    return aligned >= len(side) * COLUMN_ALIGNED_RATIO
+
+def _split_at(lines: List[_PlacedLine], split_x: float, width: float):
+    """Divide as linhas onde começa a coluna da direita; None se os dois lados não formam colunas.
+
+    À esquerda ficam as linhas que terminam antes da divisão; as demais que
+    não começam nela a atravessam (cabeçalho, títulos em largura total) e
+    separam faixas horizontais. Uma faixa só é lida coluna
+    por coluna se cada lado tiver ``COLUMN_MIN_LINES`` linhas nela. Devolve
+    as faixas em ordem vertical: ``(linhas que atravessam, esquerda, direita, é_coluna)``.
+    """
+    left, right, crossing = [], [], []
+    for line in lines:
+        if line[0] >= split_x - COLUMN_ALIGN_TOLERANCE:
+            right.append(line)
+        elif line[2] < split_x - COLUMN_ALIGN_TOLERANCE:
+            left.append(line)
+        else:
+            crossing.append(line)
+    if len(left) < COLUMN_MIN_LINES or len(right) < COLUMN_MIN_LINES:
+        return None
+    if len(crossing) > len(lines) * COLUMN_MAX_CROSSING_RATIO:
+        return None
+    for side in (left, right):
+        side_width = max(line[2] for line in side) - min(line[0] for line in side)
+        if side_width < width * COLUMN_MIN_WIDTH_RATIO or not _left_aligned(side):
+            return None
+
+    crossing.sort(key=lambda line: line[1])
+    cuts = [(line[1] + line[3]) / 2 for line in crossing]
+    bands = [([], [], []) for _ in range(len(cuts) + 1)]
+    for i, line in enumerate(crossing):
+        bands[i + 1][0].append(line)
+    for side_index, side in ((1, left), (2, right)):
+        for line in side:
+            bands[bisect_right(cuts, (line[1] + line[3]) / 2)][side_index].append(line)
+    out = []
+    any_columns = False
+    for across, band_left, band_right in bands:
+        is_columns = len(band_left) >= COLUMN_MIN_LINES and len(band_right) >= COLUMN_MIN_LINES
+        any_columns = any_columns or is_columns
+        out.append((across, band_left, band_right, is_columns))
+    return out if any_columns else None
+
+def _reading_order(lines: List[_PlacedLine], column: int = 0, depth: int = 0) -> List[Tuple[_PlacedLine, int]]:
+    """Ordena as linhas (com texto) coluna por coluna; sem colunas, mantém a ordem do arquivo.
+
+    Procura onde começa uma segunda coluna (borda esquerda comum a várias
+    linhas, com espaço livre antes) e lê, em cada faixa da página, uma coluna
+    inteira e depois a outra (cada lado de novo dividido, até
+    ``COLUMN_MAX_DEPTH``): primeiro a principal, se uma delas concentra o
+    texto (barra lateral de skills e idiomas vem depois), senão a da
+    esquerda. Custo O(n log n) por borda candidata, e elas são poucas.
+    """
+    if depth >= COLUMN_MAX_DEPTH or len(lines) < 2 * COLUMN_MIN_LINES:
+        return [(line, column) for line in lines]
+    position = {id(line): i for i, line in enumerate(lines)}
+    width = max(line[2] for line in lines) - min(line[0] for line in lines)
+    for split_x in _column_starts(lines):
+        bands = _split_at(lines, split_x, width)
+        if bands is None:
+            continue
+        left_parts = [_reading_order(band[1], column, depth + 1) if band[3] else None for band in bands]
+        # A coluna da direita tem o mesmo número em todas as faixas, inclusive
+        # nas que só têm linhas de um lado (a principal depois que a lateral acaba)
+        right_column = max(c for part in left_parts if part for _, c in part) + 1
+        ordered: List[Tuple[_PlacedLine, int]] = []
+        for (across, band_left, band_right, is_columns), left_part in zip(bands, left_parts):
+            ordered.extend((line, column) for line in across)
+            if left_part is not None:
+                right_part = _reading_order(band_right, right_column, depth + 1)
+                right_chars = sum(len(line[4]) for line in band_right)
+                if right_chars >= sum(len(line[4]) for line in band_left) * COLUMN_MAIN_RATIO:
+                    left_part, right_part = right_part, left_part
+                ordered.extend(left_part)
+                ordered.extend(right_part)
+            else:
+                # Faixa sem colunas: ordem do arquivo
+                sides = {id(line): right_column for line in band_right}
+                row = sorted(band_left + band_right, key=lambda line: position[id(line)])
+                ordered.extend((line, sides.get(id(line), column)) for line in row)
+        return ordered
+    return [(line, column) for line in lines]
+
+def _page_lines(page: "fitz.Page", chars_by_size: Dict[float, int]) -> List[LayoutLine]:
+    """Linhas da página em ordem de leitura; linhas em branco acompanham a linha anterior"""
+    groups: List[Tuple[_PlacedLine, List[_PlacedLine]]] = []
+    leading: List[_PlacedLine] = []
+    for block_no, block in enumerate(page.get_text("dict")["blocks"]):
+        if block.get("type") != 0:
+            continue
+        for line in block["lines"]:
+            spans = line["spans"]
+            text = "".join(s["text"] for s in spans)
+            size = max((s["size"] for s in spans), default=0.0)
+            bold = all(s["flags"] & _BOLD_FLAG or not s["text"].strip() for s in spans)
+            placed = (*line["bbox"], text, size, bold, block_no)
+            if not text.strip():
+                (groups[-1][1] if groups else leading).append(placed)
+                continue
+            for s in spans:
+                span_size = round(s["size"], 1)
+                chars_by_size[span_size] = chars_by_size.get(span_size, 0) + len(s["text"])
+            groups.append((placed, []))
+
+    columns = {}
+    if PDF_COLUMNS:
+        ordered = _reading_order([placed for placed, _ in groups])
+        if any(column for _, column in ordered):
+            trailing = {id(placed): blanks for placed, blanks in groups}
+            groups = [(placed, trailing[id(placed)]) for placed, _ in ordered]
+            columns = {id(placed): column for placed, column in ordered}
+
+    out = [LayoutLine(p[4], 0, p[5], p[6], p[7]) for p in leading]
+    for placed, blanks in groups:
+        column = columns.get(id(placed), 0)
+        out.append(LayoutLine(placed[4], column, placed[5], placed[6], placed[7]))
+        out.extend(LayoutLine(p[4], column, p[5], p[6], p[7]) for p in blanks)
+    return out
+
+def _extract_pages(doc: "fitz.Document", start: int, stop: int, layout: bool) -> PageChunk:
+    texts: List[str] = []
+    chars_by_size: Dict[float, int] = {}
+    pages: List[List[LayoutLine]] = []
+    for page_no in range(start, stop):
+        page = doc[page_no]
+        if not layout:
+            texts.append(page.get_text("text") or "")
+            continue
+        lines = _page_lines(page, chars_by_size)
+        pages.append(lines)
+        texts.append("".join(line.text + "\n" for line in lines))
+    return texts, chars_by_size, pages
+
+def _extract_pages_worker(path: str, start: int, stop: int, layout: bool) -> PageChunk:
+    """Executado no processo do pool: cada processo abre o seu próprio documento pelo caminho"""
+    with open_pdf(path) as doc:
+        return _extract_pages(doc, start, stop, layout)
+
+# ===== pool de processos =====
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: o processo do servidor tem threads, e fork com threads não é seguro
+                _pool = ProcessPoolExecutor(
+                    max_workers=PDF_EXTRACT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+def warm_up_pool():
+    """Sobe os processos do pool antes da primeira requisição (spawn + import do PyMuPDF)"""
+    if PDF_EXTRACT_WORKERS <= 0:
+        return
+    pool = _get_pool()
+    for future in [pool.submit(os.getpid) for _ in range(PDF_EXTRACT_WORKERS)]:
+        future.result()
+
+def shutdown_pool():
+    """Encerra o pool de extração (chamado no shutdown da API)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+# ===== parada antecipada =====
+class _EarlyStop:
+    """Acompanha as páginas lidas, em ordem, e decide quando parar"""
+
+    def __init__(self):
+        self.seen: Set[str] = set()
+        self.closed_at: Optional[int] = None  # página em que a última seção principal foi fechada
+        self.empty_run = 0
+
+    def feed(self, page_no: int, text: str) -> bool:
+        """Registra a página; retorna True se as próximas podem ser ignoradas"""
+        if len(text.strip()) < EMPTY_PAGE_MIN_CHARS:
+            self.empty_run += 1
+            return PDF_EMPTY_PAGES_STOP > 0 and self.empty_run >= PDF_EMPTY_PAGES_STOP
+        self.empty_run = 0
+
+        if not PDF_CORE_SECTIONS:
+            return False
+        for line in text.splitlines():
+            if len(line) > HEADING_MAX_LEN:
+                continue
+            name = heading_section_name(line)
+            if not name:
+                continue
+            if self.closed_at is None and len(self.seen) == len(PDF_CORE_SECTIONS) and name not in PDF_CORE_SECTIONS:
+                self.closed_at = page_no
+            if name in PDF_CORE_SECTIONS:
+                self.seen.add(name)
+                self.closed_at = None
+        return self.closed_at is not None and page_no - self.closed_at >= PDF_EARLY_STOP_MARGIN_PAGES
+
+# ===== leitura =====
+def _chunks(page_count: int) -> List[Tuple[int, int]]:
+    size = max(1, PDF_PAGES_PER_CHUNK)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+def _iter_chunks_inline(doc: "fitz.Document", page_count: int, layout: bool):
+    for start, stop in _chunks(page_count):
+        yield start, _extract_pages(doc, start, stop, layout)
+
+def _iter_chunks_parallel(source: PDFSource, page_count: int, layout: bool):
+    """Trechos em ordem; mantém no máximo 2 por processo em andamento.
+
+    Os processos recebem só o caminho do PDF: um PDF em memória vai uma vez
+    para um arquivo temporário, em vez de ser serializado de novo em cada
+    trecho (10 trechos de um PDF de 25 MB seriam 250 MB de IPC).
+    """
+    temp_path = None
+    if not isinstance(source, str):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+            temp_file.write(source)
+        source = temp_path = temp_file.name
+    pool = _get_pool()
+    pending = []
+    chunks = iter(_chunks(page_count))
+    window = max(1, PDF_EXTRACT_WORKERS) * 2
+    try:
+        for start, stop in chunks:
+            pending.append((start, pool.submit(_extract_pages_worker, source, start, stop, layout)))
+            if len(pending) >= window:
+                break
+        while pending:
+            start, future = pending.pop(0)
+            result = future.result()
+            for next_start, next_stop in chunks:
+                pending.append((next_start, pool.submit(_extract_pages_worker, source, next_start, next_stop, layout)))
+                break
+            yield start, result
+    finally:
+        # Parada antecipada ou erro: descarta o que ainda não começou
+        for _, future in pending:
+            future.cancel()
+        if temp_path is not None:
+            # Quem já abriu o arquivo continua lendo; o resultado dos trechos em andamento é descartado
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+def _is_layout_heading(line: LayoutLine, body_size: float) -> bool:
+    """Título pelo estilo: fonte maior que a do corpo, ou negrito com nome de seção"""
+    stripped = line.text.strip()
+    if not stripped or len(stripped) > HEADING_MAX_LEN:
+        return False
+    return line.size >= body_size * HEADING_SIZE_RATIO or (line.bold and heading_section_name(stripped) is not None)
+
+def _layout_blocks(pages: List[List[LayoutLine]], body_size: float, headings: Optional[List[str]]) -> List[LayoutBlock]:
+    """Agrupa as linhas em blocos: mesma página, coluna, bloco de origem e
+    estilo. Cada linha que abre seção (pelo texto ou pelo estilo, com as regras
+    de ``ParsedDocument``) vira um bloco à parte; linhas em branco seguem o bloco atual."""
+    blocks: List[LayoutBlock] = []
+    for page_no, lines in enumerate(pages):
+        current: Optional[LayoutLine] = None
+        current_lines: List[str] = []
+        for line in lines:
+            if current is not None and not line.text.strip():
+                current_lines.append(line.text)
+                continue
+            styled = _is_layout_heading(line, body_size)
+            if styled and headings is not None:
+                headings.append(line.text.strip())
+            section = line_section_name(line.text, styled)
+            if (
+                section is None and current is not None and line.column == current.column
+                and line.block == current.block and line.size == current.size and line.bold == current.bold
+            ):
+                current_lines.append(line.text)
+                continue
+            if current is not None:
+                blocks.append(LayoutBlock("\n".join(current_lines), page_no, current.column, round(current.size, 1), current.bold))
+                current, current_lines = None, []
+            if section is not None:
+                blocks.append(LayoutBlock(line.text, page_no, line.column, round(line.size, 1), line.bold, section))
+            else:
+                current, current_lines = line, [line.text]
+        if current is not None:
+            blocks.append(LayoutBlock("\n".join(current_lines), page_no, current.column, round(current.size, 1), current.bold))
+    return blocks
+
+def read_pdf_text(source: PDFSource, headings: Optional[List[str]] = None, blocks: Optional[List[LayoutBlock]] = None) -> str:
+    """Extrai o texto do PDF (caminho ou conteúdo em memória).
+
+    Lê no máximo ``PDF_MAX_PAGES`` páginas. Documentos longos são lidos em
+    trechos de páginas por um pool de processos (um documento PyMuPDF não
+    pode ser compartilhado entre threads) e o texto é montado em ordem, à
+    medida que os trechos chegam; a leitura para quando as seções principais
+    já foram encontradas ou quando sobram só páginas sem texto.
+
+    Se ``headings`` ou ``blocks`` for uma lista, usa o layout
+    (``get_text("dict")``): as linhas saem em ordem de leitura, coluna por
+    coluna (``PDF_COLUMNS``), ``headings`` recebe as linhas que parecem
+    títulos pelo estilo e ``blocks`` os ``LayoutBlock`` do documento. Em
+    páginas de uma coluna o texto é o mesmo do modo simples.
+    """
+    layout = headings is not None or blocks is not None
+    with open_pdf(source) as doc:
+        page_count = doc.page_count
+        if PDF_MAX_PAGES > 0:
+            page_count = min(page_count, PDF_MAX_PAGES)
+
+        if page_count < PDF_PARALLEL_MIN_PAGES:
+            texts, chars_by_size, pages = _extract_pages(doc, 0, page_count, layout)
+        else:
+            try:
+                if PDF_EXTRACT_WORKERS > 0:
+                    texts, chars_by_size, pages = _assemble(_iter_chunks_parallel(source, page_count, layout))
+                else:
+                    texts, chars_by_size, pages = _assemble(_iter_chunks_inline(doc, page_count, layout))
+            except BrokenProcessPool:
+                # Um processo morreu (falta de memória, PDF que derruba o MuPDF):
+                # recria o pool na próxima chamada e lê este documento aqui mesmo
+                shutdown_pool()
+                texts, chars_by_size, pages = _assemble(_iter_chunks_inline(doc, page_count, layout))
+
+    if layout:
+        # Tamanho do corpo: o tamanho de fonte com mais caracteres
+        body_size = max(chars_by_size, key=chars_by_size.get) if chars_by_size else 0
+        layout_blocks = _layout_blocks(pages, body_size, headings)
+        if blocks is not None:
+            blocks.extend(layout_blocks)
+    return "\n".join(texts)
+
+def _assemble(chunk_results) -> PageChunk:
+    """Junta os trechos em ordem, parando assim que o resto do documento pode ser ignorado"""
+    texts: List[str] = []
+    chars_by_size: Dict[float, int] = {}
+    pages: List[List[LayoutLine]] = []
+    early_stop = _EarlyStop() if PDF_EARLY_STOP else None
+    try:
+        for start, (chunk_texts, chunk_sizes, chunk_pages) in chunk_results:
+            texts.extend(chunk_texts)
+            for size, count in chunk_sizes.items():
+                chars_by_size[size] = chars_by_size.get(size, 0) + count
+            pages.extend(chunk_pages)
+            if early_stop and any(early_stop.feed(start + i, text) for i, text in enumerate(chunk_texts)):
+                break
+    finally:
+        close = getattr(chunk_results, "close", None)
+        if close:
+            close()
+    return texts, chars_by_size, pages
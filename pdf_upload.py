@@ -0,0 +1,148 @@
+# Leitura de PDFs enviados no corpo da requisição (application/pdf ou
+# multipart/form-data), em partes, direto para um PDFBuffer
+import asyncio
+import os
+from typing import AsyncIterator, List, Optional
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from pdf_buffer import PDFBuffer, PDFTooLargeError
+
+# Tipos aceitos como corpo bruto
+RAW_PDF_TYPES = ("application/pdf", "application/octet-stream")
+# Folga para cabeçalhos e campos extras do multipart além do próprio PDF
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+class UploadError(ValueError):
+    """O corpo da requisição não traz um PDF utilizável"""
+
+class UnsupportedUploadType(UploadError):
+    """Content-Type diferente de application/pdf e multipart/form-data"""
+
+def upload_filename(name: Optional[str]) -> Optional[str]:
+    """Só o nome do arquivo, sem diretórios (navegadores antigos mandam o caminho inteiro)"""
+    if not name:
+        return None
+    name = os.path.basename(name.replace("\\", "/")).strip()
+    return name or None
+
+def _too_large(buffer: PDFBuffer) -> PDFTooLargeError:
+    return PDFTooLargeError(f"PDF excede o tamanho máximo de {buffer.max_bytes // (1024 * 1024)} MB")
+
+async def _write(buffer: PDFBuffer, chunk: bytes):
+    if buffer.spilled:
+        await asyncio.to_thread(buffer.write, chunk)
+    else:
+        buffer.write(chunk)
+
+class _FilePartCollector:
+    """Callbacks do ``MultipartParser``: guarda os bytes da primeira parte que
+    é um arquivo (tem ``filename`` ou se chama ``file``) e descarta o resto"""
+
+    def __init__(self):
+        self.pending: List[bytes] = []
+        self.filename: Optional[str] = None
+        self.found = False
+        self._in_file = False
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        }
+
+    def _on_part_begin(self):
+        self._disposition = b""
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        if self.found:
+            return
+        _, options = parse_options_header(self._disposition)
+        filename = options.get(b"filename")
+        if filename is not None or options.get(b"name") == b"file":
+            self.found = self._in_file = True
+            if filename:
+                self.filename = upload_filename(filename.decode("utf-8", "replace"))
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.pending.append(data[start:end])
+
+    def _on_part_end(self):
+        self._in_file = False
+
+async def read_pdf_upload(
+    content_type: str,
+    content_length: Optional[int],
+    chunks: AsyncIterator[bytes],
+    buffer: PDFBuffer,
+) -> Optional[str]:
+    """Copia o PDF do corpo para ``buffer`` à medida que chega e devolve o nome
+    do arquivo enviado (se houver).
+
+    ``application/pdf`` (ou ``application/octet-stream``) é o próprio PDF; em
+    ``multipart/form-data`` vale a primeira parte com arquivo. O limite do
+    buffer vale para o PDF, e o corpo inteiro não pode passar dele mais
+    ``MULTIPART_OVERHEAD_BYTES``, então campos extras também não enchem a memória.
+    """
+    media_type, options = parse_options_header(content_type or "")
+    media_type = media_type.decode("latin-1").lower()
+
+    if media_type in RAW_PDF_TYPES:
+        buffer.check_declared_size(content_length)
+        async for chunk in chunks:
+            await _write(buffer, chunk)
+        return None
+
+    if media_type != "multipart/form-data":
+        raise UnsupportedUploadType(
+            f"Content-Type não suportado: {media_type or 'ausente'} (use application/pdf ou multipart/form-data)"
+        )
+    boundary = options.get(b"boundary")
+    if not boundary:
+        raise UploadError("multipart/form-data sem boundary")
+
+    body_limit = buffer.max_bytes + MULTIPART_OVERHEAD_BYTES
+    if content_length is not None and content_length > body_limit:
+        raise _too_large(buffer)
+    collector = _FilePartCollector()
+    parser = MultipartParser(boundary, collector.callbacks())
+    received = 0
+    try:
+        async for chunk in chunks:
+            received += len(chunk)
+            if received > body_limit:
+                raise _too_large(buffer)
+            parser.write(chunk)
+            pending, collector.pending = collector.pending, []
+            for data in pending:
+                await _write(buffer, data)
+        parser.finalize()
+    except MultipartParseError as e:
+        raise UploadError(f"multipart/form-data inválido: {e}") from e
+    if not collector.found:
+        raise UploadError("Nenhum arquivo no formulário (envie o PDF no campo 'file')")
+    return collector.filename
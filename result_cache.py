@@ -0,0 +1,171 @@
+# Cache de resultados de parse endereçado por conteúdo (memória + SQLite opcional)
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from sqlite_conn import LazySQLite
+
+def make_cache_key(content_sha256: str, parser_version: str) -> str:
+    """Chave do cache: hash dos bytes do PDF + versão do parser"""
+    return f"{parser_version}:{content_sha256}"
+
+class ResultCache:
+    """Cache LRU/TTL em dois níveis.
+
+    O nível em memória guarda os objetos prontos; o nível SQLite (opcional)
+    guarda a forma serializada e sobrevive a reinícios. Um acerto no disco
+    promove o valor para a memória.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 2048,
+        ttl_seconds: float = 86400,
+        sqlite_path: Optional[str] = None,
+        dumps: Callable[[Any], str] = str,
+        loads: Callable[[str], Any] = str,
+        table: str = "parse_results",
+    ):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = sqlite_path or None
+        self._dumps = dumps
+        self._loads = loads
+        self._table = table
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0}
+        # Aberta no primeiro uso, em cada processo (nada de conexão no import)
+        self._db: Optional[LazySQLite] = LazySQLite(self.sqlite_path, self._create_table) if self.sqlite_path else None
+        self._db_lock = threading.Lock()
+
+    def _create_table(self, db: sqlite3.Connection):
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        db.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0 or self._db is not None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Busca um resultado; retorna None em caso de miss ou expiração"""
+        now = time.time()
+        if self.max_items > 0:
+            with self._lock:
+                entry = self._items.get(key)
+                if entry is not None:
+                    created_at, value = entry
+                    if now - created_at <= self.ttl_seconds:
+                        self._items.move_to_end(key)
+                        self._stats["memory_hits"] += 1
+                        return value
+                    del self._items[key]
+                    self._stats["expired"] += 1
+        
+        if self._db is not None:
+            with self._db_lock:
+                db = self._db.get()
+                row = db.execute(
+                    f"SELECT value, created_at FROM {self._table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] > self.ttl_seconds:
+                    db.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                    db.commit()
+                    row = None
+                    with self._lock:
+                        self._stats["expired"] += 1
+            if row is not None:
+                value = self._loads(row[0])
+                self._set_memory(key, value, row[1])
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                return value
+        
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def contains(self, key: str) -> bool:
+        """Verifica se a chave existe e não expirou, sem alterar os contadores"""
+        now = time.time()
+        if self.max_items > 0:
+            with self._lock:
+                entry = self._items.get(key)
+                if entry is not None and now - entry[0] <= self.ttl_seconds:
+                    return True
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.get().execute(
+                    f"SELECT created_at FROM {self._table} WHERE key = ?", (key,)
+                ).fetchone()
+            return row is not None and now - row[0] <= self.ttl_seconds
+        return False
+
+    def set(self, key: str, value: Any):
+        """Grava um resultado nos dois níveis"""
+        now = time.time()
+        self._set_memory(key, value, now)
+        if self._db is not None:
+            payload = self._dumps(value)
+            with self._db_lock:
+                db = self._db.get()
+                db.execute(
+                    f"INSERT OR REPLACE INTO {self._table} (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, payload, now),
+                )
+                db.commit()
+        with self._lock:
+            self._stats["sets"] += 1
+
+    def _set_memory(self, key: str, value: Any, created_at: float):
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            self._items[key] = (created_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def purge_expired(self) -> int:
+        """Remove entradas expiradas do nível em disco"""
+        if self._db is None:
+            return 0
+        with self._db_lock:
+            db = self._db.get()
+            cur = db.execute(
+                f"DELETE FROM {self._table} WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            db.commit()
+            return cur.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+        if self._db is not None:
+            with self._db_lock:
+                db = self._db.get()
+                db.execute(f"DELETE FROM {self._table}")
+                db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de acerto/erro para monitoramento"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._items)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        stats["sqlite_enabled"] = self._db is not None
+        return stats
+
+    def close(self):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
@@ -0,0 +1,199 @@
+# Regras declarativas do parser: correções de nome, listas de bloqueio e
+# overrides por candidato, lidas de um JSON e recarregadas sem reiniciar workers
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from cv_logging import get_logger, log_event
+
+log = get_logger("rules")
+
+# ===== config =====
+RULES_PATH = os.getenv("CV_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cv_rules.json"))
+# Intervalo mínimo entre verificações do arquivo (segundos); 0 = nunca recarrega
+RULES_RELOAD_SECONDS = float(os.getenv("CV_RULES_RELOAD_SECONDS", "5"))
+
+class RulesError(ValueError):
+    """Arquivo de regras inválido"""
+
+def _blocklist_regex(entries: List[str]) -> Optional["re.Pattern[str]"]:
+    """Uma alternância com todas as entradas: espaço casa qualquer espaço em
+    branco e ``*`` casa qualquer trecho ("software*engineer")"""
+    parts = []
+    for entry in entries:
+        words = entry.lower().split()
+        if not words:
+            continue
+        parts.append(r"\s+".join(".*?".join(re.escape(piece) for piece in word.split("*")) for word in words))
+    if not parts:
+        return None
+    return re.compile("|".join(sorted(set(parts), key=len, reverse=True)), re.IGNORECASE)
+
+@dataclass(frozen=True)
+class ExperienceOverride:
+    company: str
+    role: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    is_current: Optional[bool] = None
+
+@dataclass(frozen=True)
+class ParserRules:
+    """Regras já compiladas: conjuntos e dicionários para consulta O(1) e um
+    único regex por lista de padrões. Imutável, então pode ser trocada
+    inteira no recarregamento enquanto outros parses ainda a usam."""
+
+    version: str = "none"
+    name_corrections: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    invalid_companies: FrozenSet[str] = frozenset()
+    project_name_blocklist: Optional["re.Pattern[str]"] = None
+    location_noise_tokens: FrozenSet[str] = frozenset()
+    generic_achievements: FrozenSet[str] = frozenset()
+    experience_overrides: Dict[str, Tuple[ExperienceOverride, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def compile(cls, config: Dict[str, Any], version: str) -> "ParserRules":
+        try:
+            overrides: Dict[str, Tuple[ExperienceOverride, ...]] = {}
+            for override in config.get("experience_overrides", []):
+                experiences = tuple(ExperienceOverride(**exp) for exp in override["experiences"])
+                for email in override["emails"]:
+                    overrides[email.lower()] = experiences
+            return cls(
+                version=version,
+                name_corrections={
+                    token.lower(): tuple(replacement.split())
+                    for token, replacement in config.get("name_corrections", {}).items()
+                },
+                invalid_companies=frozenset(c.lower().strip() for c in config.get("invalid_companies", [])),
+                project_name_blocklist=_blocklist_regex(config.get("project_name_blocklist", [])),
+                location_noise_tokens=frozenset(config.get("location_noise_tokens", [])),
+                generic_achievements=frozenset(a.lower() for a in config.get("generic_achievements", [])),
+                experience_overrides=overrides,
+            )
+        except (AttributeError, KeyError, TypeError, re.error) as e:
+            raise RulesError(f"Regras inválidas: {e}") from e
+
+    def experiences_for(self, emails: List[str]) -> Optional[Tuple[ExperienceOverride, ...]]:
+        for email in emails:
+            override = self.experience_overrides.get(email.lower())
+            if override:
+                return override
+        return None
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "name_corrections": len(self.name_corrections),
+            "invalid_companies": len(self.invalid_companies),
+            "location_noise_tokens": len(self.location_noise_tokens),
+            "generic_achievements": len(self.generic_achievements),
+            "experience_overrides": len(self.experience_overrides),
+        }
+
+def load_rules(path: str) -> ParserRules:
+    """Lê e compila o arquivo; a versão é o hash do conteúdo"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        config = json.loads(raw)
+    except ValueError as e:
+        raise RulesError(f"Regras inválidas em {path}: {e}") from e
+    if not isinstance(config, dict):
+        raise RulesError(f"Regras inválidas em {path}: esperado um objeto JSON")
+    return ParserRules.compile(config, hashlib.sha256(raw).hexdigest()[:12])
+
+class RuleSet:
+    """Regras ativas do processo, recarregadas quando o arquivo muda.
+
+    ``current()`` olha o mtime no máximo a cada ``reload_seconds``, então o
+    custo por parse é uma comparação de relógio. Cada processo (workers do
+    gunicorn e do motor de parse) recarrega sozinho. Um arquivo inválido é
+    ignorado e as regras anteriores continuam valendo.
+    """
+
+    def __init__(self, path: str = RULES_PATH, reload_seconds: float = RULES_RELOAD_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._reloads = 0
+        self._errors = 0
+        self._rules = self._load_initial()
+
+    def _stat_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _load_initial(self) -> ParserRules:
+        self._checked_at = time.monotonic()
+        self._mtime = self._stat_mtime()
+        if self._mtime is None:
+            return ParserRules()
+        return load_rules(self.path)
+
+    def current(self) -> ParserRules:
+        if self.reload_seconds > 0 and time.monotonic() - self._checked_at >= self.reload_seconds:
+            self.reload()
+        return self._rules
+
+    def reload(self, force: bool = False) -> bool:
+        """Recarrega se o arquivo mudou; devolve se trocou as regras.
+
+        Com ``force`` recarrega mesmo sem mudança de mtime e propaga erros de
+        leitura em vez de só avisar.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            mtime = self._stat_mtime()
+            if not force and mtime == self._mtime:
+                return False
+            self._mtime = mtime
+            if mtime is None:
+                if force:
+                    raise RulesError(f"Arquivo de regras {self.path} não encontrado")
+                log_event(log, logging.WARNING, "Arquivo de regras não encontrado; mantendo as regras atuais", path=self.path)
+                return False
+            try:
+                rules = load_rules(self.path)
+            except (OSError, RulesError) as e:
+                self._errors += 1
+                if force:
+                    raise
+                log_event(log, logging.WARNING, "Falha ao recarregar regras", error=str(e))
+                return False
+            changed = rules.version != self._rules.version
+            self._rules = rules
+            if changed:
+                self._reloads += 1
+                log_event(log, logging.INFO, "Regras recarregadas", version=rules.version, **rules.counts())
+            return changed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "version": self._rules.version,
+            "reloads": self._reloads,
+            "errors": self._errors,
+            **self._rules.counts(),
+        }
+
+_rule_set: Optional[RuleSet] = None
+_rule_set_lock = threading.Lock()
+
+def get_rule_set() -> RuleSet:
+    """RuleSet do processo, criado no primeiro uso"""
+    global _rule_set
+    if _rule_set is None:
+        with _rule_set_lock:
+            if _rule_set is None:
+                _rule_set = RuleSet()
+    return _rule_set
@@ -0,0 +1,55 @@
+# Busca de vários termos em uma única passada (alternância regex compilada)
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+class MultiTermMatcher:
+    """Encontra todas as ocorrências de uma lista de termos com um único regex.
+
+    Os termos são escapados e ordenados do maior para o menor, então
+    "angularjs" tem prioridade sobre "angular" e "javascript" sobre "java".
+    Com ``word_boundaries`` o termo não pode estar colado a letras/dígitos,
+    o que evita "r" ou "go" casando dentro de outras palavras.
+    O texto deve vir em minúsculas.
+    """
+
+    def __init__(self, terms: Iterable[str], word_boundaries: bool = True):
+        self.terms: List[str] = list(dict.fromkeys(t.lower() for t in terms if t))
+        alternation = "|".join(re.escape(t) for t in sorted(self.terms, key=len, reverse=True))
+        if word_boundaries:
+            pattern = rf"(?<!\w)(?:{alternation})(?!\w)"
+        else:
+            pattern = f"(?:{alternation})"
+        self.regex = re.compile(pattern)
+
+    def finditer(self, text_lower: str) -> Iterator[Tuple[str, int, int]]:
+        """Gera (termo, início, fim) para cada ocorrência, em ordem de posição"""
+        for m in self.regex.finditer(text_lower):
+            yield m.group(0), m.start(), m.end()
+
+    def find_all(self, text_lower: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Agrupa as ocorrências por termo"""
+        hits: Dict[str, List[Tuple[int, int]]] = {}
+        for term, start, end in self.finditer(text_lower):
+            hits.setdefault(term, []).append((start, end))
+        return hits
+
+def line_start_offsets(text: str) -> List[int]:
+    """Offsets de início de cada linha (para converter posição em número de linha)"""
+    starts = [0]
+    pos = text.find("\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = text.find("\n", pos + 1)
+    return starts
+
+def line_of(line_starts: List[int], offset: int) -> int:
+    """Número da linha (base 0) que contém o offset"""
+    return bisect_right(line_starts, offset) - 1
+
+def last_match_per_line(regex: "re.Pattern[str]", text: str, line_starts: List[int]) -> Dict[int, int]:
+    """Para cada linha, o início da última ocorrência do regex nela"""
+    last: Dict[int, int] = {}
+    for m in regex.finditer(text):
+        last[line_of(line_starts, m.start())] = m.start()
+    return last
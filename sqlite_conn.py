@@ -0,0 +1,49 @@
+# Conexões SQLite por processo: com o preload do gunicorn o main é importado
+# no master, e uma conexão herdada pelo fork não pode ser usada no worker
+# (o SQLite perde o controle dos locks e o banco pode corromper)
+import os
+import pathlib
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+class LazySQLite:
+    """Conexão aberta no primeiro uso, no processo que a usa.
+
+    Em um processo filho (fork) a conexão herdada é só esquecida (nem usada
+    nem fechada) e uma nova é aberta. ``setup`` roda em cada conexão nova
+    (PRAGMAs, CREATE TABLE). Quem usa continua responsável pelo próprio lock
+    entre threads, como antes.
+    """
+
+    def __init__(self, path: str, setup: Optional[Callable[[sqlite3.Connection], None]] = None, readonly: bool = False):
+        self.path = path
+        self._setup = setup
+        self._readonly = readonly
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def get(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        if self._db is None or self._pid != pid:
+            with self._lock:
+                if self._db is None or self._pid != pid:
+                    self._db = self._connect()
+                    self._pid = pid
+        return self._db
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._readonly:
+            return sqlite3.connect(pathlib.Path(self.path).resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        if self._setup is not None:
+            self._setup(db)
+        return db
+
+    def close(self):
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+            self._pid = None
@@ -0,0 +1,40 @@
+"""As famílias adversariais de ``benchmarks/fuzz_regex.py`` terminam dentro do ``CV_REGEX_BUDGET_MS``.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import time
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
+sys.path.insert(0, REPO_DIR)
+
+import enhanced_parser  # noqa: E402
+from fuzz_regex import FAMILIES  # noqa: E402
+
+BUDGET_MS = 200
+SIZE = 200000
+# O prazo é cooperativo (conferido entre matches): o que passa dele é o match
+# em andamento mais as etapas que não percorrem regex
+SLACK_MS = 1500
+
+@pytest.fixture(scope="module")
+def parser():
+    return enhanced_parser.EnhancedParser()
+
+@pytest.fixture(autouse=True)
+def regex_budget(monkeypatch):
+    monkeypatch.setattr(enhanced_parser, "REGEX_BUDGET_MS", BUDGET_MS)
+
+@pytest.mark.parametrize("family", sorted(FAMILIES))
+def test_family_respects_regex_budget(parser, family):
+    text = FAMILIES[family](SIZE)
+    started = time.perf_counter()
+    result = parser.parse_enhanced(text)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert elapsed_ms < BUDGET_MS + SLACK_MS, f"{family}: {elapsed_ms:.0f}ms"
+    assert result.meta.get("regex_budget_exhausted") in (None, True)
@@ -0,0 +1,174 @@
+# Texto extraído dos PDFs, comprimido e indexado pelo hash do conteúdo: uma
+# versão nova do parser refaz o parse daqui, sem baixar nem extrair de novo
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import cv_result
+from pdf_text import LayoutBlock, TEXT_EXTRACT_VERSION
+from sqlite_conn import LazySQLite
+
+# ===== config =====
+# auto = zstd (zstandard está no requirements.txt); sem ele, lz4 se instalado, senão zlib
+TEXT_STORE_CODEC = os.getenv("TEXT_STORE_CODEC", "auto")
+
+# Compressores disponíveis: (comprimir, descomprimir). Cada linha guarda o
+# seu codec, então um store escrito com zstd continua legível onde ele existe
+_CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+try:
+    import lz4.frame
+    _CODECS["lz4"] = (lz4.frame.compress, lz4.frame.decompress)
+except ImportError:
+    pass
+try:
+    import zstandard
+    # Um compressor por chamada: os objetos do zstandard não são thread-safe
+    _CODECS["zstd"] = (
+        lambda data: zstandard.ZstdCompressor(level=6).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+except ImportError:
+    pass
+
+def resolve_codec(name: str = TEXT_STORE_CODEC) -> str:
+    if name == "auto":
+        return next(codec for codec in ("zstd", "lz4", "zlib") if codec in _CODECS)
+    if name not in _CODECS:
+        raise ValueError(f"Codec {name} indisponível (instalados: {', '.join(sorted(_CODECS))})")
+    return name
+
+@dataclass
+class PackedText:
+    """Texto + blocos do layout já comprimidos (pode ser montado em outro processo)"""
+    codec: str
+    payload: bytes
+    text_sha256: str
+    raw_bytes: int
+
+@dataclass
+class StoredText:
+    text: str
+    blocks: List[LayoutBlock]
+    text_sha256: str
+    source: Optional[str]
+    # Último resultado do parse deste texto e as versões que o produziram
+    # (``EnhancedParser.extractor_versions``), para o replay incremental
+    result: Optional[cv_result.ParseResult]
+    result_versions: Optional[Dict[str, Any]]
+
+def _create_table(db: sqlite3.Connection):
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS texts ("
+        "content_sha256 TEXT NOT NULL, extract_version TEXT NOT NULL, codec TEXT NOT NULL, "
+        "text_sha256 TEXT NOT NULL, source TEXT, payload BLOB NOT NULL, "
+        "result_codec TEXT, result BLOB, created_at REAL NOT NULL, "
+        "PRIMARY KEY (content_sha256, extract_version))"
+    )
+    db.commit()
+
+def pack_text(text: str, blocks: List[LayoutBlock], codec: str) -> PackedText:
+    raw = cv_result.dumps({"text": text, "blocks": [tuple(block) for block in blocks]})
+    return PackedText(codec, _CODECS[codec][0](raw), cv_result.text_sha256(text), len(raw))
+
+def pack_result(result: cv_result.ParseResult, versions: Dict[str, Any], codec: str) -> bytes:
+    return _CODECS[codec][0](cv_result.dumps({"result": result, "versions": versions}))
+
+class TextStore:
+    """Store local (SQLite) de textos extraídos, endereçado pelo hash dos bytes
+    do PDF e pela versão da extração.
+
+    O texto e os blocos do layout vão comprimidos em uma única linha por
+    documento; a chave primária é o índice. Sem TTL nem limite: é o acervo
+    que permite refazer o parse de tudo quando só o parser muda.
+    """
+
+    def __init__(self, path: str, codec: str = TEXT_STORE_CODEC, readonly: bool = False):
+        self.path = path
+        self.codec = resolve_codec(codec)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "raw_bytes": 0, "stored_bytes": 0}
+        # Aberta no primeiro uso, em cada processo (nada de conexão no import)
+        self._db = LazySQLite(path, _create_table, readonly=readonly)
+
+    def connect(self):
+        """Abre a conexão já (e cria o arquivo e a tabela), antes de processos
+        que abrem o mesmo store só para leitura"""
+        with self._lock:
+            self._db.get()
+
+    def contains(self, content_sha256: str) -> bool:
+        with self._lock:
+            row = self._db.get().execute(
+                "SELECT 1 FROM texts WHERE content_sha256 = ? AND extract_version = ?", (content_sha256, TEXT_EXTRACT_VERSION),
+            ).fetchone()
+        return row is not None
+
+    def get(self, content_sha256: str, with_result: bool = False) -> Optional[StoredText]:
+        """Texto e blocos do PDF com este hash (extraídos pela versão atual), ou None"""
+        with self._lock:
+            row = self._db.get().execute(
+                f"SELECT codec, payload, text_sha256, source{', result_codec, result' if with_result else ''} "
+                "FROM texts WHERE content_sha256 = ? AND extract_version = ?",
+                (content_sha256, TEXT_EXTRACT_VERSION),
+            ).fetchone()
+            self._stats["hits" if row is not None else "misses"] += 1
+        if row is None:
+            return None
+        data = cv_result.loads(_CODECS[row[0]][1](row[1]))
+        result = versions = None
+        if with_result and row[5] is not None:
+            stored = cv_result.loads(_CODECS[row[4]][1](row[5]))
+            result, versions = cv_result.result_from_dict(stored["result"]), stored["versions"]
+        return StoredText(
+            text=data["text"],
+            blocks=[LayoutBlock(*block) for block in data["blocks"]],
+            text_sha256=row[2],
+            source=row[3],
+            result=result,
+            result_versions=versions,
+        )
+
+    def put(self, content_sha256: str, packed: PackedText, source: Optional[str] = None):
+        """Grava o texto (um texto novo descarta o resultado guardado)"""
+        with self._lock:
+            self._db.get().execute(
+                "INSERT OR REPLACE INTO texts (content_sha256, extract_version, codec, text_sha256, source, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (content_sha256, TEXT_EXTRACT_VERSION, packed.codec, packed.text_sha256, source, packed.payload, time.time()),
+            )
+            self._db.get().commit()
+            self._stats["sets"] += 1
+            self._stats["raw_bytes"] += packed.raw_bytes
+            self._stats["stored_bytes"] += len(packed.payload)
+
+    def put_result(self, content_sha256: str, payload: bytes, codec: Optional[str] = None):
+        """Guarda o resultado do parse (``pack_result``) ao lado do texto"""
+        with self._lock:
+            self._db.get().execute(
+                "UPDATE texts SET result_codec = ?, result = ? WHERE content_sha256 = ? AND extract_version = ?",
+                (codec or self.codec, payload, content_sha256, TEXT_EXTRACT_VERSION),
+            )
+            self._db.get().commit()
+
+    def keys(self) -> Iterator[str]:
+        """Hashes de conteúdo guardados pela versão atual da extração, em ordem"""
+        with self._lock:
+            rows = self._db.get().execute(
+                "SELECT content_sha256 FROM texts WHERE extract_version = ? ORDER BY content_sha256", (TEXT_EXTRACT_VERSION,),
+            ).fetchall()
+        return (row[0] for row in rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "path": self.path, "codec": self.codec, "extract_version": TEXT_EXTRACT_VERSION}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,75 @@
+# Cronômetros por etapa (download, extração do PDF, cada extrator do parser)
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+class StageClock:
+    """Mede etapas em sequência: cada ``lap`` registra o tempo desde o anterior.
+
+    Sem dicionário de destino (``timings=None``) não registra nada, então o
+    parser pode chamar ``lap`` sempre, sem custo relevante.
+    """
+
+    __slots__ = ("timings", "_last")
+
+    def __init__(self, timings: Optional[Dict[str, float]] = None):
+        self.timings = timings
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str):
+        if self.timings is None:
+            return
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+@contextmanager
+def timed(timings: Optional[Dict[str, float]], stage: str):
+    """Soma a duração do bloco (em ms) em ``timings[stage]``"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - started) * 1000
+
+def rounded(timings: Dict[str, float]) -> Dict[str, float]:
+    return {stage: round(ms, 3) for stage, ms in timings.items()}
+
+class Deadline:
+    """Prazo de processamento de um documento.
+
+    Os extratores iteram os matches com ``iter``, que para de entregar
+    resultados quando o prazo vence; ``hit`` indica se algo foi cortado.
+    É cooperativo: um único ``finditer`` não é interrompido no meio (para
+    isso existe o limite de CPU do motor de parse), por isso os padrões
+    precisam ser lineares.
+    """
+
+    __slots__ = ("expires_at", "hit")
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.perf_counter() + seconds if seconds and seconds > 0 else None
+        self.hit = False
+
+    @property
+    def expired(self) -> bool:
+        if self.expires_at is None:
+            return False
+        if time.perf_counter() >= self.expires_at:
+            self.hit = True
+        return self.hit
+
+    def iter(self, items: Iterable[T], check_every: int = 32) -> Iterator[T]:
+        """Repassa ``items`` conferindo o prazo antes do primeiro e a cada ``check_every``"""
+        if self.expires_at is None:
+            yield from items
+            return
+        if self.expired:
+            return
+        for i, item in enumerate(items, 1):
+            yield item
+            if i % check_every == 0 and self.expired:
+                return